@@ -0,0 +1,90 @@
+"""Compare two benchmark reports (e.g. from two commits) metric by metric.
+
+Usage:
+    python benchmarks/compare.py base.json head.json
+    python benchmarks/compare.py base.json head.json --threshold 0.1 --fail-on-regression
+
+Every numeric value under ``results`` is matched by its path. Latencies,
+durations and sizes (``*_ms``, ``*_s``, ``*_mb``) regress when they grow,
+throughput and quality (``qps``, ``docs_per_s``, ``recall_*``) when they
+shrink, by more than ``--threshold`` (relative).
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+LOWER_IS_BETTER = ("_ms", "_s", "_mb")
+HIGHER_IS_BETTER = ("qps", "docs_per_s", "recall_at_")
+
+
+def flatten(node: Any, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from flatten(value, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        yield prefix, float(node)
+
+
+def direction(path: str) -> int:
+    """+1 if larger is better, -1 if smaller is better, 0 if informational."""
+    metric = path.rsplit(".", 1)[-1]
+    if metric.startswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    base_metrics = dict(flatten(base.get("results", {})))
+    head_metrics = dict(flatten(head.get("results", {})))
+    rows = []
+    for path in sorted(base_metrics.keys() & head_metrics.keys()):
+        old, new = base_metrics[path], head_metrics[path]
+        change = (new - old) / old if old else 0.0
+        sign = direction(path)
+        status = ""
+        if sign and abs(change) > threshold:
+            status = "better" if change * sign > 0 else "worse"
+        rows.append({"metric": path, "base": old, "head": new, "change": round(change, 4), "status": status})
+    return {
+        "base_commit": base.get("meta", {}).get("commit"),
+        "head_commit": head.get("meta", {}).get("commit"),
+        "rows": rows,
+        "only_in_base": sorted(base_metrics.keys() - head_metrics.keys()),
+        "only_in_head": sorted(head_metrics.keys() - base_metrics.keys()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.05, help="Relative change to flag (default 5%%)")
+    parser.add_argument("--all", action="store_true", help="Also print unchanged and informational metrics")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 if any metric is worse")
+    args = parser.parse_args()
+
+    result = compare(
+        json.loads(args.base.read_text(encoding="utf-8")),
+        json.loads(args.head.read_text(encoding="utf-8")),
+        args.threshold,
+    )
+    print(f"base {result['base_commit']} -> head {result['head_commit']}")
+    width = max((len(row["metric"]) for row in result["rows"]), default=10)
+    for row in result["rows"]:
+        if row["status"] or args.all:
+            print(f"{row['metric']:<{width}}  {row['base']:>12g}  {row['head']:>12g}  {row['change']:>+8.1%}  {row['status']}")
+    for key in ("only_in_base", "only_in_head"):
+        if result[key]:
+            print(f"{key}: {', '.join(result[key])}")
+
+    if args.fail_on_regression and any(row["status"] == "worse" for row in result["rows"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
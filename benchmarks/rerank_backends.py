@@ -0,0 +1,168 @@
+"""Benchmark - 比較 Reranker 後端 (PyTorch vs ONNX/int8) 的延遲與排序一致性。
+
+Usage:
+    python benchmarks/rerank_backends.py --candidates 20 --rounds 30
+    python benchmarks/rerank_backends.py --onnx-file onnx/model.onnx --threads 4 --output report.json
+
+Each round scores one query against a pool of candidates (the same shape
+as HybridSearchUseCase: top_k * 4 fused results). Agreement is measured
+against the PyTorch backend: top-1 match, overlap of the top 5 and the
+Spearman correlation of the full ranking.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_dir / "src"))
+
+from advence_rag.config import get_settings  # noqa: E402
+
+QUERIES = [
+    "How does hybrid search combine BM25 and vector results?",
+    "What does the guard agent check before answering?",
+    "How are documents ingested from the ingest folder?",
+    "Which embedding model should I use for local mode?",
+    "向量資料庫要如何切換到 Qdrant？",
+    "什麼情況下會觸發網路搜尋？",
+]
+
+PASSAGES = [
+    "Reciprocal Rank Fusion merges the vector and keyword result lists by summing 1 / (k + rank).",
+    "BM25 scores documents by term frequency, inverse document frequency and document length.",
+    "The guard agent rejects prompts that match sensitive patterns configured in the settings.",
+    "Files dropped into the ingest directory are parsed, chunked and embedded by the scheduler.",
+    "Local mode runs sentence-transformers models such as all-MiniLM-L6-v2 on the CPU.",
+    "Switching VECTOR_DB_TYPE to qdrant requires re-running the ingestion pipeline.",
+    "切換資料庫後，舊的資料不會自動遷移，需要重新執行入庫流程。",
+    "當知識庫的重排序分數低於門檻時，CRAG 會改用網路搜尋補充資料。",
+    "Cross-encoders read the query and passage together and output a relevance logit.",
+    "The API exposes an OpenAI compatible chat completions endpoint with streaming.",
+    "Qdrant creates a full-text payload index on the content field for keyword search.",
+    "Gemini text-embedding-004 produces 768 dimensional vectors.",
+]
+
+
+def make_pool(rng: random.Random, size: int) -> list[str]:
+    # Concatenate passages so candidate lengths resemble real chunks
+    pool = []
+    for _ in range(size):
+        parts = rng.sample(PASSAGES, k=rng.randint(2, 5))
+        pool.append(" ".join(parts))
+    return pool
+
+
+def load_backend(name: str, args, settings):
+    if name == "torch":
+        from sentence_transformers import CrossEncoder
+
+        model = CrossEncoder(settings.rerank_model, max_length=args.max_length)
+        if args.threads:
+            import torch
+
+            torch.set_num_threads(args.threads)
+        return model
+
+    from advence_rag.tools.rerank_onnx import OnnxCrossEncoder
+
+    return OnnxCrossEncoder(
+        settings.rerank_model,
+        onnx_file=args.onnx_file,
+        max_length=args.max_length,
+        num_threads=args.threads,
+    )
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    ra = np.argsort(np.argsort(a))
+    rb = np.argsort(np.argsort(b))
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+def run(args) -> dict:
+    settings = get_settings()
+    rng = random.Random(args.seed)
+    workload = [(rng.choice(QUERIES), make_pool(rng, args.candidates)) for _ in range(args.rounds)]
+
+    report = {
+        "model": settings.rerank_model,
+        "candidates": args.candidates,
+        "rounds": args.rounds,
+        "max_length": args.max_length,
+        "threads": args.threads,
+        "backends": {},
+    }
+    all_scores = {}
+    for name in args.backends:
+        try:
+            model = load_backend(name, args, settings)
+        except ImportError as e:
+            print(f"Skipping {name}: {e}")
+            continue
+
+        # Warm up (graph optimization, allocator, lazy init)
+        model.predict([(workload[0][0], workload[0][1][0])], batch_size=args.batch_size)
+
+        latencies, scores = [], []
+        for query, pool in workload:
+            start = time.perf_counter()
+            result = model.predict([(query, doc) for doc in pool], batch_size=args.batch_size, show_progress_bar=False)
+            latencies.append((time.perf_counter() - start) * 1000)
+            scores.append(np.asarray(result, dtype=np.float64))
+        all_scores[name] = scores
+
+        latencies.sort()
+        report["backends"][name] = {
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+            "mean_ms": round(statistics.fmean(latencies), 2),
+        }
+        if name == "onnx":
+            report["backends"][name]["onnx_file"] = args.onnx_file
+
+    if "torch" in all_scores and "onnx" in all_scores:
+        top1, overlap, rho = [], [], []
+        for ref, other in zip(all_scores["torch"], all_scores["onnx"]):
+            top1.append(int(np.argmax(ref) == np.argmax(other)))
+            k = min(5, len(ref))
+            overlap.append(len(set(np.argsort(-ref)[:k]) & set(np.argsort(-other)[:k])) / k)
+            rho.append(spearman(ref, other))
+        report["agreement"] = {
+            "top1": round(statistics.fmean(top1), 4),
+            "overlap_at_5": round(statistics.fmean(overlap), 4),
+            "spearman": round(statistics.fmean(rho), 4),
+        }
+        report["speedup_p50"] = round(report["backends"]["torch"]["p50_ms"] / report["backends"]["onnx"]["p50_ms"], 2)
+
+    return report
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx"], choices=["torch", "onnx"])
+    parser.add_argument("--onnx-file", default=settings.rerank_onnx_file)
+    parser.add_argument("--threads", type=int, default=settings.rerank_num_threads)
+    parser.add_argument("--max-length", type=int, default=settings.rerank_max_length)
+    parser.add_argument("--batch-size", type=int, default=settings.rerank_batch_size)
+    parser.add_argument("--candidates", type=int, default=settings.rerank_top_k * 4)
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
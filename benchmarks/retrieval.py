@@ -0,0 +1,456 @@
+"""Benchmark - 以合成語料量測 BM25、向量庫、融合與重排序的建置與查詢效能。
+
+Usage:
+    python benchmarks/retrieval.py --sizes 10000 --languages en zh
+    python benchmarks/retrieval.py --targets bm25 --sizes 10000 100000 1000000 --output bm25.json
+    python benchmarks/compare.py base.json head.json
+
+Targets:
+    bm25     BM25Index: incremental build in ingestion-sized batches, compaction,
+             on-disk size and query latency
+    chroma   ChromaKnowledgeBaseRepository on a local persistent Chroma client
+             (plus its BM25 keyword leg); requires ``advence-rag[chroma]``
+    qdrant   QdrantKnowledgeBaseRepository on an embedded ``QdrantClient(path=...)``;
+             requires ``advence-rag[qdrant]``
+    fusion   HybridSearchUseCase._reciprocal_rank_fusion and the CombSUM /
+             CombMNZ variants at several candidate depths
+    rerank   rerank_results() with the rerank engine's batching and cache
+
+Chunks, queries and rerank candidates come from ``synthetic.py`` and are
+identical for a given seed. Vectors come from a feature-hashing stand-in
+embedder and rerank scores from a term-overlap stand-in cross-encoder
+(``--real-reranker`` loads the configured model instead), so timings measure
+the retrieval code and stores rather than model inference. Vector stores
+also report recall@k against exact search on the same vectors.
+
+Memory is the resident set size growth of this process while building
+(``rss_delta_mb``); it is indicative only, since freed memory is not always
+returned to the OS. The JSON report keeps run metadata under ``meta`` and
+measurements under ``results``, so two reports can be diffed directly or
+with ``compare.py``.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+import numpy as np
+
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_dir / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic import (  # noqa: E402
+    LANGUAGES,
+    HashEmbedder,
+    HashEmbeddingService,
+    OverlapCrossEncoder,
+    SyntheticCorpus,
+    chroma_embedding_function,
+)
+
+from advence_rag.application.fusion import fuse  # noqa: E402
+from advence_rag.application.use_cases.search import HybridSearchUseCase  # noqa: E402
+from advence_rag.config import get_settings  # noqa: E402
+from advence_rag.domain.entities import Document, SearchResult  # noqa: E402
+from advence_rag.tools import knowledge_base, rerank  # noqa: E402
+from advence_rag.tools.analyzer import get_analyzer  # noqa: E402
+from advence_rag.tools.bm25 import BM25Index  # noqa: E402
+
+settings = get_settings()
+
+TARGETS = ("bm25", "chroma", "qdrant", "fusion", "rerank")
+
+
+# ----------------------------------------------------------------------
+# Measurement helpers
+# ----------------------------------------------------------------------
+
+def rss_mb() -> float:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def dir_size_mb(path: Path) -> float:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file()) / 2**20
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    latencies = sorted(latencies)
+
+    def pct(q: float) -> float:
+        return round(latencies[int(q * (len(latencies) - 1))] * 1000, 3)
+
+    return {
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+    }
+
+
+def measure(call: Callable[[Any], Any], inputs: Sequence[Any], warmup: int) -> Dict[str, float]:
+    """Sequential latency percentiles and single-caller throughput.
+
+    The first ``warmup`` inputs are only used to warm up and are not timed.
+    """
+    for item in inputs[:warmup]:
+        call(item)
+    inputs = inputs[warmup:]
+    # Start from a clean heap so garbage from the previous stage is not collected mid-run
+    gc.collect()
+    latencies = []
+    start = time.perf_counter()
+    for item in inputs:
+        t0 = time.perf_counter()
+        call(item)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    return {**summarize(latencies), "qps": round(len(inputs) / elapsed, 1)}
+
+
+async def measure_async(
+    call: Callable[[Any], Awaitable[Any]], inputs: Sequence[Any], warmup: int, concurrency: int
+) -> Dict[str, float]:
+    """Sequential latency percentiles plus throughput with ``concurrency`` callers.
+
+    The throughput pass repeats the timed inputs; with ``concurrency=0`` it is
+    skipped (for targets with caches) and throughput comes from the sequential pass.
+    """
+    for item in inputs[:warmup]:
+        await call(item)
+    inputs = inputs[warmup:]
+    gc.collect()
+    latencies = []
+    start = time.perf_counter()
+    for item in inputs:
+        t0 = time.perf_counter()
+        await call(item)
+        latencies.append(time.perf_counter() - t0)
+    if not concurrency:
+        return {**summarize(latencies), "qps": round(len(inputs) / (time.perf_counter() - start), 1)}
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(item):
+        async with semaphore:
+            await call(item)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded(item) for item in inputs))
+    elapsed = time.perf_counter() - start
+    return {**summarize(latencies), "qps": round(len(inputs) / elapsed, 1), "concurrency": concurrency}
+
+
+def recall_at_k(exact: np.ndarray, queries: np.ndarray, found: List[List[str]], ids: List[str], k: int) -> float:
+    """Mean overlap of the returned IDs with the exact top-k by inner product."""
+    scores = queries @ exact.T
+    hits = []
+    for row, result_ids in zip(scores, found):
+        top = np.argpartition(-row, min(k, len(row) - 1))[:k]
+        expected = {ids[i] for i in top}
+        hits.append(len(expected & set(result_ids[:k])) / k)
+    return round(statistics.fmean(hits), 4)
+
+
+# ----------------------------------------------------------------------
+# Targets
+# ----------------------------------------------------------------------
+
+def bench_bm25(corpus: SyntheticCorpus, size: int, args, workdir: Path) -> Dict[str, Any]:
+    index = BM25Index(workdir / "bm25_index", analyzer=get_analyzer())
+    rss_before = rss_mb()
+    build_s = 0.0
+    for ids, texts in corpus.chunks(size, args.batch_size):
+        start = time.perf_counter()
+        index.add(texts, ids)
+        build_s += time.perf_counter() - start
+
+    start = time.perf_counter()
+    index.compact()
+    compact_s = time.perf_counter() - start
+    rss_after = rss_mb()
+
+    queries = corpus.queries(args.warmup + args.queries)
+    hit_counts = []
+    report = {
+        "build_s": round(build_s, 3),
+        "docs_per_s": round(size / build_s, 1),
+        "compact_s": round(compact_s, 3),
+        "index_mb": round(dir_size_mb(workdir / "bm25_index"), 2),
+        "rss_delta_mb": round(rss_after - rss_before, 1),
+        "search": measure(lambda q: hit_counts.append(len(index.search(q, top_k=args.top_k))), queries, args.warmup),
+    }
+    report["avg_hits"] = round(statistics.fmean(hit_counts[args.warmup :]), 2)
+    return report
+
+
+async def _bench_vector_repository(
+    repo, corpus: SyntheticCorpus, size: int, args, embedder: HashEmbedder, store_dir: Path, id_of: Callable[[str], str]
+) -> Dict[str, Any]:
+    keep_vectors = size <= args.recall_max_size
+    exact_ids: List[str] = []
+    exact_vectors: List[np.ndarray] = []
+
+    rss_before = rss_mb()
+    build_s = 0.0
+    for ids, texts in corpus.chunks(size, args.batch_size):
+        documents = [Document(content=text, metadata={"source": "synthetic"}, chunk_id=i) for i, text in zip(ids, texts)]
+        start = time.perf_counter()
+        result = await repo.add_documents(documents, ids=ids, metadatas=[{"source": "synthetic"}] * len(ids))
+        build_s += time.perf_counter() - start
+        if result.get("status") != "success":
+            raise RuntimeError(f"add_documents failed: {result.get('error')}")
+        if keep_vectors:
+            exact_ids.extend(id_of(i) for i in ids)
+            exact_vectors.append(embedder.encode(texts))
+    rss_after = rss_mb()
+
+    queries = corpus.queries(args.warmup + args.queries)
+    found: List[List[str]] = []
+
+    async def similar(query: str):
+        found.append([r.id for r in await repo.search_similar(query, top_k=args.top_k)])
+
+    async def keyword(query: str):
+        await repo.search_keyword(query, top_k=args.top_k)
+
+    report = {
+        "build_s": round(build_s, 3),
+        "docs_per_s": round(size / build_s, 1),
+        "store_mb": round(dir_size_mb(store_dir), 2),
+        "rss_delta_mb": round(rss_after - rss_before, 1),
+        "search_similar": await measure_async(similar, queries, args.warmup, args.concurrency),
+        "search_keyword": await measure_async(keyword, queries, args.warmup, args.concurrency),
+    }
+    if keep_vectors:
+        # The sequential pass (after warm-up) holds one result list per query
+        sequential = found[args.warmup : args.warmup + args.queries]
+        report[f"recall_at_{args.top_k}"] = recall_at_k(
+            np.vstack(exact_vectors), embedder.encode(queries[args.warmup :]), sequential, exact_ids, args.top_k
+        )
+    return report
+
+
+async def bench_chroma(corpus: SyntheticCorpus, size: int, args, workdir: Path) -> Dict[str, Any]:
+    try:
+        import chromadb
+        from chromadb.config import Settings as ChromaSettings
+    except ImportError:
+        return {"skipped": "chromadb is not installed. Install with: pip install 'advence-rag[chroma]'"}
+    from advence_rag.infrastructure.persistence import repository_factory
+    from advence_rag.infrastructure.persistence.chroma_repository import ChromaKnowledgeBaseRepository
+
+    # The repository goes through the knowledge_base module state; point it at
+    # a scratch directory with the stand-in embedder instead of the real store
+    embedder = HashEmbedder(args.dim, get_analyzer())
+    settings.chroma_persist_directory = workdir / "chroma"
+    settings.embedding_store_enabled = False
+    client = chromadb.PersistentClient(
+        path=str(settings.chroma_persist_directory), settings=ChromaSettings(anonymized_telemetry=False)
+    )
+    knowledge_base._chroma_client = client
+    knowledge_base._embedding_function = chroma_embedding_function(embedder)
+    knowledge_base._collection = client.get_or_create_collection(
+        name=settings.chroma_collection_name,
+        metadata={"hnsw:space": "cosine"},
+        embedding_function=knowledge_base._embedding_function,
+    )
+    knowledge_base._bm25_index = BM25Index(settings.chroma_persist_directory / "bm25_index", analyzer=get_analyzer())
+    try:
+        return await _bench_vector_repository(
+            ChromaKnowledgeBaseRepository(), corpus, size, args, embedder, workdir / "chroma", lambda i: i
+        )
+    finally:
+        knowledge_base._chroma_client = knowledge_base._collection = None
+        knowledge_base._embedding_function = knowledge_base._bm25_index = None
+        # The index generation log was opened under the scratch data directory
+        repository_factory._index_versions_instance = None
+
+
+async def bench_qdrant(corpus: SyntheticCorpus, size: int, args, workdir: Path) -> Dict[str, Any]:
+    try:
+        from qdrant_client import QdrantClient
+    except ImportError:
+        return {"skipped": "qdrant-client is not installed. Install with: pip install 'advence-rag[qdrant]'"}
+    from advence_rag.infrastructure.persistence.qdrant_repository import QdrantKnowledgeBaseRepository
+
+    embedder = HashEmbedder(args.dim, get_analyzer())
+    client = QdrantClient(path=str(workdir / "qdrant"))
+    repo = QdrantKnowledgeBaseRepository(HashEmbeddingService(embedder), client=client, dimension=args.dim)
+    try:
+        # Point IDs are derived from chunk IDs the same way the repository does
+        return await _bench_vector_repository(
+            repo, corpus, size, args, embedder, workdir / "qdrant", lambda i: str(uuid.uuid5(uuid.NAMESPACE_DNS, i))
+        )
+    finally:
+        client.close()
+
+
+def bench_fusion(args) -> Dict[str, Any]:
+    use_case = HybridSearchUseCase(kb_repo=None, reranker=None, cache_size=0)
+    rng = np.random.default_rng([args.seed, 7])
+    report = {}
+    for depth in args.fusion_depths:
+        # Two legs drawing from a shared pool, so roughly half the documents overlap
+        pool = [f"doc-{i}" for i in range(2 * depth)]
+        workloads = []
+        for _ in range(args.warmup + args.queries):
+            legs = []
+            for _ in range(2):
+                ids = rng.choice(len(pool), size=depth, replace=False)
+                legs.append([
+                    SearchResult(content=pool[i], metadata={}, id=pool[i], score=float(depth - rank))
+                    for rank, i in enumerate(ids)
+                ])
+            workloads.append(legs)
+
+        top_k = depth
+        report[f"depth_{depth}"] = {
+            "rrf": measure(lambda legs: use_case._reciprocal_rank_fusion(legs, top_k=top_k), workloads, args.warmup),
+            "combsum": measure(lambda legs: fuse(legs, method="combsum", top_k=top_k), workloads, args.warmup),
+            "combmnz": measure(lambda legs: fuse(legs, method="combmnz", top_k=top_k), workloads, args.warmup),
+        }
+    return report
+
+
+async def bench_rerank(corpus: SyntheticCorpus, args) -> Dict[str, Any]:
+    if args.real_reranker:
+        model = rerank._get_reranker()
+    else:
+        model = OverlapCrossEncoder(get_analyzer())
+
+    report = {}
+    for candidates in args.rerank_candidates:
+        # A fresh engine (and score cache) per pool size; every query is new, so
+        # each call scores the full pool as a cold request would
+        engine = rerank._engine = rerank.RerankEngine(
+            model, batch_size=settings.rerank_batch_size, cache_size=settings.rerank_cache_size
+        )
+        documents = [
+            {"id": f"cand-{i}", "content": text, "metadata": {}}
+            for i, text in enumerate(corpus.documents(candidates, salt=candidates))
+        ]
+        queries = corpus.queries(args.queries + args.warmup, salt=candidates)
+
+        async def call(query: str):
+            result = await rerank.rerank_results(query, documents, top_k=settings.rerank_top_k, skip_small_pool=False)
+            if result["status"] != "success":
+                raise RuntimeError(f"rerank_results failed: {result.get('error')}")
+
+        stats = await measure_async(call, queries, args.warmup, concurrency=0)
+        report[f"candidates_{candidates}"] = {**stats, "scored_pairs": engine.stats()["scored_pairs"]}
+    rerank._engine = None
+    return report
+
+
+# ----------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=root_dir, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    report: Dict[str, Any] = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "workdir")},
+            "analyzer": get_analyzer().config,
+        },
+        "results": {},
+    }
+    results = report["results"]
+
+    scratch = Path(tempfile.mkdtemp(prefix="advence_rag_bench_", dir=args.workdir))
+    try:
+        for target in args.targets:
+            if target == "fusion":
+                print("fusion ...", file=sys.stderr)
+                results["fusion"] = bench_fusion(args)
+                continue
+
+            for language in args.languages:
+                corpus = SyntheticCorpus(language, seed=args.seed)
+                if target == "rerank":
+                    print(f"rerank [{language}] ...", file=sys.stderr)
+                    results.setdefault("rerank", {})[language] = await bench_rerank(corpus, args)
+                    continue
+
+                for size in args.sizes:
+                    print(f"{target} [{language}, {size} chunks] ...", file=sys.stderr)
+                    workdir = scratch / f"{target}_{language}_{size}"
+                    workdir.mkdir()
+                    if target == "bm25":
+                        result = bench_bm25(corpus, size, args, workdir)
+                    elif target == "chroma":
+                        result = await bench_chroma(corpus, size, args, workdir)
+                    else:
+                        result = await bench_qdrant(corpus, size, args, workdir)
+                    results.setdefault(target, {}).setdefault(language, {})[str(size)] = result
+                    shutil.rmtree(workdir, ignore_errors=True)
+                    if "skipped" in result:
+                        print(f"Skipping {target}: {result['skipped']}", file=sys.stderr)
+                        break
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS), choices=TARGETS)
+    parser.add_argument("--languages", nargs="+", default=list(LANGUAGES), choices=LANGUAGES)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000], help="Corpus sizes in chunks (10k-1M)")
+    parser.add_argument("--queries", type=int, default=200, help="Timed queries per measurement")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--top-k", type=int, default=settings.retrieval_top_k)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Chunks per add_documents call")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent callers for the throughput pass")
+    parser.add_argument("--dim", type=int, default=384, help="Stand-in embedding dimension")
+    parser.add_argument("--recall-max-size", type=int, default=100_000, help="Skip recall above this corpus size")
+    parser.add_argument("--fusion-depths", nargs="+", type=int, default=[20, 100, 1000])
+    parser.add_argument("--rerank-candidates", nargs="+", type=int, default=[settings.rerank_top_k * 4, 100])
+    parser.add_argument("--real-reranker", action="store_true", help="Use the configured cross-encoder")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", type=Path, help="Parent directory for the scratch indexes (default: system temp)")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
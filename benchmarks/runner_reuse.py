@@ -0,0 +1,90 @@
+"""Benchmark - 比較每次請求建立 ADK Runner 與共用長駐 Runner 的設定成本。
+
+Usage:
+    python benchmarks/runner_reuse.py --rounds 500
+    python benchmarks/runner_reuse.py --rounds 2000 --output report.json
+
+Only the per-request setup is timed (no model call): building the runner,
+creating the session and closing the runner's toolsets, as chat() did
+before, against the shared runner plus the idempotent session setup it
+does now.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_dir / "src"))
+
+from google.adk import Runner  # noqa: E402
+from google.adk.sessions.in_memory_session_service import InMemorySessionService  # noqa: E402
+
+from advence_rag.agent import root_agent  # noqa: E402
+from advence_rag.infrastructure.ai.agent_service import OrchestratorAgentService  # noqa: E402
+
+
+async def per_request_runner(service: OrchestratorAgentService, session_id: str):
+    runner = Runner(agent=root_agent, app_name=service.app_name, session_service=service.session_service)
+    await service.session_service.create_session(
+        app_name=service.app_name, user_id="bench", session_id=session_id
+    )
+    await runner.close()
+
+
+async def shared_runner(service: OrchestratorAgentService, session_id: str):
+    service._get_runner()
+    async with service._session_lock(session_id):
+        await service._ensure_session("bench", session_id)
+
+
+def summarize(latencies: list[float]) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "p50_us": round(statistics.median(latencies) * 1e6, 1),
+        "p95_us": round(latencies[int(0.95 * (len(latencies) - 1))] * 1e6, 1),
+        "mean_us": round(statistics.fmean(latencies) * 1e6, 1),
+    }
+
+
+async def run(args) -> dict:
+    report = {"rounds": args.rounds, "variants": {}}
+    for name, setup in (("per_request", per_request_runner), ("shared", shared_runner)):
+        service = OrchestratorAgentService(session_service=InMemorySessionService())
+        # Warm up imports and allocator
+        for _ in range(10):
+            await setup(service, str(uuid.uuid4()))
+
+        latencies = []
+        for _ in range(args.rounds):
+            session_id = str(uuid.uuid4())
+            start = time.perf_counter()
+            await setup(service, session_id)
+            latencies.append(time.perf_counter() - start)
+        report["variants"][name] = summarize(latencies)
+        await service.aclose()
+
+    per_request, shared = report["variants"]["per_request"], report["variants"]["shared"]
+    report["saved_p50_us"] = round(per_request["p50_us"] - shared["p50_us"], 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Synthetic corpora and local stand-in models for the retrieval benchmarks.
+
+Everything here is deterministic for a given seed, so two benchmark runs
+(e.g. on two commits) index the same chunks and issue the same queries:
+
+- ``SyntheticCorpus``: English or CJK (Traditional Chinese-like, with a few
+  embedded English terms) chunks whose words follow a Zipf distribution,
+  generated lazily in batches so 1M chunks never sit in memory at once.
+- ``HashEmbedder``: feature-hashed bag of analyzer tokens, L2-normalized.
+  Texts sharing terms get similar vectors, which is all an ANN index needs
+  to behave realistically; no model download or network access.
+- ``OverlapCrossEncoder``: ``predict()`` compatible stand-in for the
+  sentence-transformers ``CrossEncoder`` used by ``RerankEngine``.
+"""
+
+import hashlib
+import sys
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_dir / "src"))
+
+from advence_rag.domain.interfaces import EmbeddingService  # noqa: E402
+from advence_rag.tools.analyzer import Analyzer  # noqa: E402
+
+LANGUAGES = ("en", "zh")
+
+_CONSONANTS = np.array(list("bcdfghjklmnprstvwz"))
+_VOWELS = np.array(list("aeiou"))
+# Characters are taken from the start of the CJK Unified Ideographs block;
+# their frequencies come from the Zipf weights, not from real usage
+_CJK_BASE = 0x4E00
+_CJK_CHARS = 3500
+
+
+def _zipf_probabilities(size: int, exponent: float = 1.07, offset: float = 2.7) -> np.ndarray:
+    """Zipf-Mandelbrot word frequencies (close to natural-language text)."""
+    weights = 1.0 / np.power(np.arange(size) + offset, exponent)
+    return weights / weights.sum()
+
+
+def _sample(rng: np.random.Generator, cdf: np.ndarray, size: int) -> np.ndarray:
+    # rng.choice(p=...) rebuilds the CDF on every call; this reuses it
+    return np.minimum(np.searchsorted(cdf, rng.random(size), side="right"), len(cdf) - 1)
+
+
+def _unique_words(make_batch, size: int) -> List[str]:
+    words: List[str] = []
+    seen = set()
+    while len(words) < size:
+        for word in make_batch(size):
+            if word not in seen:
+                seen.add(word)
+                words.append(word)
+                if len(words) == size:
+                    break
+    return words
+
+
+def _english_vocabulary(rng: np.random.Generator, size: int) -> List[str]:
+    def make_batch(n: int) -> List[str]:
+        syllables = rng.integers(1, 5, size=n)
+        parts = np.char.add(rng.choice(_CONSONANTS, size=syllables.sum()), rng.choice(_VOWELS, size=syllables.sum()))
+        bounds = np.cumsum(syllables)
+        return ["".join(parts[end - count : end]) for end, count in zip(bounds, syllables)]
+
+    return _unique_words(make_batch, size)
+
+
+def _cjk_vocabulary(rng: np.random.Generator, size: int) -> List[str]:
+    # Frequent characters should make up most words, as in real text
+    char_cdf = np.cumsum(_zipf_probabilities(_CJK_CHARS, exponent=0.9))
+
+    def make_batch(n: int) -> List[str]:
+        lengths = rng.choice([1, 2, 2, 2, 3, 4], size=n)
+        chars = [chr(_CJK_BASE + c) for c in _sample(rng, char_cdf, int(lengths.sum())).tolist()]
+        bounds = np.cumsum(lengths)
+        return ["".join(chars[end - length : end]) for end, length in zip(bounds, lengths)]
+
+    return _unique_words(make_batch, size)
+
+
+class SyntheticCorpus:
+    """Deterministic chunk and query generator for one language."""
+
+    def __init__(self, language: str, seed: int = 0, vocabulary_size: int = 50_000):
+        if language not in LANGUAGES:
+            raise ValueError(f"Unknown language: {language}")
+        self.language = language
+        self.seed = seed
+        lang_index = LANGUAGES.index(language)
+        rng = np.random.default_rng([seed, lang_index])
+        self.vocabulary = (
+            _english_vocabulary(rng, vocabulary_size) if language == "en" else _cjk_vocabulary(rng, vocabulary_size)
+        )
+        self._english = self.vocabulary if language == "en" else _english_vocabulary(rng, 2_000)
+        self._cdf = np.cumsum(_zipf_probabilities(len(self.vocabulary)))
+        self._lang_index = lang_index
+
+    def _chunks(self, rng: np.random.Generator, count: int) -> List[str]:
+        vocabulary = self.vocabulary
+        if self.language == "en":
+            lengths = rng.integers(60, 200, size=count)
+        else:
+            lengths = rng.integers(40, 150, size=count)
+        words = _sample(rng, self._cdf, int(lengths.sum())).tolist()
+        # Product names and acronyms show up in otherwise Chinese documents
+        acronyms = rng.integers(len(self._english), size=len(words)).tolist()
+        mixed = (rng.random(len(words)) < 0.04).tolist()
+
+        chunks = []
+        pos = 0
+        for length in lengths.tolist():
+            if self.language == "en":
+                sentences = []
+                for start in range(pos, pos + length, 12):
+                    sentence = " ".join(vocabulary[i] for i in words[start : min(start + 12, pos + length)])
+                    sentences.append(sentence[:1].upper() + sentence[1:] + ".")
+                chunks.append(" ".join(sentences))
+            else:
+                parts = []
+                for n, i in enumerate(range(pos, pos + length), 1):
+                    if mixed[i]:
+                        parts.append(f" {self._english[acronyms[i]].upper()} ")
+                    parts.append(vocabulary[words[i]])
+                    if n % 10 == 0:
+                        parts.append("，" if n % 30 else "。")
+                chunks.append("".join(parts) + "。")
+            pos += length
+        return chunks
+
+    def chunks(self, count: int, batch_size: int = 1000) -> Iterator[Tuple[List[str], List[str]]]:
+        """Yield ``(ids, texts)`` batches; chunk ``i`` is the same in every run with the same batch size."""
+        for start in range(0, count, batch_size):
+            end = min(start + batch_size, count)
+            # One generator per batch: any batch can be regenerated on its own
+            rng = np.random.default_rng([self.seed, self._lang_index, 0, start])
+            ids = [f"{self.language}-{i:07d}" for i in range(start, end)]
+            yield ids, self._chunks(rng, end - start)
+
+    def documents(self, count: int, salt: int = 1) -> List[str]:
+        """Free-standing chunks (e.g. rerank candidates) outside the indexed corpus."""
+        return self._chunks(np.random.default_rng([self.seed, self._lang_index, 1, salt]), count)
+
+    def queries(self, count: int, salt: int = 0) -> List[str]:
+        """Short keyword queries built from mid-frequency words (they match but are selective)."""
+        rng = np.random.default_rng([self.seed, self._lang_index, 2, salt])
+        low, high = 20, min(5_000, len(self.vocabulary))
+        queries = []
+        for _ in range(count):
+            words = [self.vocabulary[i] for i in rng.integers(low, high, size=int(rng.integers(2, 6)))]
+            queries.append(" ".join(words) if self.language == "en" else "".join(words))
+        return queries
+
+
+class HashEmbedder:
+    """Deterministic feature-hashing embedder (signed buckets, L2-normalized)."""
+
+    def __init__(self, dim: int = 384, analyzer: Analyzer | None = None):
+        self.dim = dim
+        self.analyzer = analyzer or Analyzer()
+        self._buckets: dict[str, Tuple[int, float]] = {}
+
+    def _bucket(self, token: str) -> Tuple[int, float]:
+        bucket = self._buckets.get(token)
+        if bucket is None:
+            # hashlib, not hash(): stable across processes and PYTHONHASHSEED
+            digest = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+            bucket = self._buckets[token] = (digest % self.dim, 1.0 if digest >> 63 else -1.0)
+        return bucket
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = self.analyzer.analyze(text)
+            if not tokens:
+                continue
+            indices, signs = zip(*(self._bucket(token) for token in tokens))
+            np.add.at(vectors[row], np.fromiter(indices, dtype=np.int64), np.fromiter(signs, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class HashEmbeddingService(EmbeddingService):
+    """``EmbeddingService`` backed by ``HashEmbedder`` (for the Qdrant repository)."""
+
+    def __init__(self, embedder: HashEmbedder):
+        self.embedder = embedder
+
+    async def embed_text(self, text: str) -> List[float]:
+        return self.embedder.encode([text])[0].tolist()
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return self.embedder.encode(texts).tolist()
+
+
+def chroma_embedding_function(embedder: HashEmbedder):
+    """Chroma embedding function backed by ``HashEmbedder`` (requires chromadb)."""
+    from chromadb.api.types import EmbeddingFunction
+
+    class HashEmbeddingFunction(EmbeddingFunction):
+        def __call__(self, input: List[str]) -> List[List[float]]:
+            return embedder.encode(input).tolist()
+
+    return HashEmbeddingFunction()
+
+
+class OverlapCrossEncoder:
+    """Scores (query, passage) pairs by BM25-like term overlap, in batches."""
+
+    def __init__(self, analyzer: Analyzer | None = None):
+        self.analyzer = analyzer or Analyzer()
+        self.pairs_scored = 0
+
+    def predict(self, pairs: Sequence[Tuple[str, str]], batch_size: int = 16, show_progress_bar: bool = False) -> np.ndarray:
+        scores = np.empty(len(pairs), dtype=np.float32)
+        for start in range(0, len(pairs), batch_size):
+            for i, (query, passage) in enumerate(pairs[start : start + batch_size], start):
+                terms = set(self.analyzer.analyze_query(query))
+                tokens = self.analyzer.analyze(passage)
+                matched = sum(1 for token in tokens if token in terms)
+                # Logit-like range: saturating in matches, penalized by length
+                scores[i] = 10.0 * matched / (matched + 1.5 + 0.01 * len(tokens)) - 5.0
+        self.pairs_scored += len(pairs)
+        return scores
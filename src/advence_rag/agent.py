@@ -26,6 +26,14 @@ setup_logging(settings.log_level)
 
 # Root Agent 定義
 # 流程：Guard → Orchestrator（內含完整的 Retrieval + Processing 子系統）
+# direct 模式：略過 Orchestrator，直接檢索 → Writer（單次 LLM 呼叫）
+if settings.rag_pipeline_mode == "direct":
+    from advence_rag.workflows.rag_pipeline import get_rag_pipeline
+
+    _entry_agent = get_rag_pipeline()
+else:
+    _entry_agent = orchestrator_agent  # 智慧協調（內含 Guard, Retrieval, Processing 等子系統）
+
 root_agent = SequentialAgent(
     name="advence_rag",
     description=(
@@ -33,9 +41,7 @@ root_agent = SequentialAgent(
         "結合安全過濾、智慧路由、知識檢索、反思驗證等能力，"
         "提供高品質的 RAG 問答服務。"
     ),
-    sub_agents=[
-        orchestrator_agent,  # 智慧協調（內含 Guard, Retrieval, Processing 等子系統）
-    ],
+    sub_agents=[_entry_agent],
 )
 
 
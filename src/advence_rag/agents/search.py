@@ -9,6 +9,7 @@ from typing import Any
 from google.adk.agents import Agent
 
 from advence_rag.config import get_settings
+from advence_rag.infrastructure.ai.answer_cache import record_citations
 
 settings = get_settings()
 
@@ -25,16 +26,21 @@ def _get_search_use_case():
         from advence_rag.infrastructure.persistence.hybrid_repository import HybridKnowledgeBaseRepository
         from advence_rag.infrastructure.ai.reranker_service import CrossEncoderReranker
         from advence_rag.infrastructure.ai.web_search_service import SerperWebSearchService
+        from advence_rag.infrastructure.persistence.repository_factory import get_index_versions
         
         kb_repo = HybridKnowledgeBaseRepository()
         reranker = CrossEncoderReranker()
-        web_search = SerperWebSearchService()
+        # Fetched page passages are scored with the same reranker as KB chunks
+        web_search = SerperWebSearchService(reranker=reranker)
         
         _search_use_case = HybridSearchUseCase(
             kb_repo=kb_repo,
             reranker=reranker,
             web_search=web_search,
+            index_versions=get_index_versions(),
         )
+        from advence_rag.utils.metrics import get_metrics
+        get_metrics().register_stats("retrieval", _search_use_case.stats.as_dict, counters=True)
     
     return _search_use_case
 
@@ -62,6 +68,9 @@ async def search_knowledge_base(
     # Execute hybrid search with CRAG
     results = await use_case.execute(query, top_k=top_k)
     
+    # Let the answer cache know which chunks this answer depends on
+    record_citations(r.id for r in results)
+    
     # Format results for LLM consumption
     return use_case.format_for_llm(query, results)
 
@@ -107,7 +116,9 @@ def evaluate_retrieval_quality(
     # Check top-1 score
     # Cross-Encoder scores are usually logits. 
     # > 0 usually implies relevant for models trained with BCE (like ms-marco).
-    top_score = results[0].get("rerank_score", -999.0)
+    top_score = results[0].get("rerank_score")
+    if top_score is None:  # Not reranked (e.g. small pool skipped)
+        top_score = -999.0
     
     # Threshold can be tuned. 0.0 is a reasonable starting point for relevant/non-relevant.
     threshold = 0.0 
@@ -0,0 +1,131 @@
+"""Rank fusion for hybrid retrieval.
+
+All methods map the candidates of every leg onto one array of unique
+documents and accumulate scores with ``np.bincount``; the top-k is picked
+with ``np.partition`` so only the k winners are sorted. Inputs are
+never mutated: fused results are copies carrying the fused score.
+
+Methods:
+    rrf      weighted Reciprocal Rank Fusion, sum(w / (k + rank))
+    combsum  sum of weighted, normalized leg scores
+    combmnz  combsum multiplied by the number of legs that found the document
+"""
+
+import copy
+from typing import Dict, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+
+from advence_rag.domain.entities import SearchResult
+
+FusionMethod = Literal["rrf", "combsum", "combmnz"]
+Normalization = Literal["minmax", "zscore"]
+
+# Standard value for Reciprocal Rank Fusion
+RRF_K = 60
+
+
+def _index(ranked_lists: Sequence[Sequence[SearchResult]]) -> Tuple[List[SearchResult], List[np.ndarray]]:
+    """Unique documents in first-seen order, and each list's positions into them."""
+    position: Dict[str, int] = {}
+    docs: List[SearchResult] = []
+    indices = []
+    for ranked in ranked_lists:
+        idx = []
+        for doc in ranked:
+            j = position.get(doc.id)
+            if j is None:
+                j = position[doc.id] = len(docs)
+                docs.append(doc)
+            idx.append(j)
+        indices.append(np.asarray(idx, dtype=np.int64))
+    return docs, indices
+
+
+def _normalize(scores: np.ndarray, normalization: Normalization) -> np.ndarray:
+    # Lists are ranked best-first; ascending scores are distances, so flip them
+    if len(scores) > 1 and scores[0] < scores[-1]:
+        scores = -scores
+    if normalization == "zscore":
+        std = scores.std()
+        return (scores - scores.mean()) / std if std > 0 else np.zeros_like(scores)
+    low, high = scores.min(), scores.max()
+    return (scores - low) / (high - low) if high > low else np.ones_like(scores)
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the ``top_k`` highest scores, best first; ties keep index order."""
+    n = len(scores)
+    if top_k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if top_k < n:
+        # Include every score tied with the k-th so the tie-break stays deterministic
+        kth = np.partition(scores, n - top_k)[n - top_k]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(n)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:top_k]
+
+
+def fuse(
+    ranked_lists: Sequence[Sequence[SearchResult]],
+    method: FusionMethod = "rrf",
+    weights: Optional[Sequence[float]] = None,
+    top_k: int = 10,
+    k: int = RRF_K,
+    normalization: Normalization = "minmax",
+) -> List[SearchResult]:
+    """Fuse several best-first ranked lists into one.
+
+    Args:
+        ranked_lists: One ranked list per retrieval leg
+        method: rrf, combsum or combmnz
+        weights: Per-list weights (default 1.0 each)
+        top_k: Number of fused results to return
+        k: RRF rank constant
+        normalization: Score normalization for combsum/combmnz
+
+    Returns:
+        Copies of the top documents with ``score`` set to the fused score
+    """
+    docs, indices = _index(ranked_lists)
+    if not docs:
+        return []
+    n = len(docs)
+    if weights is None:
+        weights = [1.0] * len(ranked_lists)
+
+    fused = np.zeros(n)
+    for idx, ranked, weight in zip(indices, ranked_lists, weights):
+        if not len(idx):
+            continue
+        if method == "rrf":
+            contribution = weight / (k + np.arange(1, len(idx) + 1))
+        else:
+            raw = np.fromiter((doc.score or 0.0 for doc in ranked), dtype=np.float64, count=len(ranked))
+            contribution = weight * _normalize(raw, normalization)
+        fused += np.bincount(idx, weights=contribution, minlength=n)
+
+    if method == "combmnz":
+        hits = np.zeros(n)
+        for idx in indices:
+            hits += np.bincount(idx, minlength=n) > 0
+        fused *= hits
+
+    results = []
+    for i in top_k_indices(fused, top_k).tolist():
+        doc = copy.copy(docs[i])  # Shallow copy: much cheaper than dataclasses.replace
+        doc.score = float(fused[i])
+        results.append(doc)
+    return results
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[SearchResult]],
+    k: int = RRF_K,
+    top_k: int = 10,
+    weights: Optional[Sequence[float]] = None,
+) -> List[SearchResult]:
+    """Weighted Reciprocal Rank Fusion: score = sum(w / (k + rank))."""
+    return fuse(ranked_lists, method="rrf", weights=weights, top_k=top_k, k=k)
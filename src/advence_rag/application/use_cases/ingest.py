@@ -1,13 +1,19 @@
 from typing import List, Optional, Dict, Any
 from pathlib import Path
+import asyncio
 import logging
+import time
 
 from advence_rag.domain.entities import Document
 from advence_rag.domain.interfaces import KnowledgeBaseRepository
 from advence_rag.parsers import get_parser, detect_best_parser, ParserType
+from advence_rag.utils.metrics import get_metrics
 
 logger = logging.getLogger("advence_rag")
 
+_ingest_latency = get_metrics().histogram("ingest_duration_seconds", "Document ingestion latency (parse + embed + index)", ["status"])
+_ingest_chunks = get_metrics().counter("ingest_chunks", "Chunks added to the knowledge base")
+
 class IngestDocumentUseCase:
     """Use case for ingesting documents into the knowledge base."""
     
@@ -24,8 +30,16 @@ class IngestDocumentUseCase:
         if not path.exists():
             return {"status": "error", "error": f"File not found: {path}"}
             
+        start = time.perf_counter()
+        result = await self._ingest(path, parser_type)
+        status = result.get("status", "error")
+        _ingest_latency.observe(time.perf_counter() - start, status=status)
+        if status == "success":
+            _ingest_chunks.inc(result.get("added_count", len(result.get("ids", []))))
+        return result
+
+    async def _ingest(self, path: Path, parser_type: ParserType) -> Dict[str, Any]:
         if parser_type == ParserType.AUTO:
-            import asyncio
             parser_type = await asyncio.to_thread(detect_best_parser, str(path))
             
         try:
@@ -1,8 +1,14 @@
 """Hybrid Search Use Case with CRAG support."""
 
-from typing import List, Optional
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import contextlib
+import copy
 import logging
+import time
 
+from advence_rag.application.fusion import RRF_K, fuse, reciprocal_rank_fusion
 from advence_rag.domain.entities import SearchResult
 from advence_rag.domain.interfaces import (
     KnowledgeBaseRepository, 
@@ -10,6 +16,10 @@ from advence_rag.domain.interfaces import (
     WebSearchService,
 )
 from advence_rag.config import get_settings
+from advence_rag.utils.cache import TTLCache, normalize_query
+from advence_rag.utils.index_version import IndexVersionLog
+from advence_rag.utils.metrics import get_metrics
+from advence_rag.utils.tracing import span
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -18,8 +28,47 @@ settings = get_settings()
 # CRAG Quality Threshold: Cross-Encoder scores > 0 usually indicate relevance
 CRAG_QUALITY_THRESHOLD = 0.0
 
-# RRF Constant: Standard value for Reciprocal Rank Fusion
-RRF_K = 60
+# Candidate pool multipliers: fixed mode always fetches FULL, adaptive starts at MIN
+POOL_MULTIPLIER_FULL = 4
+POOL_MULTIPLIER_MIN = 2
+
+# Adaptive mode: top-k overlap between legs above HIGH (or above LOW with a clear
+# fused score gap at the cut-off) counts as confident; below LOW the pool is widened
+ADAPTIVE_AGREEMENT_HIGH = 0.8
+ADAPTIVE_AGREEMENT_LOW = 0.4
+ADAPTIVE_MIN_SCORE_GAP = 0.1
+
+_stage_latency = get_metrics().histogram(
+    "retrieval_duration_seconds", "HybridSearchUseCase.execute latency by stage (total, legs, fusion, rerank, web_search)", ["stage"]
+)
+
+
+@contextlib.contextmanager
+def _timed(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stage_latency.observe(time.perf_counter() - start, stage=stage)
+
+
+@dataclass
+class RetrievalStats:
+    """Counters for the result cache, failed legs and adaptive pool sizing."""
+    cache_hits: int = 0
+    cache_misses: int = 0
+    leg_failures: int = 0
+    queries: int = 0
+    pools_widened: int = 0
+    rerank_skipped: int = 0
+    rerank_truncated: int = 0
+    candidates_fetched: int = 0
+    candidates_fetch_saved: int = 0
+    candidates_reranked: int = 0
+    candidates_rerank_saved: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
 
 
 class HybridSearchUseCase:
@@ -30,10 +79,25 @@ class HybridSearchUseCase:
         kb_repo: KnowledgeBaseRepository, 
         reranker: RerankerService,
         web_search: Optional[WebSearchService] = None,
+        leg_timeout: Optional[float] = None,
+        pool_mode: Optional[str] = None,
+        index_versions: Optional[IndexVersionLog] = None,
+        cache_size: Optional[int] = None,
     ):
         self.kb_repo = kb_repo
         self.reranker = reranker
         self.web_search = web_search
+        self.leg_timeout = leg_timeout if leg_timeout is not None else settings.retrieval_leg_timeout
+        self.pool_mode = pool_mode or settings.retrieval_pool_mode
+        self.stats = RetrievalStats()
+        # Results keyed on (normalized query, top_k, CRAG, index generation)
+        self.index_versions = index_versions
+        cache_size = cache_size if cache_size is not None else settings.search_cache_size
+        self.result_cache = (
+            TTLCache(max_entries=cache_size, ttl=settings.search_cache_ttl)
+            if settings.search_cache_enabled and cache_size > 0
+            else None
+        )
 
     async def execute(
         self, 
@@ -51,48 +115,226 @@ class HybridSearchUseCase:
         Returns:
             List of ranked SearchResult objects
         """
-        # Resolve CRAG enablement
-        crag_enabled = enable_crag if enable_crag is not None else settings.crag_enabled
-        
-        # 1. Hybrid Search (Vector + BM25)
-        # We fetch more than top_k to have a good pool for RRF and Reranking
-        fetch_k = top_k * 4
+        with span("retrieval", top_k=top_k), _timed("total"):
+            # Resolve CRAG enablement
+            crag_enabled = enable_crag if enable_crag is not None else settings.crag_enabled
         
-        vector_results = await self.kb_repo.search_similar(query, top_k=fetch_k)
-        keyword_results = await self.kb_repo.search_keyword(query, top_k=fetch_k)
+            # 0. Result cache: a write to the index bumps the generation and so misses
+            cache_key = None
+            generation = await self._index_generation() if self.result_cache is not None else None
+            if generation is not None:
+                cache_key = (normalize_query(query), top_k, crag_enabled, generation)
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    self.stats.cache_hits += 1
+                    return [copy.copy(res) for res in cached]
+                self.stats.cache_misses += 1
         
-        # 2. Merge using Reciprocal Rank Fusion (RRF)
-        # This provides a balanced ranking between vector (semantic) and keyword (exact) results
-        merged = self._reciprocal_rank_fusion(
-            [vector_results, keyword_results], 
-            top_k=fetch_k
-        )
+            needs_scores = bool(crag_enabled and self.web_search)
         
-        # 3. Rerank
-        if merged:
-            reranked = await self.reranker.rerank(query, merged, top_k=top_k)
-        else:
-            reranked = []
+            if self.pool_mode == "adaptive":
+                # 1-3. Pool size and rerank depth chosen per query
+                reranked, degraded = await self._adaptive_search(query, top_k, needs_scores)
+            else:
+                # 1. Hybrid Search (Vector + BM25)
+                # We fetch more than top_k to have a good pool for RRF and Reranking
+                fetch_k = top_k * POOL_MULTIPLIER_FULL
+            
+                # Legs run concurrently, so latency is the slowest leg (capped by the timeout)
+                leg_results, degraded = await self._run_legs(self._retrieval_legs(query, fetch_k))
+            
+                # 2. Merge using rank fusion (weighted RRF by default)
+                # This provides a balanced ranking between vector (semantic) and keyword (exact) results
+                merged = self._fuse(leg_results, top_k=fetch_k)
+            
+                # 3. Rerank
+                if merged:
+                    reranked = await self._rerank(query, merged, top_k)
+                else:
+                    reranked = []
         
-        # 4. CRAG: Evaluate quality and fallback to web search if needed
-        if crag_enabled and self.web_search:
-            quality_score = self._evaluate_quality(reranked)
+            # 4. CRAG: Evaluate quality and fallback to web search if needed
+            if crag_enabled and self.web_search:
+                quality_score = self._evaluate_quality(reranked)
             
-            if quality_score < CRAG_QUALITY_THRESHOLD:
-                logger.info(f"CRAG triggered: KB quality score {quality_score:.2f} < threshold {CRAG_QUALITY_THRESHOLD}")
-                web_results = await self.web_search.search(query, num_results=top_k)
-                
-                # Merge web results with KB results
-                for web_res in web_results:
-                    if web_res.id not in seen_ids:
-                        seen_ids.add(web_res.id)
-                        reranked.append(web_res)
+                if quality_score < CRAG_QUALITY_THRESHOLD:
+                    logger.info(f"CRAG triggered: KB quality score {quality_score:.2f} < threshold {CRAG_QUALITY_THRESHOLD}")
+                    with span("web_search"), _timed("web_search"):
+                        web_results = await self.web_search.search(query, num_results=top_k)
                 
-                # Limit to top_k after merging
-                reranked = reranked[:top_k]
+                    reranked = self._merge_web_results(reranked, web_results, top_k)
         
-        return reranked
+            # Degraded results (a leg failed or timed out) are not worth keeping
+            if cache_key is not None and not degraded:
+                self.result_cache.set(cache_key, [copy.copy(res) for res in reranked])
+        
+            return reranked
+    
+    async def _index_generation(self) -> Optional[int]:
+        """Current index generation (0 without a version log), None if it cannot be read."""
+        if self.index_versions is None:
+            return 0
+        try:
+            return await asyncio.to_thread(self.index_versions.generation)
+        except Exception as e:
+            logger.warning(f"Could not read index generation, bypassing the result cache: {e}")
+            return None
     
+    async def _adaptive_search(
+        self, query: str, top_k: int, needs_scores: bool
+    ) -> Tuple[List[SearchResult], bool]:
+        """Hybrid search whose candidate pool and rerank depth follow the query.
+        
+        Starts with a small pool; widens it to the full pool when the legs
+        disagree on the top-k (and the latency budget allows). When the
+        fused ranking is confident, reranking is skipped (or limited to the
+        top-k if CRAG needs rerank scores). Over budget, only the top-k is
+        reranked.
+        
+        Returns the results and whether a retrieval leg failed in either
+        round.
+        """
+        start = time.perf_counter()
+        budget = settings.retrieval_latency_budget_ms / 1000.0
+        stats = self.stats
+        stats.queries += 1
+        
+        fetch_k = top_k * POOL_MULTIPLIER_MIN
+        leg_results, degraded = await self._run_legs(self._retrieval_legs(query, fetch_k))
+        stats.candidates_fetched += sum(len(results) for results in leg_results.values())
+        agreement = self._leg_agreement(leg_results, top_k)
+        
+        if agreement < ADAPTIVE_AGREEMENT_LOW and time.perf_counter() - start < budget / 2:
+            fetch_k = top_k * POOL_MULTIPLIER_FULL
+            wider, wider_degraded = await self._run_legs(self._retrieval_legs(query, fetch_k))
+            stats.candidates_fetched += sum(len(results) for results in wider.values())
+            leg_results = self._merge_rounds(leg_results, wider)
+            degraded = degraded or wider_degraded
+            agreement = self._leg_agreement(leg_results, top_k)
+            stats.pools_widened += 1
+        else:
+            stats.candidates_fetch_saved += (top_k * POOL_MULTIPLIER_FULL - fetch_k) * len(leg_results)
+        
+        merged = self._fuse(leg_results, top_k=fetch_k)
+        if not merged:
+            return [], degraded
+        
+        gap = self._score_gap(merged, top_k)
+        confident = agreement >= ADAPTIVE_AGREEMENT_HIGH or (
+            agreement >= ADAPTIVE_AGREEMENT_LOW and gap >= ADAPTIVE_MIN_SCORE_GAP
+        )
+        over_budget = time.perf_counter() - start >= budget
+        
+        if confident and not needs_scores:
+            pool = []
+            stats.rerank_skipped += 1
+        elif confident or over_budget:
+            pool = merged[:top_k]
+            stats.rerank_truncated += 1
+        else:
+            pool = merged
+        stats.candidates_reranked += len(pool)
+        stats.candidates_rerank_saved += len(merged) - len(pool)
+        logger.debug(
+            f"Adaptive retrieval: fetch_k={fetch_k}, agreement={agreement:.2f}, gap={gap:.2f}, "
+            f"reranking {len(pool)}/{len(merged)} candidates"
+        )
+        
+        if not pool:
+            return merged[:top_k], degraded
+        return await self._rerank(query, pool, top_k), degraded
+
+    async def _rerank(self, query: str, pool: List[SearchResult], top_k: int) -> List[SearchResult]:
+        with span("rerank", candidates=len(pool)), _timed("rerank"):
+            return await self.reranker.rerank(query, pool, top_k=top_k)
+
+    @staticmethod
+    def _merge_rounds(
+        first: Dict[str, List[SearchResult]], second: Dict[str, List[SearchResult]]
+    ) -> Dict[str, List[SearchResult]]:
+        """Per leg, the wider round followed by first-round hits it lacks (e.g. the leg failed the second time)."""
+        merged = {}
+        for name in [*second, *(name for name in first if name not in second)]:
+            results = list(second.get(name, []))
+            seen = {r.id for r in results}
+            results.extend(r for r in first.get(name, []) if r.id not in seen)
+            merged[name] = results
+        return merged
+
+    @staticmethod
+    def _leg_agreement(leg_results: Dict[str, List[SearchResult]], top_k: int) -> float:
+        """Mean pairwise overlap of the legs' top-k IDs (0 when fewer than two legs answered)."""
+        tops = [{r.id for r in results[:top_k]} for results in leg_results.values() if results]
+        if len(tops) < 2:
+            return 0.0
+        overlaps = [
+            len(a & b) / max(1, min(top_k, len(a), len(b)))
+            for i, a in enumerate(tops) for b in tops[i + 1:]
+        ]
+        return sum(overlaps) / len(overlaps)
+
+    @staticmethod
+    def _score_gap(merged: List[SearchResult], top_k: int) -> float:
+        """Relative fused score drop between the k-th and (k+1)-th candidate."""
+        if len(merged) <= top_k or not merged[0].score:
+            return 1.0
+        return (merged[top_k - 1].score - merged[top_k].score) / merged[0].score
+
+    def _retrieval_legs(self, query: str, fetch_k: int) -> Dict[str, Awaitable[List[SearchResult]]]:
+        """Retrieval legs to fan out, keyed by name. Add new legs (web, metadata...) here."""
+        return {
+            "vector": self.kb_repo.search_similar(query, top_k=fetch_k),
+            "keyword": self.kb_repo.search_keyword(query, top_k=fetch_k),
+        }
+
+    async def _run_legs(
+        self, legs: Dict[str, Awaitable[List[SearchResult]]]
+    ) -> Tuple[Dict[str, List[SearchResult]], bool]:
+        """Run retrieval legs concurrently.
+        
+        A leg that fails or exceeds ``leg_timeout`` contributes an empty list,
+        so the remaining legs still produce a (degraded) result.
+        
+        Returns the results per leg and whether any leg failed in this call
+        (``stats.leg_failures`` is shared by concurrent requests).
+        """
+        failed: List[str] = []
+
+        async def run(name: str, leg: Awaitable[List[SearchResult]]) -> List[SearchResult]:
+            start = time.perf_counter()
+            with span(f"retrieval.{name}") as current, _timed(name):
+                try:
+                    return await asyncio.wait_for(leg, timeout=self.leg_timeout)
+                except asyncio.TimeoutError:
+                    failed.append(name)
+                    self.stats.leg_failures += 1
+                    logger.warning(f"Retrieval leg '{name}' timed out after {self.leg_timeout}s, continuing without it")
+                except Exception as e:
+                    failed.append(name)
+                    self.stats.leg_failures += 1
+                    logger.error(f"Retrieval leg '{name}' failed: {e}, continuing without it")
+                finally:
+                    logger.debug(f"Retrieval leg '{name}' took {time.perf_counter() - start:.3f}s")
+                if current is not None:
+                    current.attributes["failed"] = True
+                return []
+
+        results = await asyncio.gather(*(run(name, leg) for name, leg in legs.items()))
+        return dict(zip(legs, results)), bool(failed)
+
+    def _fuse(self, leg_results: Dict[str, List[SearchResult]], top_k: int) -> List[SearchResult]:
+        """Fuse leg results with the configured method and per-leg weights."""
+        weights = settings.fusion_weights
+        with span("fusion"), _timed("fusion"):
+            return fuse(
+                list(leg_results.values()),
+                method=settings.fusion_method,
+                weights=[weights.get(name, 1.0) for name in leg_results],
+                top_k=top_k,
+                k=RRF_K,
+                normalization=settings.fusion_normalization,
+            )
+
     def _evaluate_quality(self, results: List[SearchResult]) -> float:
         """Evaluate the quality of search results.
         
@@ -102,6 +344,26 @@ class HybridSearchUseCase:
             return -999.0
         return results[0].score if results[0].score is not None else -999.0
 
+    @staticmethod
+    def _merge_web_results(
+        kb_results: List[SearchResult], web_results: List[SearchResult], top_k: int
+    ) -> List[SearchResult]:
+        """Merge CRAG web results into the reranked KB results, keeping ``top_k``.
+        
+        Web results go after the KB hits that pass the relevance threshold and
+        ahead of those that do not, so they survive the cut even when the KB
+        returned ``top_k`` (poor) hits.
+        """
+        relevant = [res for res in kb_results if res.score is not None and res.score >= CRAG_QUALITY_THRESHOLD]
+        irrelevant = [res for res in kb_results if res.score is None or res.score < CRAG_QUALITY_THRESHOLD]
+        seen_ids = {res.id for res in kb_results}
+        web = []
+        for web_res in web_results:
+            if web_res.id not in seen_ids:
+                seen_ids.add(web_res.id)
+                web.append(web_res)
+        return (relevant + web + irrelevant)[:top_k]
+
     def _reciprocal_rank_fusion(
         self, 
         ranked_lists: List[List[SearchResult]], 
@@ -111,30 +373,9 @@ class HybridSearchUseCase:
         """Perform Reciprocal Rank Fusion on multiple ranked lists.
         
         Formula: score = sum( 1 / (k + rank) )
+        Returns copies carrying the RRF score; the inputs are not modified.
         """
-        rrf_scores = {}  # doc_id -> score
-        doc_map = {}     # doc_id -> SearchResult template
-        
-        for ranked_list in ranked_lists:
-            for rank, doc in enumerate(ranked_list, 1):
-                doc_id = doc.id
-                if doc_id not in doc_map:
-                    doc_map[doc_id] = doc
-                    
-                score = 1.0 / (k + rank)
-                rrf_scores[doc_id] = rrf_scores.get(doc_id, 0.0) + score
-        
-        # Sort by RRF score descending
-        sorted_ids = sorted(rrf_scores.keys(), key=lambda x: rrf_scores[x], reverse=True)
-        
-        results = []
-        for doc_id in sorted_ids[:top_k]:
-            doc = doc_map[doc_id]
-            # Update score to RRF score (though it will be overridden by reranker later)
-            doc.score = rrf_scores[doc_id]
-            results.append(doc)
-            
-        return results
+        return reciprocal_rank_fusion(ranked_lists, k=k, top_k=top_k)
 
     def format_for_llm(self, query: str, results: List[SearchResult]) -> str:
         """Format search results for LLM consumption.
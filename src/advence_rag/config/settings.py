@@ -1,10 +1,11 @@
 """Application settings using Pydantic Settings."""
 
+import math
 from functools import lru_cache
 from pathlib import Path
 from typing import Literal, Optional
 
-from pydantic import Field
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 # 找到專案根目錄的 .env 檔案
@@ -12,6 +13,25 @@ _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
 _ENV_FILE = _PROJECT_ROOT / ".env"
 
 
+def _parse_fusion_weights(value: str) -> dict[str, float]:
+    """Parse 'leg=weight' pairs; raise ValueError on a malformed pair or a negative weight."""
+    weights = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, sep, weight = item.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"expected 'leg=weight', got {item.strip()!r}")
+        try:
+            parsed = float(weight)
+        except ValueError:
+            raise ValueError(f"weight for {name.strip()!r} is not a number: {weight.strip()!r}") from None
+        if not math.isfinite(parsed) or parsed < 0:
+            raise ValueError(f"weight for {name.strip()!r} must be a finite number >= 0, got {parsed}")
+        weights[name.strip()] = parsed
+    return weights
+
+
 class Settings(BaseSettings):
     """Application configuration loaded from environment variables."""
 
@@ -27,6 +47,27 @@ class Settings(BaseSettings):
     google_search_cse_id: str = Field(default="", description="Google Custom Search Engine ID")
     serper_api_key: str = Field(default="", description="Serper.dev API Key")
     search_provider: Literal["google", "serper"] = Field(default="serper", description="Primary search provider")
+    search_mode: Literal["sequential", "hedged", "parallel"] = Field(default="sequential", description="sequential: fall back on failure; hedged: start the secondary provider after search_hedge_delay_ms; parallel: query both at once")
+    search_hedge_delay_ms: float = Field(default=1500.0, ge=0.0, description="Hedged mode: how long the primary provider may run before the secondary is started")
+    search_adaptive_primary: bool = Field(default=True, description="Make the provider with the lower median latency the primary")
+    web_cache_enabled: bool = Field(default=True, description="Cache successful web search results in data/cache/web_results.sqlite")
+    web_cache_ttl: int = Field(default=3600, description="Seconds a cached web result is fresh")
+    web_cache_stale_ttl: int = Field(default=24 * 3600, description="Seconds after web_cache_ttl a stale result is still served while it is refreshed in the background")
+    web_cache_max_entries: int = Field(default=5000, ge=1, description="Max cached web results (LRU eviction)")
+    web_fetch_enabled: bool = Field(default=False, description="CRAG: download the top web results and use reranked page passages instead of snippets")
+    web_fetch_top_n: int = Field(default=3, ge=1, description="Number of result pages to download")
+    web_fetch_concurrency: int = Field(default=4, ge=1, description="Max concurrent page downloads")
+    web_fetch_timeout_ms: float = Field(default=3000.0, gt=0, description="Per-page download timeout")
+    web_fetch_budget_ms: float = Field(default=5000.0, gt=0, description="Time budget for the whole page fetch stage; unfinished pages keep their snippet")
+    web_fetch_max_bytes: int = Field(default=2_000_000, ge=1024, description="Max bytes read per page")
+    web_fetch_max_chunks_per_page: int = Field(default=8, ge=1, description="Max passages per page sent to the reranker")
+    web_chunk_size: int = Field(default=800, ge=100, description="Max characters per web page passage")
+    web_chunk_overlap: int = Field(default=100, ge=0, description="Characters shared by consecutive passages")
+    http2_enabled: bool = Field(default=True, description="Use HTTP/2 for web search APIs when h2 is installed (pip install 'advence-rag[http2]')")
+    http_max_connections: int = Field(default=20, ge=1, description="Max open connections per web search provider")
+    http_max_keepalive_connections: int = Field(default=10, ge=0, description="Idle keep-alive connections kept per provider")
+    http_keepalive_expiry: float = Field(default=30.0, ge=0.0, description="Seconds an idle connection is kept open")
+    http_timeout: float = Field(default=10.0, gt=0, description="Default web request timeout in seconds")
 
     # LLM Settings
     llm_model: str = Field(default="gemini-2.5-flash-lite", description="LLM model name")
@@ -36,6 +77,24 @@ class Settings(BaseSettings):
     embedding_type: Literal["cloud", "local"] = Field(default="cloud", description="Type of embedding engine to use")
     embedding_model: str = Field(default="models/text-embedding-004", description="Model name (Gemini model for cloud, HuggingFace path for local)")
     local_embedding_device: str = Field(default="cpu", description="Device to run local embeddings on (cpu, cuda)")
+    gemini_embedding_chunk_size: int = Field(default=100, ge=1, description="Max texts per Gemini embed_content request")
+    gemini_embedding_concurrency: int = Field(default=4, ge=1, description="Max concurrent Gemini embedding requests")
+    gemini_embedding_rpm: int = Field(default=1500, ge=1, description="Gemini embedding requests per minute (token bucket)")
+    gemini_embedding_max_retries: int = Field(default=5, ge=0, description="Retries per chunk on 429/503")
+    embedding_batch_max_size: int = Field(default=32, description="Max concurrent embed_text calls coalesced into one batch (1 disables micro-batching)")
+    embedding_batch_max_wait_ms: float = Field(default=5.0, ge=0.0, description="How long a micro-batch waits for more embed_text calls")
+    embedding_cache_enabled: bool = Field(default=True, description="Cache embeddings keyed on (model, normalized text)")
+    embedding_cache_size: int = Field(default=10000, description="Max embeddings kept in the in-process LRU")
+    embedding_cache_ttl: int = Field(default=7 * 24 * 3600, description="Embedding cache TTL in seconds")
+    embedding_cache_persistent: bool = Field(default=True, description="Also keep embeddings in a SQLite file under data/cache shared by workers")
+    embedding_store_enabled: bool = Field(default=True, description="Reuse stored embeddings of unchanged chunks on re-ingest (content-hash store under data/cache)")
+    embedding_store_max_entries: int = Field(default=1000000, description="Max chunk embeddings kept in the content-hash store")
+    embedding_cache_persistent_max_entries: int = Field(default=200000, description="Max embeddings kept in the SQLite cache (LRU eviction)")
+
+    answer_cache_enabled: bool = Field(default=False, description="Answer near-duplicate single-turn chat questions from a semantic cache")
+    answer_cache_threshold: float = Field(default=0.95, ge=0.0, le=1.0, description="Min cosine similarity between questions for an answer cache hit")
+    answer_cache_size: int = Field(default=1000, ge=1, description="Max answers kept in the semantic answer cache (LRU eviction)")
+    answer_cache_ttl: int = Field(default=24 * 3600, description="Answer cache TTL in seconds")
 
     # Vector Database Settings
     vector_db_type: Literal["chroma", "qdrant"] = Field(default="chroma", description="Type of vector database to use")
@@ -51,6 +110,13 @@ class Settings(BaseSettings):
 
     # Rerank Model
     rerank_model: str = Field(default="cross-encoder/ms-marco-MiniLM-L-6-v2")
+    rerank_backend: Literal["torch", "onnx"] = Field(default="torch", description="Reranker runtime: torch (sentence-transformers CrossEncoder) or onnx (onnxruntime, no PyTorch)")
+    rerank_onnx_file: str = Field(default="onnx/model_quint8_avx2.onnx", description="ONNX file inside the rerank model repo/directory (e.g. onnx/model.onnx for fp32)")
+    rerank_num_threads: int = Field(default=0, ge=0, description="Intra-op threads for reranker inference (0 = runtime default)")
+    rerank_batch_size: int = Field(default=16, ge=1, description="Pairs per cross-encoder forward pass")
+    rerank_max_length: int = Field(default=256, ge=16, description="Max tokens per (query, chunk) pair; longer chunks are truncated")
+    rerank_cache_size: int = Field(default=4096, ge=0, description="Max cached (query, doc id, content hash) rerank scores")
+    rerank_skip_small_pool: bool = Field(default=False, description="Skip the model when there are no more candidates than top_k (results keep fused scores; CRAG then sees no rerank score)")
 
     # Guard Agent
     guard_enabled: bool = Field(default=True)
@@ -63,6 +129,18 @@ class Settings(BaseSettings):
             return []
         return [p.strip() for p in self.guard_sensitive_patterns_str.split(",") if p.strip()]
 
+    @property
+    def fusion_weights(self) -> dict[str, float]:
+        """Parse 'leg=weight' pairs into a dict."""
+        return _parse_fusion_weights(self.fusion_weights_str)
+
+    @field_validator("fusion_weights_str")
+    @classmethod
+    def _validate_fusion_weights(cls, value: str) -> str:
+        # Fail at startup rather than on the first hybrid search
+        _parse_fusion_weights(value)
+        return value
+
     # Scheduler
     scheduler_enabled: bool = Field(default=True)
     scheduler_timezone: str = Field(default="Asia/Taipei")
@@ -70,14 +148,31 @@ class Settings(BaseSettings):
     # Retrieval Settings
     retrieval_top_k: int = Field(default=10)
     rerank_top_k: int = Field(default=5)
+    fusion_method: Literal["rrf", "combsum", "combmnz"] = Field(default="rrf", description="Hybrid fusion: weighted RRF, or CombSUM/CombMNZ over normalized leg scores")
+    fusion_normalization: Literal["minmax", "zscore"] = Field(default="minmax", description="Score normalization for combsum/combmnz")
+    fusion_weights_str: str = Field(default="", alias="fusion_weights", description="Per-leg fusion weights, e.g. 'vector=1.0,keyword=0.5' (default 1.0)")
+    search_cache_enabled: bool = Field(default=True, description="Cache hybrid search results per (normalized query, top_k, index generation)")
+    search_cache_size: int = Field(default=512, ge=0, description="Max cached search results (LRU eviction)")
+    search_cache_ttl: int = Field(default=300, description="Search result cache TTL in seconds (bounds staleness of CRAG web results)")
+    retrieval_pool_mode: Literal["fixed", "adaptive"] = Field(default="fixed", description="fixed: fetch and rerank top_k*4 per leg; adaptive: size the pool and rerank depth per query from leg agreement")
+    retrieval_latency_budget_ms: float = Field(default=800.0, gt=0, description="Adaptive mode latency budget for retrieval + reranking")
+    retrieval_leg_timeout: float = Field(default=5.0, gt=0, description="Timeout in seconds for each hybrid retrieval leg (vector, keyword); a leg that times out is dropped from fusion")
+
+    # BM25 Analyzer (changing these requires running utils/rebuild_bm25.py)
+    bm25_analyzer: Literal["standard", "whitespace"] = Field(default="standard", description="standard (CJK segmentation + English stemming) or whitespace (legacy lower().split())")
+    bm25_cjk_segmenter: Literal["bigram", "jieba"] = Field(default="bigram", description="CJK segmentation: overlapping bigrams, or jieba dictionary words if installed")
+    bm25_stemming: bool = Field(default=True, description="Apply a light English stemmer")
+    bm25_stopwords: bool = Field(default=True, description="Drop English stop words")
 
     # Processing Settings
     max_reflection_iterations: int = Field(default=3)
     max_agent_iterations: int = Field(default=5, description="Maximum iterations between agents (e.g., writer <-> orchestrator)")
     
     # Workflow Settings
-    rag_pipeline_mode: Literal["simple", "full"] = Field(default="simple", description="RAG pipeline mode: simple (Search->Review->Write) or full (Planner->Search->ReviewLoop->Write)")
+    rag_pipeline_mode: Literal["simple", "full", "direct"] = Field(default="simple", description="RAG pipeline mode: simple (Search->Review->Write), full (Planner->Search->ReviewLoop->Write) or direct (in-process retrieval -> Write, one LLM call, no orchestrator)")
     crag_enabled: bool = Field(default=True, description="Enable CRAG (Corrective RAG) web fallback when knowledge base results are insufficient")
+    intent_router_enabled: bool = Field(default=False, description="Route greetings and clear single-turn knowledge questions with local rules, skipping the orchestrator/search/reviewer LLM turns")
+    intent_router_min_confidence: float = Field(default=0.8, ge=0.0, le=1.0, description="Min rule confidence for a question to take the retrieval + writer fast path")
 
     @property
     def data_dir(self) -> Path:
@@ -100,6 +195,9 @@ class Settings(BaseSettings):
 
     # Logging
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = Field(default="INFO")
+    tracing_enabled: bool = Field(default=True, description="Log per-request stage timings (agents, tools, retrieval legs, rerank, first/last token) as one 'Request trace' record")
+    tracing_otel_enabled: bool = Field(default=False, description="Also replay request traces into the OpenTelemetry tracer provider (pip install 'advence-rag[otel]')")
+    metrics_enabled: bool = Field(default=True, description="Expose Prometheus metrics on GET /metrics")
 
 
 @lru_cache
@@ -1,6 +1,9 @@
 from typing import List, Dict, Any, Optional
+import asyncio
+import time
 import uuid
 import logging
+import weakref
 from dataclasses import dataclass, field
 
 from google.adk import Runner
@@ -9,12 +12,25 @@ from advence_rag.infrastructure.persistence.file_session_service import FileSess
 from google.genai import types
 
 from advence_rag.domain.interfaces import LLMAgentService
+from advence_rag.infrastructure.ai.answer_cache import SemanticAnswerCache, collect_citations
+from advence_rag.infrastructure.ai.intent_router import IntentRouter, LLM_CALLS_BEFORE_WRITER, LLM_CALLS_GREETING
 from advence_rag.agent import root_agent
+from advence_rag.config import get_settings
+from advence_rag.utils.metrics import get_metrics
 from advence_rag.utils.retry import retry_with_backoff
+from advence_rag.utils.tracing import Span, Trace, finish_trace, span, start_trace
+from advence_rag.workflows.rag_pipeline import build_direct_pipeline
 from google.adk.agents.run_config import RunConfig, StreamingMode
 
 # Setup logger (inherits from centralized log_config)
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Only this agent's text is an answer to the question (others clarify, refuse or review)
+ANSWER_AUTHOR = "writer_agent"
+
+_chat_latency = get_metrics().histogram("chat_duration_seconds", "Chat request latency (until the last streamed chunk)", ["route"])
+_chat_ttft = get_metrics().histogram("chat_ttft_seconds", "Time to the first answer token", ["route"])
 
 
 @dataclass
@@ -25,6 +41,16 @@ class ToolExecution:
     arguments: str = ""
     result_summary: str = ""
     error: str = ""
+    started_at: float = field(default_factory=time.perf_counter)
+    duration_ms: Optional[float] = None
+    span: Optional[Span] = field(default=None, repr=False)
+
+    def finish(self, trace: Optional[Trace]):
+        """記錄耗時並結束對應的 span"""
+        self.duration_ms = (time.perf_counter() - self.started_at) * 1000
+        if trace is not None and self.span is not None:
+            self.span.attributes["status"] = self.status
+            trace.end_span(self.span)
 
 
 @dataclass
@@ -33,10 +59,25 @@ class ExecutionContext:
     session_id: str
     tool_executions: List[ToolExecution] = field(default_factory=list)
     errors: List[str] = field(default_factory=list)
+    trace: Optional[Trace] = None  # 各 agent / 工具的時間軸
+    current_agent: Optional[str] = None
+    agent_span: Optional[Span] = field(default=None, repr=False)
+    
+    def enter_agent(self, author: str):
+        """記錄 agent 切換（每位 agent 一個 span）"""
+        self.current_agent = author
+        if self.trace is None:
+            return
+        if self.agent_span is not None:
+            self.trace.end_span(self.agent_span)
+        self.agent_span = self.trace.start_span(f"agent.{author}")
     
     def add_tool_call(self, name: str, arguments: str = "") -> ToolExecution:
         """記錄新的工具呼叫"""
         execution = ToolExecution(name=name, arguments=arguments)
+        if self.trace is not None:
+            parent_id = self.agent_span.span_id if self.agent_span is not None else None
+            execution.span = self.trace.start_span(f"tool.{name}", parent_id, start=execution.started_at)
         self.tool_executions.append(execution)
         return execution
     
@@ -46,6 +87,7 @@ class ExecutionContext:
             if exec.name == name and exec.status == "pending":
                 exec.status = "success"
                 exec.result_summary = result_summary
+                exec.finish(self.trace)
                 break
     
     def mark_tool_error(self, name: str, error: str):
@@ -54,6 +96,7 @@ class ExecutionContext:
             if exec.name == name and exec.status == "pending":
                 exec.status = "error"
                 exec.error = error
+                exec.finish(self.trace)
                 self.errors.append(f"{name}: {error}")
                 break
     
@@ -101,10 +144,11 @@ class ExecutionContext:
             logger.info("  (無工具執行記錄)")
         
         for exec in self.tool_executions:
+            took = f" ({exec.duration_ms:.0f} ms)" if exec.duration_ms is not None else ""
             if exec.status == "success":
-                logger.info(f"✅ {exec.name}: 成功 {exec.result_summary}")
+                logger.info(f"✅ {exec.name}: 成功 {exec.result_summary}{took}")
             elif exec.status == "error":
-                logger.error(f"❌ {exec.name}: 失敗 - {exec.error}")
+                logger.error(f"❌ {exec.name}: 失敗 - {exec.error}{took}")
             else:
                 logger.warning(f"⏳ {exec.name}: 進行中")
         
@@ -119,10 +163,122 @@ class ExecutionContext:
 class OrchestratorAgentService(LLMAgentService):
     """Infrastructure implementation of LLMAgentService using the ADK Orchestrator."""
     
-    def __init__(self, session_service: Optional[InMemorySessionService] = None):
+    def __init__(
+        self,
+        session_service: Optional[InMemorySessionService] = None,
+        answer_cache: Optional[SemanticAnswerCache] = None,
+        intent_router: Optional[IntentRouter] = None,
+    ):
         self.session_service = session_service or InMemorySessionService()
+        self.answer_cache = answer_cache
+        self.intent_router = intent_router
 
         self.app_name = "advence_rag"
+        # One long-lived runner: it holds no per-request state (each run_async call
+        # gets its own invocation context), so concurrent sessions can share it
+        self._runner: Optional[Runner] = None
+        self._direct_runner: Optional[Runner] = None  # Fast path: retrieval + writer
+        # Runs of the same session are serialized so their events do not interleave
+        self._session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def _get_runner(self) -> Runner:
+        if self._runner is None:
+            self._runner = Runner(
+                agent=root_agent,
+                app_name=self.app_name,
+                session_service=self.session_service
+            )
+        return self._runner
+
+    def _get_direct_runner(self) -> Runner:
+        if self._direct_runner is None:
+            self._direct_runner = Runner(
+                agent=build_direct_pipeline(),
+                app_name=self.app_name,
+                session_service=self.session_service
+            )
+        return self._direct_runner
+
+    def _session_lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._session_locks.get(session_id)
+        if lock is None:
+            lock = self._session_locks[session_id] = asyncio.Lock()
+        return lock
+
+    async def _ensure_session(self, user_id: str, session_id: str):
+        """Create the session unless it exists (retries and follow-up turns reuse it)."""
+        session = await self.session_service.get_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id
+        )
+        if session is None:
+            await self.session_service.create_session(
+                app_name=self.app_name,
+                user_id=user_id,
+                session_id=session_id
+            )
+
+    async def aclose(self):
+        """Release the runners' toolsets (call on application shutdown)."""
+        runners = [r for r in (self._runner, self._direct_runner) if r is not None]
+        self._runner = self._direct_runner = None
+        for runner in runners:
+            await runner.close()
+
+    @staticmethod
+    def _finish_trace(trace: Trace, route: str, **attributes):
+        """End the request trace: latency metrics always, log/export when tracing is enabled."""
+        trace.root.attributes.update(route=route, **attributes)
+        if settings.tracing_enabled:
+            finish_trace(trace, otel=settings.tracing_otel_enabled)
+        else:
+            trace.finish()
+        _chat_latency.observe(trace.root.end - trace.root.start, route=route)
+        if "first_token" in trace.marks:
+            _chat_ttft.observe(trace.marks["first_token"] - trace.root.start, route=route)
+
+    @staticmethod
+    def _immediate_reply(answer: str, stream: bool, **fields) -> Any:
+        """Reply without running any agent, in the shapes chat() returns."""
+        if stream:
+            async def reply_stream():
+                yield answer
+            return reply_stream()
+        return {"answer": answer, "citations": [], "tool_executions": [], **fields}
+
+    @staticmethod
+    def _cacheable_question(messages: List[Dict[str, str]]) -> Optional[str]:
+        """The question of a single-turn chat; follow-ups depend on history and are not cached."""
+        if messages[-1].get("role") != "user":
+            return None
+        if any(msg.get("role") != "system" for msg in messages[:-1]):
+            return None
+        return messages[-1]["content"]
+
+    async def _cached_answer(self, question: Optional[str]):
+        """(cached answer or None, index generation to store a fresh answer under)."""
+        if self.answer_cache is None or not question:
+            return None, None
+        try:
+            cached = await self.answer_cache.lookup(question)
+            # Read before answering so writes made meanwhile invalidate the new entry
+            generation = None if cached is not None else await self.answer_cache.index_generation()
+            return cached, generation
+        except Exception as e:
+            logger.warning(f"Answer cache lookup failed: {e}")
+            return None, None
+
+    async def _cache_answer(self, question: Optional[str], answer: str, citations, generation: Optional[int]):
+        """Store a writer answer grounded in retrieved chunks.
+
+        Clarification prompts, guard refusals and answers without citations
+        are not cached: they are not answers to the question's paraphrases.
+        """
+        if self.answer_cache is None or not question or not answer.strip() or not citations:
+            return
+        try:
+            await self.answer_cache.store(question, answer.strip(), citations, generation=generation)
+        except Exception as e:
+            logger.warning(f"Answer cache write failed: {e}")
 
     async def chat(self, messages: List[Dict[str, str]], stream: bool = False, session_id: Optional[str] = None) -> Any:
         # OpenAI message format: [{"role": "user", "content": "..."}]
@@ -132,6 +288,26 @@ class OrchestratorAgentService(LLMAgentService):
 
         user_id = "default_user"
         session_id = session_id or str(uuid.uuid4())
+        # Per-request timeline: agent turns, tools, retrieval stages, first/last token
+        trace = start_trace("chat", session_id=session_id, stream=stream)
+
+        # Greetings and clear knowledge questions skip the orchestrator's routing turn
+        decision = self.intent_router.classify(messages) if self.intent_router else None
+        if decision is not None and decision.intent == "greeting":
+            trace.mark("first_token")
+            self._finish_trace(trace, route="greeting")
+            reply = self._immediate_reply(decision.reply, stream)
+            self.intent_router.record_avoided(LLM_CALLS_GREETING)
+            return reply
+
+        # Near-duplicate single-turn questions are answered from the semantic cache
+        question = self._cacheable_question(messages)
+        with span("answer_cache.lookup"):
+            cached, generation = await self._cached_answer(question)
+        if cached is not None:
+            trace.mark("first_token")
+            self._finish_trace(trace, route="answer_cache")
+            return self._immediate_reply(cached.answer, stream, citations=cached.citations, cached=True)
 
         # Build conversation context
         context_parts = []
@@ -157,74 +333,82 @@ class OrchestratorAgentService(LLMAgentService):
         logger.info(f"{'='*60}")
         logger.info(f"📝 User Message: {last_msg['content'][:200]}{'...' if len(last_msg['content']) > 200 else ''}")
 
+        cited = collect_citations()
+        runner = self._get_runner()
+        route = settings.rag_pipeline_mode
+        # Counted once the routed run succeeds: a failed fast path saved nothing
+        calls_avoided = 0
+        if decision is not None and decision.intent == "kb_question" and settings.rag_pipeline_mode != "direct":
+            # Same flow as rag_pipeline_mode="direct", for this request only
+            runner = self._get_direct_runner()
+            route = "fast_path"
+            calls_avoided = LLM_CALLS_BEFORE_WRITER.get(settings.rag_pipeline_mode, 0)
+            logger.info(f"⚡ Fast path: retrieval + writer ({decision.reason}, confidence {decision.confidence:.2f})")
+
         async def execute_chat():
-            runner = Runner(
-                agent=root_agent,
-                app_name=self.app_name,
-                session_service=self.session_service
-            )
-            
             nonlocal session_id
-            ctx = ExecutionContext(session_id=session_id)
+            ctx = ExecutionContext(session_id=session_id, trace=trace)
             
-            await self.session_service.create_session(
-                app_name=self.app_name,
+            await self._ensure_session(user_id, session_id)
+
+            gen = runner.run_async(
                 user_id=user_id,
-                session_id=session_id
+                session_id=session_id,
+                new_message=new_message,
+                run_config=RunConfig(streaming_mode=StreamingMode.SSE)
             )
-
-            try:
-                gen = runner.run_async(
-                    user_id=user_id,
-                    session_id=session_id,
-                    new_message=new_message,
-                    run_config=RunConfig(streaming_mode=StreamingMode.SSE)
-                )
-                
-                if stream:
-                    # In streaming mode, we return the generator itself
-                    # Note: Wrapping the internal loop with retry is harder, 
-                    # so we'll wrap the whole execution_chat function.
-                    # But if we've already yielded content, we can't easily retry.
-                    # For now, we wrap the whole run_async call sequence.
-                    return gen, ctx, runner
-                else:
-                    answer = ""
-                    async for event in gen:
-                        self._process_event(event, ctx)
-                        
-                        # 在非串流模式下，我們只收集「完整」的內容，不要收集 partial 的內容以免重複
-                        is_partial = getattr(event, 'partial', False)
-                        if is_partial:
-                            continue
-                            
-                        # Collect text output...
-                        if hasattr(event, "message") and event.message and event.message.parts:
-                            for part in event.message.parts:
-                                if part.text:
-                                    answer = part.text  # 直接替換為最新的完整內容
-                        elif hasattr(event, "text") and event.text:
-                            answer = event.text
-                        elif hasattr(event, "content") and event.content:
-                            if hasattr(event.content, "parts") and event.content.parts:
-                                for part in event.content.parts:
-                                    if hasattr(part, "text") and part.text:
-                                        answer = part.text
+            
+            if stream:
+                # In streaming mode, we return the generator itself
+                # Note: Wrapping the internal loop with retry is harder, 
+                # so we'll wrap the whole execution_chat function.
+                # But if we've already yielded content, we can't easily retry.
+                # For now, we wrap the whole run_async call sequence.
+                return gen, ctx
+            else:
+                answer = ""
+                writer_answer = ""  # Final text of the writer (what the answer cache stores)
+                async for event in gen:
+                    self._process_event(event, ctx)
                     
-                    return answer, ctx, runner
-            except Exception:
-                await runner.close()
-                raise
+                    # 在非串流模式下，我們只收集「完整」的內容，不要收集 partial 的內容以免重複
+                    is_partial = getattr(event, 'partial', False)
+                    if is_partial:
+                        continue
+                        
+                    # Collect text output...
+                    text = ""
+                    if hasattr(event, "message") and event.message and event.message.parts:
+                        for part in event.message.parts:
+                            if part.text:
+                                text = part.text  # 直接替換為最新的完整內容
+                    elif hasattr(event, "text") and event.text:
+                        text = event.text
+                    elif hasattr(event, "content") and event.content:
+                        if hasattr(event.content, "parts") and event.content.parts:
+                            for part in event.content.parts:
+                                if hasattr(part, "text") and part.text:
+                                    text = part.text
+                    if text:
+                        answer = text
+                        if getattr(event, "author", None) == ANSWER_AUTHOR:
+                            writer_answer = text
+                    if answer:
+                        trace.mark("first_token", first=True)
+                        trace.mark("last_token")
+                
+                return answer, writer_answer, ctx
 
         try:
             if stream:
                 # For streaming, we'll use a modified approach: 
                 # We'll retry the INITIAL call to run_async which often triggers the overflow/rate limit.
                 # Mid-stream retry is not fully supported here to avoid duplicate content.
-                gen, ctx, runner = await retry_with_backoff(execute_chat)
+                gen, ctx = await retry_with_backoff(execute_chat)
                 
                 async def stream_generator():
                     collected_answer = []
+                    writer_parts = []  # Text of the writer only (what the answer cache replays)
                     last_author = None
                     last_yielded_status = None
                     has_yielded_content = False
@@ -232,6 +416,13 @@ class OrchestratorAgentService(LLMAgentService):
                     event_count = 0
                     
                     logger.info("🚀 Starting stream_generator")
+
+                    def answer_token():
+                        trace.mark("first_token", first=True)
+                        trace.mark("last_token")
+
+                    session_lock = self._session_lock(session_id)
+                    await session_lock.acquire()
                     try:
                         async for event in gen:
                             event_count += 1
@@ -243,6 +434,7 @@ class OrchestratorAgentService(LLMAgentService):
                                 status_map = {
                                     'guard_agent': '🛡️ 安全檢查中...\n',
                                     'search_agent': '🔍 搜尋資料中...\n',
+                                    'rag_pipeline_direct': '🔍 搜尋資料中...\n',
                                     'planner_agent': '📋 規劃查詢策略...\n',
                                     'reviewer_agent': '📝 審核結果中...\n',
                                     'writer_agent': '✍️ 生成回答中...\n',
@@ -292,6 +484,10 @@ class OrchestratorAgentService(LLMAgentService):
                                     has_yielded_content = True
                                     # 只輸出增量（delta）。在 SSE 模式下，text_to_yield 通常就是 delta。
                                     collected_answer.append(text_to_yield)
+                                    if is_main_speaker:
+                                        answer_token()
+                                    if last_author == ANSWER_AUTHOR:
+                                        writer_parts.append(text_to_yield)
                                     yield text_to_yield
                                 else:
                                     # 對於非 partial (final) 事件，我們比對長度來決定是否輸出剩餘內容
@@ -303,6 +499,10 @@ class OrchestratorAgentService(LLMAgentService):
                                         extra_content = full_text[len(current_collected):]
                                         has_yielded_content = True
                                         collected_answer.append(extra_content)
+                                        if is_main_speaker:
+                                            answer_token()
+                                        if last_author == ANSWER_AUTHOR:
+                                            writer_parts.append(extra_content)
                                         yield extra_content
 
                         if is_thought_block_open:
@@ -313,6 +513,10 @@ class OrchestratorAgentService(LLMAgentService):
                              yield "⚠️ 系統未生成任何回答。"
 
                         ctx.log_summary()
+                        if not ctx.errors:
+                            await self._cache_answer(question, "".join(writer_parts), cited, generation)
+                            if calls_avoided:
+                                self.intent_router.record_avoided(calls_avoided)
                         summary = ctx.generate_summary()
                         if summary:
                             yield summary
@@ -331,18 +535,24 @@ class OrchestratorAgentService(LLMAgentService):
                         else:
                             yield f"\n\n---\n⚠️ **錯誤**: {error_msg}"
                     finally:
-                        await runner.close()
+                        session_lock.release()
+                        self._finish_trace(trace, route=route, errors=len(ctx.errors))
                         
                 return stream_generator()
             else:
                 # Non-streaming implementation with full retry support
-                answer, ctx, runner = await retry_with_backoff(execute_chat)
+                async with self._session_lock(session_id):
+                    answer, writer_answer, ctx = await retry_with_backoff(execute_chat)
                 
                 ctx.log_summary()
+                self._finish_trace(trace, route=route, errors=len(ctx.errors))
+                if not ctx.errors:
+                    await self._cache_answer(question, writer_answer, cited, generation)
+                    if calls_avoided:
+                        self.intent_router.record_avoided(calls_avoided)
                 summary = ctx.generate_summary()
                 final_answer = (answer.strip() or "Agent produced no text response.") + summary
 
-                await runner.close()
                 return {
                     "answer": final_answer,
                     "citations": [],
@@ -353,18 +563,24 @@ class OrchestratorAgentService(LLMAgentService):
                 }
         except Exception as e:
             logger.error("Final Chat Error after retries", exc_info=True)
+            self._finish_trace(trace, route=route, error=str(e))
             if not stream:
                 # In non-stream mode, we can return a dictionary or let it bubble up
                 return {"answer": f"⚠️ 發生錯誤，重試後仍然失敗: {str(e)}", "citations": []}
             raise
-        finally:
-            if not stream:
-                await runner.close()
     
     def _process_event(self, event, ctx: ExecutionContext):
         """處理 ADK 事件並記錄到執行上下文"""
         event_type = type(event).__name__
         
+        # Agent 切換與工具呼叫（計時用）
+        author = getattr(event, 'author', None)
+        if author and author != "user" and author != ctx.current_agent:
+            ctx.enter_agent(author)
+        if not getattr(event, 'partial', False) and hasattr(event, 'get_function_calls'):
+            for call in event.get_function_calls():
+                ctx.add_tool_call(call.name, str(call.args)[:100])
+        
         # 記錄事件
         if hasattr(event, 'author'):
             logger.debug(f"Event Received", extra={
@@ -0,0 +1,211 @@
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from advence_rag.config import get_settings
+from advence_rag.domain.interfaces import EmbeddingService
+from advence_rag.infrastructure.ai.embedding_cache import normalize_text
+from advence_rag.utils.index_version import IndexVersionLog
+from advence_rag.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Chunk IDs retrieved while answering the current request (None outside a collection)
+_cited_chunks: contextvars.ContextVar[Optional[Set[str]]] = contextvars.ContextVar("cited_chunks", default=None)
+
+
+def collect_citations() -> Set[str]:
+    """Start collecting the chunk IDs retrieved by tools in the current context.
+
+    Tasks spawned from this context share the returned set, so tool calls
+    made anywhere inside one agent run end up in it.
+    """
+    cited: Set[str] = set()
+    _cited_chunks.set(cited)
+    return cited
+
+
+def record_citations(ids: Iterable[str]):
+    """Called by retrieval tools; a no-op when nothing is collecting."""
+    cited = _cited_chunks.get()
+    if cited is not None:
+        cited.update(str(i) for i in ids if i)
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    answer: str
+    citations: List[str]
+    generation: int
+    created_at: float
+    similarity: float = 1.0
+    hits: int = 0
+
+
+class SemanticAnswerCache:
+    """Answers to previous questions, looked up by question embedding.
+
+    A question hits when its cosine similarity to a cached question reaches
+    ``threshold``. The index is a dense matrix of normalized embeddings
+    scanned with one matrix-vector product, which stays well under a
+    millisecond at the few thousand entries kept here; the least recently
+    used entry is overwritten when full.
+
+    An entry is dropped when it expires or when any chunk it cited was
+    replaced or deleted after it was stored (checked against the shared
+    ``IndexVersionLog``). An entry without citations is dropped after any
+    index write.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        versions: Optional[IndexVersionLog] = None,
+        threshold: float = 0.95,
+        max_entries: int = 1000,
+        ttl: Optional[float] = None,
+    ):
+        self.embedding_service = embedding_service
+        self.versions = versions
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._matrix: Optional[np.ndarray] = None
+        self._entries: Dict[int, CachedAnswer] = {}
+        self._lru: "OrderedDict[int, None]" = OrderedDict()
+        self._free = list(range(max_entries - 1, -1, -1))
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+    async def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(await self.embedding_service.embed_text(normalize_text(question)), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _generation(self) -> int:
+        return self.versions.generation() if self.versions is not None else 0
+
+    async def index_generation(self) -> int:
+        """Current index generation; read it before answering and pass it to ``store``."""
+        return await asyncio.to_thread(self._generation)
+
+    def _is_stale(self, entry: CachedAnswer) -> bool:
+        if self.ttl is not None and time.time() - entry.created_at > self.ttl:
+            return True
+        if self.versions is None:
+            return False
+        if not entry.citations:
+            # Nothing to check against: any write may have added the missing answer
+            return self.versions.generation() > entry.generation
+        return self.versions.changed_since(entry.citations, entry.generation)
+
+    def _remove(self, row: int):
+        if self._entries.pop(row, None) is not None:
+            self._lru.pop(row, None)
+            self._free.append(row)
+
+    async def lookup(self, question: str) -> Optional[CachedAnswer]:
+        """Closest cached answer at or above the threshold, if still valid."""
+        if not self._entries:
+            self.misses += 1
+            return None
+
+        vector = await self._embed(question)
+        # Entries may have been removed or replaced by concurrent calls while awaiting
+        if not self._entries:
+            self.misses += 1
+            return None
+        rows = np.fromiter(self._entries, dtype=np.int64, count=len(self._entries))
+        similarities = self._matrix[rows] @ vector
+        best = int(np.argmax(similarities))
+        row, similarity = int(rows[best]), float(similarities[best])
+        if similarity < self.threshold:
+            self.misses += 1
+            return None
+
+        entry = self._entries[row]
+        stale = await asyncio.to_thread(self._is_stale, entry)
+        if self._entries.get(row) is not entry:
+            # Evicted (and maybe reused for another question) during the check
+            self.misses += 1
+            return None
+        if stale:
+            self._remove(row)
+            self.invalidated += 1
+            self.misses += 1
+            return None
+
+        self._lru.move_to_end(row)
+        entry.hits += 1
+        self.hits += 1
+        logger.info(f"Answer cache hit (similarity {similarity:.3f}): {entry.question[:80]}")
+        return CachedAnswer(
+            entry.question, entry.answer, entry.citations, entry.generation, entry.created_at, similarity, entry.hits
+        )
+
+    async def store(self, question: str, answer: str, citations: Iterable[str] = (), generation: Optional[int] = None):
+        """Cache ``answer``; ``generation`` is the index generation read before answering."""
+        vector = await self._embed(question)
+        if generation is None:
+            generation = await self.index_generation()
+
+        if self._matrix is None:
+            self._matrix = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+        if self._free:
+            row = self._free.pop()
+        else:
+            row, _ = self._lru.popitem(last=False)
+            del self._entries[row]
+
+        self._matrix[row] = vector
+        self._entries[row] = CachedAnswer(question, answer, sorted(set(citations)), generation, time.time())
+        self._lru[row] = None
+
+    def clear(self):
+        self._entries.clear()
+        self._lru.clear()
+        self._free = list(range(self.max_entries - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidated": self.invalidated,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_answer_cache: Optional[SemanticAnswerCache] = None
+
+
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """Shared answer cache for the chat endpoint, or None if disabled."""
+    global _answer_cache
+
+    if _answer_cache is None and settings.answer_cache_enabled:
+        from advence_rag.infrastructure.persistence.repository_factory import get_embedding_service, get_index_versions
+        _answer_cache = SemanticAnswerCache(
+            get_embedding_service(),
+            versions=get_index_versions(),
+            threshold=settings.answer_cache_threshold,
+            max_entries=settings.answer_cache_size,
+            ttl=settings.answer_cache_ttl,
+        )
+        get_metrics().register_stats(
+            "answer_cache", _answer_cache.stats, counters=("hits", "misses", "invalidated")
+        )
+    return _answer_cache
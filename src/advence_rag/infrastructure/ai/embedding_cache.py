@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import logging
+import re
+import unicodedata
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from advence_rag.domain.interfaces import EmbeddingService
+from advence_rag.utils.cache import SQLiteCache, TTLCache
+from advence_rag.utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys (Unicode form and whitespace only, case is kept)."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def content_key(model_id: str, text: str) -> str:
+    """Content address of a text's embedding: model id + SHA-256 of the normalized text."""
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model_id}:{digest}"
+
+
+def _encode(vector: List[float]) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def _decode(blob: bytes) -> List[float]:
+    return np.frombuffer(blob, dtype=np.float32).tolist()
+
+
+class CachedEmbeddingService(EmbeddingService):
+    """Caching decorator for any EmbeddingService.
+
+    Embeddings are keyed on (model id, normalized text) and looked up in an
+    in-process LRU first, then in an optional SQLite file shared by workers.
+    Only misses reach the wrapped service; batches embed their misses in a
+    single call.
+    """
+
+    def __init__(
+        self,
+        inner: EmbeddingService,
+        max_entries: int = 10000,
+        ttl: Optional[float] = None,
+        persist_path: Optional[Path] = None,
+        persist_max_entries: int = 200000,
+    ):
+        self.inner = inner
+        self.model_id = getattr(inner, "model_id", None) or getattr(inner, "model_name", type(inner).__name__)
+        self.memory = TTLCache(max_entries=max_entries, ttl=ttl)
+        self.persistent = (
+            SQLiteCache(persist_path, max_entries=persist_max_entries, ttl=ttl) if persist_path else None
+        )
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        return content_key(self.model_id, text)
+
+    async def embed_text(self, text: str) -> List[float]:
+        return (await self.embed_batch([text]))[0]
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        with span("embedding", texts=len(texts)):
+            return await self._embed_batch(texts)
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        vectors: Dict[str, List[float]] = {}
+        for key in dict.fromkeys(keys):
+            vector = self.memory.get(key)
+            if vector is not None:
+                vectors[key] = vector
+
+        pending = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if pending and self.persistent is not None:
+            try:
+                found = await asyncio.to_thread(self.persistent.get_many, pending)
+            except Exception as e:
+                logger.warning(f"Persistent embedding cache lookup failed: {e}")
+                found = {}
+            for key, blob in found.items():
+                vector = _decode(blob)
+                vectors[key] = vector
+                self.memory.set(key, vector)
+            pending = [key for key in pending if key not in vectors]
+
+        if pending:
+            self.misses += len(pending)
+            first_text: Dict[str, str] = {}
+            for key, text in zip(keys, texts):
+                first_text.setdefault(key, text)
+            if len(pending) == 1:
+                # Single texts go through embed_text so the inner service can coalesce them
+                computed = [await self.inner.embed_text(first_text[pending[0]])]
+            else:
+                computed = await self.inner.embed_batch([first_text[key] for key in pending])
+            for key, vector in zip(pending, computed):
+                vector = list(vector)
+                vectors[key] = vector
+                self.memory.set(key, vector)
+            if self.persistent is not None:
+                try:
+                    await asyncio.to_thread(
+                        self.persistent.set_many,
+                        {key: _encode(vectors[key]) for key in pending},
+                    )
+                except Exception as e:
+                    logger.warning(f"Persistent embedding cache write failed: {e}")
+
+        return [vectors[key] for key in keys]
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per tier (``misses`` = texts sent to the model)."""
+        stats = {
+            "model_id": self.model_id,
+            "memory_hits": self.memory.hits,
+            "memory_entries": len(self.memory),
+            "misses": self.misses,
+        }
+        if self.persistent is not None:
+            stats["persistent_hits"] = self.persistent.hits
+        lookups = self.memory.hits + self.memory.misses
+        stats["hit_rate"] = (lookups - self.misses) / lookups if lookups else 0.0
+        return stats
+
+
+class EmbeddingStore:
+    """Content-addressed store of document chunk embeddings.
+
+    Unlike the query cache, entries do not expire: re-ingesting a document
+    only embeds the chunks whose normalized text is new for this model.
+    """
+
+    def __init__(self, path: Path, model_id: str, max_entries: int = 1000000):
+        self.model_id = model_id
+        self._db = SQLiteCache(path, max_entries=max_entries)
+        self.reused = 0
+        self.computed = 0
+
+    async def embed(
+        self,
+        texts: List[str],
+        embed_batch: Callable[[List[str]], Awaitable[List[List[float]]]],
+    ) -> List[List[float]]:
+        """Return embeddings for ``texts``, calling ``embed_batch`` only for unseen content."""
+        if not texts:
+            return []
+
+        keys = [content_key(self.model_id, text) for text in texts]
+        found = await asyncio.to_thread(self._db.get_many, list(dict.fromkeys(keys)))
+        vectors = {key: _decode(blob) for key, blob in found.items()}
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+
+        if missing:
+            computed = await embed_batch(list(missing.values()))
+            blobs = {key: _encode(vector) for key, vector in zip(missing, computed)}
+            await asyncio.to_thread(self._db.set_many, blobs)
+            # Hand out the stored precision so a chunk's vector never depends on cache state
+            vectors.update((key, _decode(blob)) for key, blob in blobs.items())
+
+        reused = sum(1 for key in keys if key not in missing)
+        self.reused += reused
+        self.computed += len(missing)
+        logger.info(f"Embedding store: reused {reused}/{len(texts)} chunk embeddings, computed {len(missing)}")
+        return [vectors[key] for key in keys]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"model_id": self.model_id, "reused": self.reused, "computed": self.computed}
@@ -1,50 +1,172 @@
 import logging
-from typing import List
+import weakref
+from typing import Awaitable, Callable, List, Optional, Tuple
 import asyncio
 
 from google import genai
 from advence_rag.domain.interfaces import EmbeddingService
 from advence_rag.config import get_settings
+from advence_rag.utils.rate_limit import TokenBucket
+from advence_rag.utils.retry import retry_with_backoff
+from advence_rag.utils.tracing import span
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+class EmbeddingMicroBatcher:
+    """Coalesces concurrent single-text embedding requests into batches.
+
+    The first request opens a batch and waits up to ``max_wait_ms`` for
+    others to join; the batch is flushed early once it reaches
+    ``max_batch_size``. Each caller gets its own vector (or the batch's
+    exception) through a future.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], Awaitable[List[List[float]]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        self._embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: set = set()
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Futures are bound to a loop; start fresh if a new loop is in use
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.requests += 1
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        task = asyncio.ensure_future(self._run(batch))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            vectors = await self._embed_batch([text for text, _ in batch])
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Cancellation (e.g. loop shutdown) or a short vector list: never leave a caller waiting
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+
+def _make_batcher(embed_batch: Callable[[List[str]], Awaitable[List[List[float]]]]) -> Optional[EmbeddingMicroBatcher]:
+    if settings.embedding_batch_max_size <= 1:
+        return None
+    return EmbeddingMicroBatcher(
+        embed_batch,
+        max_batch_size=settings.embedding_batch_max_size,
+        max_wait_ms=settings.embedding_batch_max_wait_ms,
+    )
+
+
 class GeminiEmbeddingService(EmbeddingService):
     """Implementation of EmbeddingService using Google Gemini API."""
+
+    RETRY_INITIAL_DELAY = 1.0
     
     def __init__(self):
         self.client = genai.Client(api_key=settings.google_api_key)
         self.model_id = settings.embedding_model
+        self._batcher = _make_batcher(self.embed_batch)
+        self._rate_limiter = TokenBucket(
+            rate=settings.gemini_embedding_rpm / 60.0,
+            capacity=settings.gemini_embedding_concurrency,
+        )
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
 
     async def embed_text(self, text: str) -> List[float]:
-        """Generate embedding for a single text."""
-        try:
-            # Run in thread because genai client might be blocking or we want to avoid event loop lag
+        """Generate embedding for a single text (coalesced with concurrent calls)."""
+        if self._batcher is not None:
+            return await self._batcher.submit(text)
+        return (await self.embed_batch([text]))[0]
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Semaphores bind to the loop they are first used on
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(settings.gemini_embedding_concurrency)
+        return self._semaphores[loop]
+
+    async def _embed_chunk(self, chunk: List[str]) -> List[List[float]]:
+        await self._rate_limiter.acquire()
+        # Run in thread because genai client might be blocking or we want to avoid event loop lag
+        with span("embedding.model", texts=len(chunk)):
             response = await asyncio.to_thread(
                 self.client.models.embed_content,
                 model=self.model_id,
-                contents=text
+                contents=chunk
+            )
+        return [emb.values for emb in response.embeddings]
+
+    async def _embed_chunk_with_retry(self, chunk: List[str]) -> List[List[float]]:
+        async with self._semaphore():
+            return await retry_with_backoff(
+                self._embed_chunk,
+                chunk,
+                max_retries=settings.gemini_embedding_max_retries,
+                initial_delay=self.RETRY_INITIAL_DELAY,
             )
-            return response.embeddings[0].values
-        except Exception as e:
-            logger.error(f"Gemini embedding failed: {e}")
-            raise
 
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a batch of texts."""
+        """Generate embeddings for a batch of texts.
+        
+        The texts are split into API-sized chunks that run with bounded
+        concurrency under a requests-per-minute token bucket; each chunk is
+        retried on its own when Gemini returns 429/503.
+        """
         if not texts:
             return []
-            
+
+        size = settings.gemini_embedding_chunk_size
+        chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+        if len(chunks) > 1:
+            logger.info(f"Embedding {len(texts)} texts in {len(chunks)} chunks of up to {size}")
+
+        tasks = [asyncio.ensure_future(self._embed_chunk_with_retry(chunk)) for chunk in chunks]
         try:
-            response = await asyncio.to_thread(
-                self.client.models.embed_content,
-                model=self.model_id,
-                contents=texts
-            )
-            return [emb.values for emb in response.embeddings]
+            results = await asyncio.gather(*tasks)
         except Exception as e:
+            for task in tasks:
+                task.cancel()
             logger.error(f"Gemini batch embedding failed: {e}")
             raise
+        return [vector for chunk in results for vector in chunk]
 
 class LocalEmbeddingService(EmbeddingService):
     """Implementation of EmbeddingService using local sentence-transformers models."""
@@ -58,6 +180,7 @@ class LocalEmbeddingService(EmbeddingService):
             
         self.device = settings.local_embedding_device
         self._model = None
+        self._batcher = _make_batcher(self.embed_batch)
 
     @property
     def model(self):
@@ -75,14 +198,18 @@ class LocalEmbeddingService(EmbeddingService):
         return self._model
 
     async def embed_text(self, text: str) -> List[float]:
-        """Generate embedding for a single text locally."""
+        """Generate embedding for a single text locally (coalesced with concurrent calls)."""
+        if self._batcher is not None:
+            return await self._batcher.submit(text)
         # Non-blocking run of model.encode if it's CPU bound
-        embeddings = await asyncio.to_thread(self.model.encode, [text])
+        with span("embedding.model", texts=1):
+            embeddings = await asyncio.to_thread(self.model.encode, [text])
         return embeddings[0].tolist()
 
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for a batch of texts locally."""
         if not texts:
             return []
-        embeddings = await asyncio.to_thread(self.model.encode, texts)
+        with span("embedding.model", texts=len(texts)):
+            embeddings = await asyncio.to_thread(self.model.encode, texts)
         return embeddings.tolist()
@@ -0,0 +1,162 @@
+"""Intent Router - 以規則在 LLM 之前判斷意圖，讓問候與明確的知識問題走捷徑。
+
+Every chat turn normally starts with an ``orchestrator_agent`` LLM call
+that only decides whether to greet, ask for clarification or hand over to
+the RAG pipeline. This router makes that decision locally for the clear
+cases:
+
+- ``greeting``: short greetings/thanks are answered with a canned reply.
+- ``kb_question``: a self-contained single-turn question goes straight to
+  retrieval + writer, skipping the orchestrator, search and reviewer turns.
+- ``agent``: anything ambiguous (pronoun-only follow-ups, comparisons and
+  multi-part questions, sensitive content) keeps the full agentic flow.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from advence_rag.agents.guard import check_sensitive_content
+from advence_rag.config import get_settings
+from advence_rag.utils.metrics import get_metrics
+
+settings = get_settings()
+
+_GREETING_RE = re.compile(
+    r"^(hi|hello|hey|hiya|yo|good (morning|afternoon|evening)|thanks|thank you|thx|"
+    r"你好|您好|哈囉|嗨|早安|午安|晚安|謝謝|多謝|感謝)"
+    r"[\s!！.。~～,，]*(there|all|你|您)?[\s!！.。~～]*$",
+    re.IGNORECASE,
+)
+_THANKS_RE = re.compile(r"^(thanks|thank you|thx|謝謝|多謝|感謝)", re.IGNORECASE)
+
+_QUESTION_RE = re.compile(
+    r"[?？]\s*$|^(what|how|why|when|where|which|who|is|are|does|do|can|explain|describe|list)\b|"
+    r"什麼|甚麼|如何|怎麼|怎樣|為何|為什麼|是否|哪些|哪個|多少|嗎\s*[?？]?\s*$|介紹|說明|解釋",
+    re.IGNORECASE,
+)
+# Questions that lean on earlier context ("where is it?") need clarification
+_DEICTIC_RE = re.compile(
+    r"^(它|他|她|這個|那個|這|那|此)|\b(it|this|that|they|them|those|these)\b",
+    re.IGNORECASE,
+)
+# Questions the planner would decompose
+_COMPLEX_RE = re.compile(
+    r"比較|差異|差別|不同|優缺點|以及|分別|\bvs\.?\b|\bversus\b|\bcompare\b|\bdifference\b|"
+    r"\bpros and cons\b|[?？].+[?？]",
+    re.IGNORECASE,
+)
+_CJK_RE = re.compile(r"[㐀-鿿]")
+
+GREETING_REPLY = {
+    "zh": "您好！我是知識庫問答助理，請問有什麼可以幫您？",
+    "en": "Hello! I'm the knowledge base assistant. What would you like to know?",
+}
+THANKS_REPLY = {
+    "zh": "不客氣！還有其他問題歡迎隨時詢問。",
+    "en": "You're welcome! Feel free to ask anything else.",
+}
+
+# LLM turns the agentic flow spends before the writer, per pipeline mode:
+# orchestrator + search_agent (tool call turn + summary turn) + reviewer (+ planner)
+LLM_CALLS_BEFORE_WRITER = {"simple": 4, "full": 5}
+LLM_CALLS_GREETING = 1  # The orchestrator would have answered itself
+
+
+@dataclass
+class IntentDecision:
+    """Routing decision for one chat turn."""
+    intent: str  # greeting | kb_question | agent
+    confidence: float
+    reason: str
+    reply: Optional[str] = None  # Canned answer for greetings
+
+
+class IntentRouter:
+    """Rules-based pre-router with counters of bypassed LLM calls."""
+
+    def __init__(self, min_confidence: float = 0.8, min_chars: int = 4, max_chars: int = 300):
+        self.min_confidence = min_confidence
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            "requests": 0,
+            "greeting": 0,
+            "kb_question": 0,
+            "agent": 0,
+            "llm_calls_avoided": 0,
+        }
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] += n
+
+    @staticmethod
+    def _language(text: str) -> str:
+        return "zh" if _CJK_RE.search(text) else "en"
+
+    def classify(self, messages: List[Dict[str, str]]) -> IntentDecision:
+        """Classify the last user message (only single-turn chats take a fast path)."""
+        self._count("requests")
+        decision = self._classify(messages)
+        self._count(decision.intent)
+        return decision
+
+    def _classify(self, messages: List[Dict[str, str]]) -> IntentDecision:
+        if not messages or messages[-1].get("role") != "user":
+            return IntentDecision("agent", 0.0, "no user message")
+        text = " ".join(messages[-1].get("content", "").split())
+
+        if _GREETING_RE.match(text):
+            replies = THANKS_REPLY if _THANKS_RE.match(text) else GREETING_REPLY
+            return IntentDecision("greeting", 1.0, "greeting", reply=replies[self._language(text)])
+
+        # Follow-ups depend on history the fast path does not pass on
+        if any(msg.get("role") != "system" for msg in messages[:-1]):
+            return IntentDecision("agent", 0.0, "multi-turn")
+        if not check_sensitive_content(text)["is_safe"]:
+            return IntentDecision("agent", 0.0, "sensitive content")
+        if not self.min_chars <= len(text) <= self.max_chars:
+            return IntentDecision("agent", 0.0, "length")
+        if _COMPLEX_RE.search(text):
+            return IntentDecision("agent", 0.3, "needs decomposition")
+
+        confidence = 0.5
+        reasons = []
+        if _QUESTION_RE.search(text):
+            confidence += 0.3
+            reasons.append("question form")
+        if _DEICTIC_RE.search(text):
+            confidence -= 0.4
+            reasons.append("refers to missing context")
+        # Longer questions carry their own subject
+        if len(text) >= (8 if self._language(text) == "zh" else 20):
+            confidence += 0.2
+            reasons.append("self-contained")
+
+        confidence = max(0.0, min(1.0, confidence))
+        intent = "kb_question" if confidence >= self.min_confidence else "agent"
+        return IntentDecision(intent, confidence, ", ".join(reasons) or "no signal")
+
+    def record_avoided(self, llm_calls: int):
+        """Count LLM calls saved by a fast path that completed."""
+        self._count("llm_calls_avoided", llm_calls)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+
+_intent_router: Optional[IntentRouter] = None
+
+
+def get_intent_router() -> Optional[IntentRouter]:
+    """Shared intent router for the chat endpoint, or None if disabled."""
+    global _intent_router
+
+    if _intent_router is None and settings.intent_router_enabled:
+        _intent_router = IntentRouter(min_confidence=settings.intent_router_min_confidence)
+        get_metrics().register_stats("intent_router", _intent_router.stats, counters=True)
+    return _intent_router
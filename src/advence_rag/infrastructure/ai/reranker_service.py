@@ -16,6 +16,7 @@ class CrossEncoderReranker(RerankerService):
                 "content": doc.content,
                 "metadata": doc.metadata,
                 "id": doc.id,
+                "score": doc.score,
             } for doc in documents
         ]
         
@@ -29,7 +30,8 @@ class CrossEncoderReranker(RerankerService):
                 content=r["content"],
                 metadata=r["metadata"],
                 id=r["id"],
-                score=r["rerank_score"]
+                # Unscored when the reranker skipped a small pool: keep the fused score
+                score=r["rerank_score"] if r["rerank_score"] is not None else r["score"]
             ) for r in res["results"]
         ]
 
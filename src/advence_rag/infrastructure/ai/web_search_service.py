@@ -1,27 +1,41 @@
 """Web Search Service - Infrastructure implementation of WebSearchService."""
 
-from typing import List
+from typing import List, Optional
+import asyncio
 import logging
 
+from advence_rag.config import get_settings
 from advence_rag.domain.entities import SearchResult
-from advence_rag.domain.interfaces import WebSearchService
+from advence_rag.domain.interfaces import RerankerService, WebSearchService
 from advence_rag.tools.web_search import search_web
+from advence_rag.utils.tracing import span
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 class SerperWebSearchService(WebSearchService):
-    """Infrastructure implementation of WebSearchService using Serper/Google."""
-    
+    """Infrastructure implementation of WebSearchService using Serper/Google.
+
+    With page fetching enabled, the top result pages are downloaded,
+    reduced to their main text, chunked and reranked, so CRAG gets page
+    passages instead of ~150 character snippets. Pages that cannot be
+    fetched within the time budget keep their snippet.
+    """
+
+    def __init__(self, reranker: Optional[RerankerService] = None, fetch_pages: Optional[bool] = None):
+        self.reranker = reranker
+        self.fetch_pages = fetch_pages if fetch_pages is not None else settings.web_fetch_enabled
+
     async def search(self, query: str, num_results: int = 5) -> List[SearchResult]:
         """Execute web search and return domain-typed results."""
         result = await search_web(query, num_results)
-        
+
         if result["status"] != "success":
             logger.warning(f"Web search failed: {result.get('error')}")
             return []
-        
-        return [
+
+        snippets = [
             SearchResult(
                 content=r.get("snippet", ""),
                 metadata={
@@ -34,3 +48,48 @@ class SerperWebSearchService(WebSearchService):
             )
             for r in result.get("results", [])
         ]
+
+        if not self.fetch_pages or not snippets:
+            return snippets
+        return await self._page_passages(query, snippets, num_results)
+
+    async def _page_passages(self, query: str, snippets: List[SearchResult], num_results: int) -> List[SearchResult]:
+        """Replace the top snippets by reranked chunks of their pages."""
+        from advence_rag.tools.web_fetch import chunk_text, extract_main_text, fetch_pages
+
+        urls = [s.id for s in snippets[: settings.web_fetch_top_n] if s.id]
+        with span("web_fetch", pages=len(urls)):
+            pages = await fetch_pages(
+                urls,
+                max_concurrency=settings.web_fetch_concurrency,
+                timeout=settings.web_fetch_timeout_ms / 1000.0,
+                budget=settings.web_fetch_budget_ms / 1000.0,
+                max_bytes=settings.web_fetch_max_bytes,
+            )
+
+        def to_chunks() -> List[SearchResult]:
+            chunks = []
+            for snippet in snippets:
+                html = pages.get(snippet.id)
+                text = extract_main_text(html)[1] if html else ""
+                if not text:
+                    chunks.append(snippet)
+                    continue
+                # Capped per page to bound the rerank work
+                page_chunks = chunk_text(text, settings.web_chunk_size, settings.web_chunk_overlap)
+                for i, chunk in enumerate(page_chunks[: settings.web_fetch_max_chunks_per_page]):
+                    chunks.append(SearchResult(
+                        content=chunk,
+                        metadata={**snippet.metadata, "chunk_index": i, "fetched": True},
+                        id=f"{snippet.id}#chunk-{i}",
+                        score=0.0,
+                    ))
+            return chunks
+
+        # HTML parsing is CPU bound
+        chunks = await asyncio.to_thread(to_chunks)
+        logger.info(f"Web page fetch: {len(pages)}/{len(urls)} pages, {len(chunks)} passages")
+
+        if self.reranker is None:
+            return chunks[:num_results]
+        return await self.reranker.rerank(query, chunks, top_k=num_results)
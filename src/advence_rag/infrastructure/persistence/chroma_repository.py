@@ -45,7 +45,8 @@ class ChromaKnowledgeBaseRepository(KnowledgeBaseRepository):
     async def search_similar(self, query: str, top_k: int = 5) -> List[SearchResult]:
         res = await self._search_v(query, top_k=top_k)
         if res["status"] != "success":
-            return []
+            # Raise rather than return []: an empty list reads as "no match" and would be cached
+            raise RuntimeError(f"Vector search failed: {res.get('error')}")
         return [
             SearchResult(
                 content=r["content"],
@@ -58,13 +59,13 @@ class ChromaKnowledgeBaseRepository(KnowledgeBaseRepository):
     async def search_keyword(self, query: str, top_k: int = 5) -> List[SearchResult]:
         res = await self._search_k(query, top_k=top_k)
         if res["status"] != "success":
-            return []
+            raise RuntimeError(f"Keyword search failed: {res.get('error')}")
         return [
             SearchResult(
                 content=r["content"],
-                metadata=r["metadata"],
+                metadata=r.get("metadata", {}),
                 id=r["id"],
-                score=r["score"]
+                score=r["bm25_score"]
             ) for r in res["results"]
         ]
 
@@ -7,6 +7,8 @@ from qdrant_client import QdrantClient, models
 from advence_rag.domain.entities import Document, SearchResult
 from advence_rag.domain.interfaces import KnowledgeBaseRepository, EmbeddingService
 from advence_rag.config import get_settings
+from advence_rag.infrastructure.ai.embedding_cache import EmbeddingStore
+from advence_rag.utils.index_version import IndexVersionLog
 
 logger = logging.getLogger("advence_rag")
 settings = get_settings()
@@ -14,15 +16,28 @@ settings = get_settings()
 class QdrantKnowledgeBaseRepository(KnowledgeBaseRepository):
     """Infrastructure implementation of KnowledgeBaseRepository using Qdrant."""
     
-    def __init__(self, embedding_service: EmbeddingService):
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        embedding_store: Optional[EmbeddingStore] = None,
+        index_versions: Optional[IndexVersionLog] = None,
+        client: Optional[QdrantClient] = None,
+        dimension: Optional[int] = None,
+        document_embedding_service: Optional[EmbeddingService] = None,
+    ):
         self.embedding_service = embedding_service
+        # Chunks bypass the query embedding cache (they are reused via embedding_store)
+        self.document_embedding_service = document_embedding_service or embedding_service
+        self.embedding_store = embedding_store
+        self.index_versions = index_versions
         try:
-            self.client = QdrantClient(
+            # An injected client (e.g. QdrantClient(path=...) local mode) replaces the server
+            self.client = client or QdrantClient(
                 url=settings.qdrant_url,
                 api_key=settings.qdrant_api_key,
             )
             self.collection_name = settings.qdrant_collection_name
-            self._dim: Optional[int] = None
+            self._dim: Optional[int] = dimension
             self._ensure_collection()
         except ImportError:
             raise ImportError(
@@ -78,6 +93,8 @@ class QdrantKnowledgeBaseRepository(KnowledgeBaseRepository):
             dim = 768 if settings.embedding_type == "cloud" else 384
             if settings.embedding_type == "local" and "bge" in settings.embedding_model.lower():
                 dim = 768 # BGE-large
+            if self._dim is not None:
+                dim = self._dim
             
             logger.info(f"Creating Qdrant collection: {self.collection_name} with dim={dim}")
             self.client.create_collection(
@@ -109,8 +126,11 @@ class QdrantKnowledgeBaseRepository(KnowledgeBaseRepository):
         """Add documents to Qdrant with embeddings."""
         contents = [doc.content for doc in documents]
         
-        # 1. Generate embeddings
-        embeddings = await self.embedding_service.embed_batch(contents)
+        # 1. Generate embeddings (only for chunks whose content is not in the store yet)
+        if self.embedding_store is not None:
+            embeddings = await self.embedding_store.embed(contents, self.document_embedding_service.embed_batch)
+        else:
+            embeddings = await self.document_embedding_service.embed_batch(contents)
         
         # 2. Prepare points
         points = []
@@ -141,6 +161,7 @@ class QdrantKnowledgeBaseRepository(KnowledgeBaseRepository):
             collection_name=self.collection_name,
             points=points
         )
+        await self._bump_generation([p.id for p in points])
         
         return {
             "status": "success",
@@ -205,6 +226,15 @@ class QdrantKnowledgeBaseRepository(KnowledgeBaseRepository):
             ) for hit in hits
         ]
 
+    async def _bump_generation(self, point_ids: List[str]):
+        """Mark points as changed so caches depending on them are invalidated."""
+        if self.index_versions is None:
+            return
+        try:
+            await asyncio.to_thread(self.index_versions.bump, point_ids)
+        except Exception as e:
+            logger.error(f"Failed to bump index generation: {e}")
+
     async def delete_documents(self, ids: List[str]) -> Dict[str, Any]:
         """Delete documents from Qdrant by ID."""
         # Process IDs to ensure they are valid Qdrant IDs
@@ -220,6 +250,7 @@ class QdrantKnowledgeBaseRepository(KnowledgeBaseRepository):
             collection_name=self.collection_name,
             points_selector=models.PointIdsList(points=point_ids)
         )
+        await self._bump_generation(point_ids)
         
         return {
             "status": "success",
@@ -9,6 +9,8 @@ settings = get_settings()
 
 _repository_instance: Optional[KnowledgeBaseRepository] = None
 _embedding_service_instance: Optional[EmbeddingService] = None
+_index_versions_instance = None
+_embedding_store_instances: dict = {}
 
 def get_embedding_service() -> EmbeddingService:
     """Factory function to get the configured EmbeddingService instance."""
@@ -23,9 +25,60 @@ def get_embedding_service() -> EmbeddingService:
             from advence_rag.infrastructure.ai.embedding_service import LocalEmbeddingService
             logger.info("Initializing Local (sentence-transformers) Embedding Service")
             _embedding_service_instance = LocalEmbeddingService()
+
+        if settings.embedding_cache_enabled:
+            from advence_rag.infrastructure.ai.embedding_cache import CachedEmbeddingService
+            persist_path = (
+                settings.data_dir / "cache" / "embeddings.sqlite" if settings.embedding_cache_persistent else None
+            )
+            _embedding_service_instance = CachedEmbeddingService(
+                _embedding_service_instance,
+                max_entries=settings.embedding_cache_size,
+                ttl=settings.embedding_cache_ttl,
+                persist_path=persist_path,
+                persist_max_entries=settings.embedding_cache_persistent_max_entries,
+            )
+            from advence_rag.utils.metrics import get_metrics
+            get_metrics().register_stats(
+                "embedding_cache",
+                _embedding_service_instance.stats,
+                counters=("memory_hits", "persistent_hits", "misses"),
+            )
         
     return _embedding_service_instance
 
+def get_document_embedding_service() -> EmbeddingService:
+    """Embedding service for ingesting chunks: the model without the query cache.
+
+    Chunk vectors are reused through the ``EmbeddingStore``; sending them
+    through ``CachedEmbeddingService`` would evict the hot query vectors and
+    store every chunk vector a second time.
+    """
+    from advence_rag.infrastructure.ai.embedding_cache import CachedEmbeddingService
+    service = get_embedding_service()
+    return service.inner if isinstance(service, CachedEmbeddingService) else service
+
+def get_embedding_store(model_id: str):
+    """Shared content-addressed chunk embedding store for ``model_id``, or None if disabled."""
+    if not settings.embedding_store_enabled:
+        return None
+    if model_id not in _embedding_store_instances:
+        from advence_rag.infrastructure.ai.embedding_cache import EmbeddingStore
+        _embedding_store_instances[model_id] = EmbeddingStore(
+            settings.data_dir / "cache" / "chunk_embeddings.sqlite",
+            model_id=model_id,
+            max_entries=settings.embedding_store_max_entries,
+        )
+    return _embedding_store_instances[model_id]
+
+def get_index_versions():
+    """Shared index generation log (data/cache/index_versions.sqlite)."""
+    global _index_versions_instance
+    if _index_versions_instance is None:
+        from advence_rag.utils.index_version import IndexVersionLog
+        _index_versions_instance = IndexVersionLog(settings.data_dir / "cache" / "index_versions.sqlite")
+    return _index_versions_instance
+
 def get_repository() -> KnowledgeBaseRepository:
     """Factory function to get the configured KnowledgeBaseRepository instance."""
     global _repository_instance
@@ -40,8 +93,15 @@ def get_repository() -> KnowledgeBaseRepository:
         elif db_type == "qdrant":
             from advence_rag.infrastructure.persistence.qdrant_repository import QdrantKnowledgeBaseRepository
             embedding_service = get_embedding_service()
+            document_embedding_service = get_document_embedding_service()
+            model_id = getattr(embedding_service, "model_id", None) or getattr(embedding_service, "model_name")
             logger.info(f"Initializing Qdrant Repository at {settings.qdrant_url}")
-            _repository_instance = QdrantKnowledgeBaseRepository(embedding_service)
+            _repository_instance = QdrantKnowledgeBaseRepository(
+                embedding_service,
+                document_embedding_service=document_embedding_service,
+                embedding_store=get_embedding_store(model_id),
+                index_versions=get_index_versions(),
+            )
         else:
             raise ValueError(f"Unsupported vector_db_type: {db_type}")
             
@@ -8,6 +8,8 @@ from google.adk.sessions.in_memory_session_service import InMemorySessionService
 
 from advence_rag.domain.interfaces import LLMAgentService
 from advence_rag.infrastructure.ai.agent_service import OrchestratorAgentService
+from advence_rag.infrastructure.ai.answer_cache import get_answer_cache
+from advence_rag.infrastructure.ai.intent_router import get_intent_router
 from advence_rag.infrastructure.utils.streaming import StreamWrapper  # 引用包裝器
 from advence_rag.interfaces.api.v1.schemas import (
     ChatCompletionChoice,
@@ -29,10 +31,22 @@ def get_agent_service() -> LLMAgentService:
     global _agent_service
     if _agent_service is None:
         session_service = InMemorySessionService()
-        _agent_service = OrchestratorAgentService(session_service=session_service)
+        _agent_service = OrchestratorAgentService(
+            session_service=session_service,
+            answer_cache=get_answer_cache(),
+            intent_router=get_intent_router(),
+        )
     return _agent_service
 
 
+async def close_agent_service():
+    """Shutdown hook: release the shared ADK runner."""
+    global _agent_service
+    if isinstance(_agent_service, OrchestratorAgentService):
+        await _agent_service.aclose()
+    _agent_service = None
+
+
 # 心跳間隔（秒）- 較短以防止 Open WebUI 超時
 HEARTBEAT_INTERVAL = 2
 
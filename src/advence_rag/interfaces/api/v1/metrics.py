@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from advence_rag.tools.web_search import WEB_SEARCH_COUNTERS, web_search_stats
+from advence_rag.utils.metrics import get_metrics
+
+router = APIRouter()
+
+# Module-level counters are always available; other sources register on creation
+get_metrics().register_stats("web_search", web_search_stats, counters=WEB_SEARCH_COUNTERS)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint (text exposition format 0.0.4)."""
+    return PlainTextResponse(get_metrics().render(), media_type="text/plain; version=0.0.4; charset=utf-8")
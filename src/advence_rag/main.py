@@ -1,10 +1,14 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
-from advence_rag.interfaces.api.v1.chat import router as chat_router
+from advence_rag.interfaces.api.v1.chat import close_agent_service, router as chat_router
 from advence_rag.interfaces.api.v1.ingest import router as ingest_router
+from advence_rag.interfaces.api.v1.metrics import router as metrics_router
 from advence_rag.config import get_settings
+from advence_rag.utils.http import close_http_clients, get_http_pool
 from advence_rag.utils.log_config import setup_logging
 
 # Setup centralized JSON logging
@@ -17,7 +21,18 @@ import os
 if settings.google_api_key:
     os.environ["GOOGLE_API_KEY"] = settings.google_api_key
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Web search clients live for the whole process so connections are reused
+    get_http_pool()
+    yield
+    await close_agent_service()
+    await close_http_clients()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Advence RAG API",
     description="Clean Architecture RAG Service with OpenAI Compatibility",
     version="1.0.0",
@@ -37,6 +52,8 @@ app.add_middleware(
 # Include Routers
 app.include_router(chat_router, prefix="/v1", tags=["OpenAI"])
 app.include_router(ingest_router, prefix="/v1/ingest", tags=["Ingest"])
+if settings.metrics_enabled:
+    app.include_router(metrics_router, tags=["Metrics"])
 
 @app.get("/")
 async def root():
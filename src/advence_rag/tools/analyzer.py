@@ -0,0 +1,151 @@
+"""Text Analyzer - BM25 的斷詞管線。
+
+The same analyzer must be used at index time and at query time, so its
+configuration is persisted alongside the BM25 segment it produced.
+
+Pipeline of the ``standard`` analyzer:
+
+1. NFKC normalization (full-width forms → ASCII) and lower casing
+2. Split into CJK runs and alphanumeric words with one compiled regex
+3. CJK runs → overlapping bigrams (or jieba search-mode words, if installed)
+4. Words → stop-word removal and a light English stemmer
+
+The ``whitespace`` analyzer reproduces the original ``lower().split()``
+tokenizer for indexes built before analyzers existed.
+"""
+
+import logging
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Han (incl. extension A and compatibility ideographs), kana and hangul
+_CJK = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af"
+_TOKEN_RE = re.compile(rf"([{_CJK}]+)|([^\W_{_CJK}]+)")
+
+ENGLISH_STOPWORDS = frozenset("""
+a an and are as at be but by for from has have if in into is it its no not of
+on or such that the their then there these they this to was were will with
+""".split())
+
+# Query strings repeat a lot; a hit skips normalization and regex entirely
+QUERY_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=65536)
+def _stem(word: str) -> str:
+    """Light English stemmer: plurals plus -ing / -ed stripping."""
+    if len(word) <= 3 or not word.isascii() or not word.isalpha():
+        return word
+    if word.endswith(("ies", "ied")) and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "ches", "shes", "zes")):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("us", "ss", "is")):
+        word = word[:-1]
+
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and not word.endswith("eed"):
+            stem = word[: -len(suffix)]
+            if len(stem) >= 4 and any(c in "aeiouy" for c in stem):
+                return stem
+    return word
+
+
+class Analyzer:
+    """Configurable tokenizer shared by BM25 indexing and querying."""
+
+    def __init__(
+        self,
+        name: str = "standard",
+        cjk: str = "bigram",
+        stemming: bool = True,
+        stopwords: bool = True,
+    ):
+        if name not in ("standard", "whitespace"):
+            raise ValueError(f"Unknown analyzer: {name}")
+        if cjk not in ("bigram", "jieba"):
+            raise ValueError(f"Unknown CJK segmenter: {cjk}")
+
+        self.name = name
+        self._jieba = None
+        if name == "standard" and cjk == "jieba":
+            try:
+                import jieba
+
+                jieba.setLogLevel(logging.WARNING)
+                self._jieba = jieba
+            except ImportError:
+                logger.warning(
+                    "jieba is not installed, falling back to CJK bigrams (indexes built with jieba "
+                    "will not match these tokens). Install with: pip install jieba"
+                )
+                cjk = "bigram"
+        self.cjk = cjk
+        self.stemming = stemming
+        self.stopwords = stopwords
+        self._stop = ENGLISH_STOPWORDS if stopwords else frozenset()
+        self._query_cache = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._analyze_query)
+
+    @property
+    def config(self) -> dict[str, Any]:
+        """JSON-serializable configuration, stored in BM25 segment metadata."""
+        if self.name == "whitespace":
+            return {"name": "whitespace"}
+        return {"name": self.name, "cjk": self.cjk, "stemming": self.stemming, "stopwords": self.stopwords}
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "Analyzer":
+        return cls(**config)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Analyzer) and self.config == other.config
+
+    def __hash__(self) -> int:
+        return hash(tuple(sorted(self.config.items())))
+
+    def __repr__(self) -> str:
+        return f"Analyzer({self.config})"
+
+    def analyze(self, text: str) -> list[str]:
+        """Tokenize a document."""
+        if self.name == "whitespace":
+            return text.lower().split()
+
+        text = unicodedata.normalize("NFKC", text).lower()
+        tokens: list[str] = []
+        for cjk_run, word in _TOKEN_RE.findall(text):
+            if word:
+                if word in self._stop:
+                    continue
+                tokens.append(_stem(word) if self.stemming else word)
+            elif self._jieba is not None:
+                tokens.extend(w for w in self._jieba.lcut_for_search(cjk_run) if w.strip())
+            elif len(cjk_run) == 1:
+                tokens.append(cjk_run)
+            else:
+                tokens.extend(cjk_run[i : i + 2] for i in range(len(cjk_run) - 1))
+        return tokens
+
+    def _analyze_query(self, query: str) -> tuple[str, ...]:
+        return tuple(self.analyze(query))
+
+    def analyze_query(self, query: str) -> tuple[str, ...]:
+        """Tokenize a query (memoized: identical queries skip the pipeline)."""
+        return self._query_cache(query)
+
+
+def get_analyzer() -> Analyzer:
+    """Build the analyzer configured in ``Settings`` (``BM25_*``)."""
+    from advence_rag.config import get_settings
+
+    settings = get_settings()
+    return Analyzer(
+        name=settings.bm25_analyzer,
+        cjk=settings.bm25_cjk_segmenter,
+        stemming=settings.bm25_stemming,
+        stopwords=settings.bm25_stopwords,
+    )
@@ -0,0 +1,775 @@
+"""BM25 Index - 增量維護的關鍵字倒排索引。
+
+On-disk layout (``persist_dir``)::
+
+    CURRENT                 name of the active segment
+    seg_000001/             immutable columnar segment (memory-mapped)
+        meta.json           format version, collection statistics and analyzer
+        terms.bin           UTF-8 terms, sorted, concatenated
+        term_offsets.npy    uint64 [T + 1] offsets into terms.bin
+        postings_offsets.npy int64 [T + 1] offsets into the postings arrays
+        postings_docs.npy   int32 doc numbers, ascending within each term
+        postings_tfs.npy    int32 term frequencies
+        term_max_tf.npy     int32 per-term max tf (score upper bound)
+        term_min_dl.npy     int32 per-term min doc length (score upper bound)
+        doc_len.npy         int32 [N] document lengths in tokens
+        text.bin / text_offsets.npy   document contents
+        ids.bin / id_offsets.npy      external document IDs
+    seg_000001.journal      append-only log of writes since the segment,
+                            including each document's analyzed term counts
+
+Opening an index only maps the arrays, so every uvicorn worker shares the
+same pages through the OS page cache instead of unpickling the corpus.
+"""
+
+import bisect
+import json
+import logging
+import math
+import mmap
+import os
+import pickle
+import shutil
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+
+from advence_rag.tools.analyzer import Analyzer
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters (same defaults as rank_bm25.BM25Okapi)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Merge into a new segment once this fraction of stored documents are tombstones
+COMPACTION_RATIO = 0.2
+
+# Merge the in-memory delta into a new segment once it holds this many documents
+# (or DELTA_RATIO of the segment, whichever is larger)
+MIN_MERGE_DOCS = 1000
+DELTA_RATIO = 0.25
+
+FORMAT_VERSION = 3
+
+
+def _open_blob(path: Path) -> bytes | mmap.mmap:
+    if path.stat().st_size == 0:
+        return b""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class _TermTable:
+    """Sequence view over the sorted term blob, for ``bisect``."""
+
+    def __init__(self, blob: bytes | mmap.mmap, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._blob[int(self._offsets[i]):int(self._offsets[i + 1])]
+
+
+class _Segment:
+    """Immutable, memory-mapped BM25 segment."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        if path is None:
+            # Empty segment for a fresh index
+            self.num_docs = 0
+            self.total_len = 0
+            self.analyzer_config = None
+            self.doc_len = np.zeros(0, dtype=np.int32)
+            self._terms = _TermTable(b"", np.zeros(1, dtype=np.uint64))
+            self.columns = {name: (b"", np.zeros(1, dtype=np.int64)) for name in ("text", "ids")}
+            return
+
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported BM25 segment format: {meta.get('format_version')}")
+
+        def load(name: str) -> np.ndarray:
+            return np.load(path / name, mmap_mode="r")
+
+        self.num_docs = int(meta["num_docs"])
+        self.total_len = int(meta["total_len"])
+        # Segments written before analyzers existed used lower().split()
+        self.analyzer_config = meta.get("analyzer", {"name": "whitespace"})
+        self.doc_len = load("doc_len.npy")
+        self._terms = _TermTable(_open_blob(path / "terms.bin"), load("term_offsets.npy"))
+        self._post_offsets = load("postings_offsets.npy")
+        self._post_docs = load("postings_docs.npy")
+        self._post_tfs = load("postings_tfs.npy")
+        self._max_tf = load("term_max_tf.npy")
+        self._min_dl = load("term_min_dl.npy")
+        self.columns = {
+            "text": (_open_blob(path / "text.bin"), load("text_offsets.npy")),
+            "ids": (_open_blob(path / "ids.bin"), load("id_offsets.npy")),
+        }
+
+    @property
+    def num_terms(self) -> int:
+        return len(self._terms)
+
+    def lookup(self, term: str) -> int:
+        """Return the term number, or -1 if the term is not in the segment."""
+        key = term.encode("utf-8")
+        i = bisect.bisect_left(self._terms, key)
+        if i < len(self._terms) and self._terms[i] == key:
+            return i
+        return -1
+
+    def terms(self) -> list[str]:
+        offsets = self._terms._offsets.tolist()
+        blob = bytes(self._terms._blob)
+        return [blob[a:b].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+
+    def postings(self, i: int) -> tuple[np.ndarray, np.ndarray]:
+        start, end = int(self._post_offsets[i]), int(self._post_offsets[i + 1])
+        return self._post_docs[start:end], self._post_tfs[start:end]
+
+    def term_stats(self, i: int) -> tuple[int, int, int]:
+        """Return (df, max tf, min doc length) of a term."""
+        df = int(self._post_offsets[i + 1] - self._post_offsets[i])
+        return df, int(self._max_tf[i]), int(self._min_dl[i])
+
+    def _value(self, column: str, doc: int) -> str:
+        blob, offsets = self.columns[column]
+        return blob[int(offsets[doc]):int(offsets[doc + 1])].decode("utf-8")
+
+    def text(self, doc: int) -> str:
+        return self._value("text", doc)
+
+    def doc_id(self, doc: int) -> str:
+        return self._value("ids", doc)
+
+    def all_postings(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (term number, doc, tf) for every posting."""
+        if self.path is None:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        dfs = np.diff(self._post_offsets)
+        terms = np.repeat(np.arange(self.num_terms, dtype=np.int64), dfs)
+        return terms, np.asarray(self._post_docs, dtype=np.int64), np.asarray(self._post_tfs, dtype=np.int64)
+
+
+def _write_blob(path: Path, items: Iterable[bytes]) -> np.ndarray:
+    offsets = [0]
+    with open(path, "wb") as f:
+        for item in items:
+            f.write(item)
+            offsets.append(offsets[-1] + len(item))
+    return np.asarray(offsets, dtype=np.int64)
+
+
+def _write_column(
+    path: Path,
+    column: tuple[bytes | mmap.mmap, np.ndarray],
+    docs: np.ndarray,
+    extra: list[str],
+) -> np.ndarray:
+    """Write the values of segment ``docs`` followed by ``extra`` as a blob.
+
+    Runs of consecutive segment documents are copied as single slices, so
+    merging a segment with few tombstones is close to a file copy.
+    """
+    blob, offsets = column
+    encoded = [value.encode("utf-8") for value in extra]
+    lengths = np.concatenate([
+        np.diff(np.asarray(offsets, dtype=np.int64))[docs],
+        np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)),
+    ])
+    with open(path, "wb") as f:
+        if len(docs):
+            for run in np.split(docs, np.flatnonzero(np.diff(docs) != 1) + 1):
+                f.write(blob[int(offsets[run[0]]):int(offsets[run[-1] + 1])])
+        for value in encoded:
+            f.write(value)
+    return np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+
+
+class BM25Index:
+    """Incrementally maintained BM25 inverted index with persistence.
+
+    The index is an immutable memory-mapped segment plus an in-memory delta
+    of documents added since the segment was written. ``add`` only touches
+    the postings of the new documents' terms and ``delete`` only tombstones
+    the document. Like Lucene, tombstoned documents still count towards the
+    collection statistics until the next merge drops them.
+
+    Writes are appended to the segment's journal; other processes sharing the
+    directory replay the journal tail (or reopen a newer segment) before each
+    search. The index assumes a single writing process.
+
+    Documents are analyzed once, when added: the journal stores their term
+    counts and segments store postings, so replays and merges never
+    re-tokenize. An existing index keeps the analyzer it was built with;
+    ``analyzer`` applies to new indexes and takes over on ``clear()``.
+    """
+
+    def __init__(self, persist_dir: Path, legacy_path: Path | None = None, analyzer: Analyzer | None = None):
+        self.persist_dir = persist_dir
+        self.legacy_path = legacy_path
+        self._configured_analyzer = analyzer or Analyzer()
+        self.analyzer = self._configured_analyzer
+        self._current_path = persist_dir / "CURRENT"
+        self._lock = threading.RLock()
+        self._segment = _Segment()
+        self._segment_name: str | None = None
+        self._journal_path: Path | None = None
+        self._current_stat: tuple[int, int] | None = None
+        self._reset_delta()
+        self._load()
+
+    def _reset_delta(self):
+        base_n = self._segment.num_docs
+        self._delta_texts: list[str] = []
+        self._delta_ids: list[str] = []
+        self._delta_len: list[int] = []
+        self._delta_postings: dict[str, tuple[list[int], list[int]]] = {}
+        # term -> [max tf, min doc length] over the delta postings
+        self._delta_stats: dict[str, list[int]] = {}
+        self._deleted: set[int] = set()
+        self._total_len = self._segment.total_len
+        self._id_to_doc: dict[str, int] | None = None  # Built lazily by writers
+        self._journal_offset = 0
+        self._doc_len_cache: np.ndarray | None = None
+        self._alive_cache: np.ndarray | None = None
+        self._num_docs = base_n
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def _ids_map(self) -> dict[str, int]:
+        if self._id_to_doc is None:
+            mapping = {self._segment.doc_id(doc): doc for doc in range(self._segment.num_docs)}
+            base_n = self._segment.num_docs
+            for i, d_id in enumerate(self._delta_ids):
+                mapping[d_id] = base_n + i
+            for doc in self._deleted:
+                d_id = self._doc_id(doc)
+                if mapping.get(d_id) == doc:
+                    del mapping[d_id]
+            self._id_to_doc = mapping
+        return self._id_to_doc
+
+    @property
+    def doc_ids(self) -> list[str]:
+        """IDs of all live (non-deleted) documents."""
+        with self._lock:
+            self._refresh()
+            return list(self._ids_map())
+
+    @property
+    def corpus(self) -> list[str]:
+        """Contents of all live (non-deleted) documents."""
+        with self._lock:
+            self._refresh()
+            return [self._text(doc) for doc in self._ids_map().values()]
+
+    @property
+    def tombstone_count(self) -> int:
+        return len(self._deleted)
+
+    def __len__(self) -> int:
+        return self._num_docs - len(self._deleted)
+
+    def __contains__(self, doc_id: object) -> bool:
+        with self._lock:
+            self._refresh()
+            return doc_id in self._ids_map()
+
+    def _text(self, doc: int) -> str:
+        base_n = self._segment.num_docs
+        return self._segment.text(doc) if doc < base_n else self._delta_texts[doc - base_n]
+
+    def _doc_id(self, doc: int) -> str:
+        base_n = self._segment.num_docs
+        return self._segment.doc_id(doc) if doc < base_n else self._delta_ids[doc - base_n]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        if not self._current_path.exists() and self.legacy_path and self.legacy_path.exists():
+            self._migrate_legacy()
+        self._open_current()
+
+    def _open_current(self):
+        try:
+            stat = self._current_path.stat()
+        except FileNotFoundError:
+            return
+
+        try:
+            name = self._current_path.read_text(encoding="utf-8").strip()
+            segment = _Segment(self.persist_dir / name)
+        except Exception as e:
+            logger.error(f"Failed to open BM25 segment: {e}")
+            return
+
+        self._segment = segment
+        self._segment_name = name
+        self._use_segment_analyzer()
+        self._journal_path = self.persist_dir / f"{name}.journal"
+        self._current_stat = (stat.st_ino, stat.st_mtime_ns)
+        self._reset_delta()
+        self._replay_journal()
+
+    def _use_segment_analyzer(self):
+        config = self._segment.analyzer_config
+        if config is None or config == self.analyzer.config:
+            return
+        self.analyzer = Analyzer.from_config(config)
+        if self.analyzer.config != config:
+            # e.g. built with jieba on a worker where jieba is not installed
+            logger.error(
+                f"BM25 index was built with {config}, which cannot be loaded here (using "
+                f"{self.analyzer.config}); keyword queries will not match the indexed terms. "
+                f"Install the missing segmenter (pip install jieba) or run utils/rebuild_bm25.py"
+            )
+        elif self.analyzer != self._configured_analyzer:
+            logger.warning(
+                f"BM25 index was built with {self.analyzer}, not the configured "
+                f"{self._configured_analyzer}; run utils/rebuild_bm25.py to re-index"
+            )
+
+    def _refresh(self):
+        """Pick up segments and journal records written by other processes."""
+        try:
+            stat = self._current_path.stat()
+        except FileNotFoundError:
+            return
+        if (stat.st_ino, stat.st_mtime_ns) != self._current_stat:
+            self._open_current()
+            return
+
+        journal = self._journal_path
+        try:
+            if journal is not None and journal.stat().st_size > self._journal_offset:
+                self._replay_journal()
+        except FileNotFoundError:
+            pass
+
+    def _replay_journal(self):
+        journal = self._journal_path
+        if journal is None or not journal.exists():
+            return
+        with open(journal, "rb") as f:
+            f.seek(self._journal_offset)
+            while True:
+                try:
+                    op = pickle.load(f)
+                except EOFError:
+                    break
+                except Exception as e:
+                    # Torn trailing record (concurrent append or crash): retry later
+                    logger.debug(f"Stopped BM25 journal replay: {e}")
+                    break
+                self._apply(op)
+                self._journal_offset = f.tell()
+
+    def _apply(self, op: tuple):
+        if op[0] == "add":
+            documents, ids, replaced = op[1:4]
+            # Records written before analyzers existed carry no term counts
+            doc_terms = op[4] if len(op) > 4 else None
+            self._tombstone_docs(replaced)
+            self._index_documents(documents, ids, doc_terms)
+        elif op[0] == "delete":
+            self._tombstone_docs(op[1])
+
+    def _append_journal(self, op: tuple):
+        journal = self._journal_path
+        if journal is None:
+            # No segment yet: write an empty one so the journal has an anchor
+            self._write_segment()
+            journal = self._journal_path
+        record = pickle.dumps(op, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(journal, "ab") as f:
+            f.write(record)
+            self._journal_offset = f.tell()
+
+    def _migrate_legacy(self):
+        """Convert ``bm25_index.pkl`` (and its journal) into a segment."""
+        logger.info(f"Migrating legacy BM25 index from {self.legacy_path}")
+        try:
+            with open(self.legacy_path, "rb") as f:
+                data = pickle.load(f)
+            docs = dict(zip(data.get("doc_ids", []), data.get("corpus", [])))
+
+            legacy_journal = self.legacy_path.with_name(self.legacy_path.name + ".journal")
+            if legacy_journal.exists():
+                with open(legacy_journal, "rb") as f:
+                    while True:
+                        try:
+                            op = pickle.load(f)
+                        except Exception:
+                            break
+                        if op[0] == "add":
+                            for text, d_id in zip(op[1], op[2]):
+                                docs.pop(d_id, None)
+                                docs[d_id] = text
+                        elif op[0] == "delete":
+                            for d_id in op[1]:
+                                docs.pop(d_id, None)
+                legacy_journal.rename(legacy_journal.with_name(legacy_journal.name + ".migrated"))
+
+            self._index_documents(list(docs.values()), list(docs.keys()))
+            self._write_segment()
+            self.legacy_path.rename(self.legacy_path.with_name(self.legacy_path.name + ".migrated"))
+        except Exception as e:
+            logger.error(f"Failed to migrate legacy BM25 index: {e}")
+            self._segment = _Segment()
+            self._reset_delta()
+
+    def _write_segment(self):
+        """Merge the segment, the delta and the tombstones into a new segment."""
+        base = self._segment
+        base_n = base.num_docs
+        n = self._num_docs
+
+        alive = self._alive()
+        remap = np.cumsum(alive, dtype=np.int64) - 1
+
+        # Union of base and delta vocabularies, in UTF-8 byte order
+        base_terms = base.terms()
+        vocab = sorted(set(base_terms).union(self._delta_postings))
+        term_no = {term: i for i, term in enumerate(vocab)}
+
+        b_terms, b_docs, b_tfs = base.all_postings()
+        base_map = np.asarray([term_no[t] for t in base_terms], dtype=np.int64)
+        d_terms: list[int] = []
+        d_docs: list[int] = []
+        d_tfs: list[int] = []
+        for term, (docs, tfs) in self._delta_postings.items():
+            d_terms.extend([term_no[term]] * len(docs))
+            d_docs.extend(docs)
+            d_tfs.extend(tfs)
+
+        terms = np.concatenate([base_map[b_terms], np.asarray(d_terms, dtype=np.int64)])
+        docs = np.concatenate([b_docs, np.asarray(d_docs, dtype=np.int64)])
+        tfs = np.concatenate([b_tfs, np.asarray(d_tfs, dtype=np.int64)])
+
+        keep = alive[docs]
+        terms, docs, tfs = terms[keep], remap[docs[keep]], tfs[keep]
+        order = np.lexsort((docs, terms))
+        terms, docs, tfs = terms[order], docs[order], tfs[order]
+
+        # Drop terms whose postings were all tombstoned
+        df = np.bincount(terms, minlength=len(vocab))
+        used = np.flatnonzero(df)
+        vocab = [vocab[i] for i in used]
+        df = df[used]
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(df, out=offsets[1:])
+
+        doc_len = self._doc_lengths()[alive].astype(np.int32)
+        if len(vocab):
+            starts = offsets[:-1]
+            max_tf = np.maximum.reduceat(tfs, starts).astype(np.int32)
+            min_dl = np.minimum.reduceat(doc_len[docs], starts).astype(np.int32)
+        else:
+            max_tf = min_dl = np.zeros(0, dtype=np.int32)
+
+        seq = int(self._segment_name.split("_")[1]) + 1 if self._segment_name else 1
+        name = f"seg_{seq:06d}"
+        tmp = self.persist_dir / f".{name}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        live_docs = np.flatnonzero(alive)
+        live_base = live_docs[live_docs < base_n]
+        live_delta = (live_docs[live_docs >= base_n] - base_n).tolist()
+        np.save(tmp / "term_offsets.npy", _write_blob(tmp / "terms.bin", (t.encode("utf-8") for t in vocab)).astype(np.uint64))
+        np.save(tmp / "postings_offsets.npy", offsets)
+        np.save(tmp / "postings_docs.npy", docs.astype(np.int32))
+        np.save(tmp / "postings_tfs.npy", tfs.astype(np.int32))
+        np.save(tmp / "term_max_tf.npy", max_tf)
+        np.save(tmp / "term_min_dl.npy", min_dl)
+        np.save(tmp / "doc_len.npy", doc_len)
+        np.save(tmp / "text_offsets.npy", _write_column(
+            tmp / "text.bin", base.columns["text"], live_base, [self._delta_texts[d] for d in live_delta]
+        ))
+        np.save(tmp / "id_offsets.npy", _write_column(
+            tmp / "ids.bin", base.columns["ids"], live_base, [self._delta_ids[d] for d in live_delta]
+        ))
+        (tmp / "meta.json").write_text(json.dumps({
+            "format_version": FORMAT_VERSION,
+            "num_docs": len(live_docs),
+            "num_terms": len(vocab),
+            "total_len": int(doc_len.sum()),
+            "k1": BM25_K1,
+            "b": BM25_B,
+            "analyzer": self.analyzer.config,
+        }), encoding="utf-8")
+
+        # Carry the writer's ID map over instead of rebuilding it from the new segment
+        id_map = None
+        if self._id_to_doc is not None:
+            new_numbers = remap.tolist()
+            id_map = {d_id: new_numbers[doc] for d_id, doc in self._id_to_doc.items()}
+
+        os.replace(tmp, self.persist_dir / name)
+        current_tmp = self.persist_dir / "CURRENT.tmp"
+        current_tmp.write_text(name, encoding="utf-8")
+        os.replace(current_tmp, self._current_path)
+
+        old_name = self._segment_name
+        self._open_current()
+        self._id_to_doc = id_map
+        if old_name:
+            # Readers that still map the old files keep them alive (POSIX)
+            shutil.rmtree(self.persist_dir / old_name, ignore_errors=True)
+            (self.persist_dir / f"{old_name}.journal").unlink(missing_ok=True)
+        logger.info(f"Wrote BM25 segment {name}: {len(live_docs)} docs, {len(vocab)} terms (from {n}, {base_n} in previous segment)")
+
+    def _maybe_merge(self):
+        delta_n = self._num_docs - self._segment.num_docs
+        if (
+            len(self._deleted) > COMPACTION_RATIO * self._num_docs
+            or delta_n >= max(MIN_MERGE_DOCS, DELTA_RATIO * self._segment.num_docs)
+        ):
+            self._write_segment()
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _analyze(self, documents: list[str]) -> list[dict[str, int]]:
+        return [dict(Counter(self.analyzer.analyze(text))) for text in documents]
+
+    def _index_documents(
+        self,
+        documents: list[str],
+        ids: list[str],
+        doc_terms: list[dict[str, int]] | None = None,
+    ):
+        if doc_terms is None:
+            doc_terms = self._analyze(documents)
+        for text, d_id, term_counts in zip(documents, ids, doc_terms):
+            doc = self._num_docs
+            dl = sum(term_counts.values())
+            self._delta_texts.append(text)
+            self._delta_ids.append(d_id)
+            self._delta_len.append(dl)
+            self._total_len += dl
+            self._num_docs += 1
+            if self._id_to_doc is not None:
+                self._id_to_doc[d_id] = doc
+
+            for term, tf in term_counts.items():
+                plist = self._delta_postings.get(term)
+                if plist is None:
+                    self._delta_postings[term] = ([doc], [tf])
+                    self._delta_stats[term] = [tf, dl]
+                else:
+                    plist[0].append(doc)
+                    plist[1].append(tf)
+                    stats = self._delta_stats[term]
+                    stats[0] = max(stats[0], tf)
+                    stats[1] = min(stats[1], dl)
+
+        self._doc_len_cache = None
+        self._alive_cache = None
+
+    def _tombstone_docs(self, docs: Iterable[int]):
+        for doc in docs:
+            self._deleted.add(doc)
+            if self._id_to_doc is not None:
+                d_id = self._doc_id(doc)
+                if self._id_to_doc.get(d_id) == doc:
+                    del self._id_to_doc[d_id]
+        self._alive_cache = None
+
+    def _doc_lengths(self) -> np.ndarray:
+        if self._doc_len_cache is None:
+            self._doc_len_cache = np.concatenate([
+                np.asarray(self._segment.doc_len, dtype=np.float64),
+                np.asarray(self._delta_len, dtype=np.float64),
+            ])
+        return self._doc_len_cache
+
+    def _alive(self) -> np.ndarray:
+        if self._alive_cache is None:
+            alive = np.ones(self._num_docs, dtype=bool)
+            if self._deleted:
+                alive[list(self._deleted)] = False
+            self._alive_cache = alive
+        return self._alive_cache
+
+    def compact(self):
+        """Physically remove tombstones and persist a fresh segment."""
+        with self._lock:
+            self._refresh()
+            self._write_segment()
+
+    def clear(self):
+        """Remove every document from the index."""
+        with self._lock:
+            self._refresh()
+            self._tombstone_docs(range(self._num_docs))
+            self.analyzer = self._configured_analyzer
+            self._write_segment()
+
+    def add(self, documents: list[str], ids: list[str]):
+        with self._lock:
+            self._refresh()
+            mapping = self._ids_map()
+            # Re-adding an existing ID replaces the previous version
+            replaced = [mapping[d_id] for d_id in ids if d_id in mapping]
+            doc_terms = self._analyze(documents)
+            self._append_journal(("add", list(documents), list(ids), replaced, doc_terms))
+            self._tombstone_docs(replaced)
+            self._index_documents(documents, ids, doc_terms)
+            self._maybe_merge()
+
+    def delete(self, ids: list[str]):
+        with self._lock:
+            self._refresh()
+            mapping = self._ids_map()
+            docs = [mapping[d_id] for d_id in ids if d_id in mapping]
+            if not docs:
+                return
+            self._append_journal(("delete", docs))
+            self._tombstone_docs(docs)
+            self._maybe_merge()
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _idf(self, df: int) -> float:
+        # Lucene-style IDF: always positive, unlike BM25Okapi's epsilon floor
+        return math.log(1.0 + (self._num_docs - df + 0.5) / (df + 0.5))
+
+    @staticmethod
+    def _term_weight(tf, dl, avgdl: float):
+        return tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * dl / avgdl))
+
+    def search(self, query: str, top_k: int = 10) -> list[dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            if not len(self) or top_k <= 0:
+                return []
+            ranked = self._score(Counter(self.analyzer.analyze_query(query)), top_k)
+            return [
+                {
+                    "content": self._text(doc),
+                    "id": self._doc_id(doc),
+                    "bm25_score": float(score),
+                    "source": "bm25",
+                }
+                for doc, score in ranked
+                if score > 0  # Only return if there's some match
+            ]
+
+    def _term_postings(self, term: str) -> tuple[np.ndarray, np.ndarray, int, int] | None:
+        """Return (docs, tfs, max tf, min doc length) across segment and delta."""
+        parts_docs, parts_tfs = [], []
+        max_tf, min_dl = 0, 2**31
+
+        i = self._segment.lookup(term)
+        if i >= 0:
+            docs, tfs = self._segment.postings(i)
+            _, seg_max_tf, seg_min_dl = self._segment.term_stats(i)
+            parts_docs.append(docs)
+            parts_tfs.append(tfs)
+            max_tf, min_dl = seg_max_tf, seg_min_dl
+
+        delta = self._delta_postings.get(term)
+        if delta is not None:
+            parts_docs.append(np.asarray(delta[0]))
+            parts_tfs.append(np.asarray(delta[1]))
+            d_max_tf, d_min_dl = self._delta_stats[term]
+            max_tf, min_dl = max(max_tf, d_max_tf), min(min_dl, d_min_dl)
+
+        if not parts_docs:
+            return None
+        if len(parts_docs) == 1:
+            return np.asarray(parts_docs[0]), np.asarray(parts_tfs[0]), max_tf, min_dl
+        # Delta doc numbers all follow the segment's, so the result stays sorted
+        return np.concatenate(parts_docs), np.concatenate(parts_tfs), max_tf, min_dl
+
+    def _score(self, query_tf: Counter, top_k: int) -> list[tuple[int, float]]:
+        """Term-at-a-time BM25 scoring with MaxScore pruning.
+
+        Only the postings of the query terms are visited, scored with
+        vectorized NumPy operations into an accumulator whose pages are only
+        touched for matching documents. Terms are processed in decreasing
+        order of their score upper bound; once the current k-th best score
+        beats the combined bound of the remaining terms, no unseen document
+        can enter the top-k, so the remaining terms only update the surviving
+        candidates (located by binary search in their sorted postings).
+        """
+        n = self._num_docs
+        avgdl = self._total_len / n or 1.0
+        doc_len = self._doc_lengths()
+        alive = self._alive() if self._deleted else None
+
+        terms = []
+        for term, qtf in query_tf.items():
+            found = self._term_postings(term)
+            if found is None:
+                continue
+            docs, tfs, max_tf, min_dl = found
+            weight = self._idf(len(docs)) * qtf
+            if alive is not None:
+                mask = alive[docs]
+                docs, tfs = docs[mask], tfs[mask]
+            terms.append((weight * self._term_weight(max_tf, min_dl, avgdl), weight, docs, tfs))
+        terms.sort(key=lambda t: t[0], reverse=True)
+
+        acc = np.zeros(n)  # calloc'd: untouched pages cost nothing
+        touched: list[np.ndarray] = []
+        touched_count = 0
+
+        def candidates() -> np.ndarray:
+            if touched_count * 4 > n:
+                return np.flatnonzero(acc)
+            return np.unique(np.concatenate(touched)) if touched else np.zeros(0, dtype=np.int64)
+
+        cand_docs: np.ndarray | None = None  # Set once the candidate set is closed
+        remaining = sum(t[0] for t in terms)
+
+        for bound, weight, docs, tfs in terms:
+            remaining -= bound
+            if cand_docs is None:
+                # Doc numbers are unique within a postings list
+                acc[docs] += weight * self._term_weight(tfs, doc_len[docs], avgdl)
+                touched.append(docs)
+                touched_count += len(docs)
+            elif len(docs) and len(cand_docs):
+                pos = np.minimum(np.searchsorted(docs, cand_docs), len(docs) - 1)
+                hit = docs[pos] == cand_docs
+                pos = pos[hit]
+                acc[cand_docs[hit]] += weight * self._term_weight(tfs[pos], doc_len[docs[pos]], avgdl)
+
+            if cand_docs is None and remaining > 0 and touched_count >= top_k:
+                docs_so_far = candidates()
+                scores = acc[docs_so_far]
+                if len(scores) >= top_k:
+                    threshold = np.partition(scores, -top_k)[-top_k]
+                    if threshold >= remaining:
+                        # Candidates that cannot reach the threshold are dropped
+                        cand_docs = docs_so_far[scores + remaining >= threshold]
+
+        if cand_docs is None:
+            cand_docs = candidates()
+        cand_scores = acc[cand_docs]
+        if len(cand_scores) > top_k:
+            top = np.argpartition(cand_scores, -top_k)[-top_k:]
+        else:
+            top = np.arange(len(cand_scores))
+        top = top[np.argsort(-cand_scores[top], kind="stable")]
+        return [(int(cand_docs[i]), float(cand_scores[i])) for i in top]
@@ -1,130 +1,66 @@
 import logging
-import pickle
 import asyncio
 from pathlib import Path
 from typing import Any
 
 from advence_rag.config import get_settings
+from advence_rag.tools.analyzer import get_analyzer
+from advence_rag.tools.bm25 import BM25Index
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Chroma's built-in embedding model; used as the content-hash store namespace
+CHROMA_EMBEDDING_MODEL_ID = "chroma/all-MiniLM-L6-v2"
+
 # Global state for lazy initialization
 _chroma_client = None
 _collection = None
+_embedding_function = None
 _bm25_index = None
 
 
-class BM25Index:
-    """Simple wrapper for rank_bm25 with persistence."""
-    
-    def __init__(self, persist_path: Path):
-        self.persist_path = persist_path
-        self.corpus: list[str] = []
-        self.doc_ids: list[str] = []
-        self.bm25 = None
-        self._load()
-
-    def _load(self):
-        if self.persist_path.exists():
-            try:
-                with open(self.persist_path, "rb") as f:
-                    data = pickle.load(f)
-                    self.corpus = data.get("corpus", [])
-                    self.doc_ids = data.get("doc_ids", [])
-                    self._rebuild_model()
-            except Exception as e:
-                logger.error(f"Failed to load BM25 index: {e}")
-
-    def _save(self):
-        try:
-            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.persist_path, "wb") as f:
-                pickle.dump({
-                    "corpus": self.corpus,
-                    "doc_ids": self.doc_ids
-                }, f)
-        except Exception as e:
-            logger.error(f"Failed to save BM25 index: {e}")
-
-    def _rebuild_model(self):
-        if not self.corpus:
-            self.bm25 = None
-            return
-        
-        from rank_bm25 import BM25Okapi
-        # Simple tokenization: lower case and split. 
-        # Future: Use tiktoken or specialized tokenizer.
-        tokenized_corpus = [doc.lower().split() for doc in self.corpus]
-        self.bm25 = BM25Okapi(tokenized_corpus)
-
-    def add(self, documents: list[str], ids: list[str]):
-        self.corpus.extend(documents)
-        self.doc_ids.extend(ids)
-        self._rebuild_model()
-        self._save()
-
-    def delete(self, ids: list[str]):
-        ids_set = set(ids)
-        new_corpus = []
-        new_ids = []
-        for doc, d_id in zip(self.corpus, self.doc_ids):
-            if d_id not in ids_set:
-                new_corpus.append(doc)
-                new_ids.append(d_id)
-        
-        self.corpus = new_corpus
-        self.doc_ids = new_ids
-        self._rebuild_model()
-        self._save()
-
-    def search(self, query: str, top_k: int = 10) -> list[dict[str, Any]]:
-        if not self.bm25:
-            return []
-        
-        tokenized_query = query.lower().split()
-        scores = self.bm25.get_scores(tokenized_query)
-        
-        # Get top-k indices
-        import numpy as np
-        top_indices = np.argsort(scores)[::-1][:top_k]
-        
-        results = []
-        for idx in top_indices:
-            if scores[idx] > 0: # Only return if there's some match
-                results.append({
-                    "content": self.corpus[idx],
-                    "id": self.doc_ids[idx],
-                    "bm25_score": float(scores[idx]),
-                    "source": "bm25"
-                })
-        return results
-
-
 def _get_bm25_index() -> BM25Index:
     global _bm25_index
     if _bm25_index is None:
-        persist_path = Path(settings.chroma_persist_directory) / "bm25_index.pkl"
-        _bm25_index = BM25Index(persist_path)
+        data_dir = Path(settings.chroma_persist_directory)
+        _bm25_index = BM25Index(
+            data_dir / "bm25_index",
+            legacy_path=data_dir / "bm25_index.pkl",
+            analyzer=get_analyzer(),
+        )
     return _bm25_index
 
 
+def _bump_index_generation(ids: list[str]):
+    """Mark ``ids`` as changed so caches depending on them are invalidated."""
+    try:
+        from advence_rag.infrastructure.persistence.repository_factory import get_index_versions
+        get_index_versions().bump(ids)
+    except Exception as e:
+        logger.error(f"Failed to bump index generation: {e}")
+
+
 def _get_collection():
     """Get or create Chroma collection (lazy initialization)."""
-    global _chroma_client, _collection
+    global _chroma_client, _collection, _embedding_function
     
     if _collection is None:
         try:
             import chromadb
             from chromadb.config import Settings as ChromaSettings
+            from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
             
             _chroma_client = chromadb.PersistentClient(
                 path=str(settings.chroma_persist_directory),
                 settings=ChromaSettings(anonymized_telemetry=False),
             )
+            # Same model Chroma uses by default; kept so ingestion can embed explicitly
+            _embedding_function = DefaultEmbeddingFunction()
             _collection = _chroma_client.get_or_create_collection(
                 name=settings.chroma_collection_name,
                 metadata={"hnsw:space": "cosine"},
+                embedding_function=_embedding_function,
             )
         except ImportError:
             raise ImportError(
@@ -261,10 +197,22 @@ async def add_documents(
                 cleaned_metadatas.append(cleaned)
             metadatas = cleaned_metadatas
         
+        # Reuse embeddings of chunks whose content was embedded before
+        embeddings = None
+        from advence_rag.infrastructure.persistence.repository_factory import get_embedding_store
+        store = get_embedding_store(CHROMA_EMBEDDING_MODEL_ID)
+        if store is not None and _embedding_function is not None:
+            async def embed_batch(texts: list[str]) -> list[list[float]]:
+                vectors = await asyncio.to_thread(_embedding_function, texts)
+                return [[float(x) for x in v] for v in vectors]
+
+            embeddings = await store.embed(documents, embed_batch)
+        
         # Blocking ChromaDB write
         await asyncio.to_thread(
             collection.add,
             documents=documents,
+            embeddings=embeddings,
             metadatas=metadatas,
             ids=ids,
         )
@@ -272,11 +220,13 @@ async def add_documents(
         # 2. Update BM25 Index
         try:
             index = _get_bm25_index()
-            # BM25 update involves rebuilding model and disk write
+            # Incremental update: only the new documents are tokenized
             await asyncio.to_thread(index.add, documents, ids)
         except Exception as e:
             logger.error(f"Failed to update BM25 index: {e}")
         
+        await asyncio.to_thread(_bump_index_generation, ids)
+        
         return {
             "status": "success",
             "added_count": len(documents),
@@ -309,6 +259,8 @@ async def delete_documents(ids: list[str]) -> dict[str, Any]:
             await asyncio.to_thread(index.delete, ids)
         except Exception as e:
             logger.error(f"Failed to delete from BM25 index: {e}")
+        
+        await asyncio.to_thread(_bump_index_generation, ids)
             
         return {
             "status": "success",
@@ -1,14 +1,22 @@
 """Rerank Tool - 使用 Cross-Encoder 重新排序檢索結果。"""
 
 import asyncio
-from typing import Any
+import hashlib
+from typing import Any, Sequence
 
 from advence_rag.config import get_settings
+from advence_rag.utils.cache import TTLCache
+from advence_rag.utils.metrics import SIZE_BUCKETS, get_metrics
 
 settings = get_settings()
 
 # Lazy-loaded reranker
 _reranker = None
+_engine = None
+
+_batch_sizes = get_metrics().histogram(
+    "rerank_batch_size", "(query, chunk) pairs sent to the cross-encoder per rerank call (cache misses only)", buckets=SIZE_BUCKETS
+)
 
 
 def _get_reranker():
@@ -16,9 +24,23 @@ def _get_reranker():
     global _reranker
     
     if _reranker is None:
+        if settings.rerank_backend == "onnx":
+            from advence_rag.tools.rerank_onnx import OnnxCrossEncoder
+            _reranker = OnnxCrossEncoder(
+                settings.rerank_model,
+                onnx_file=settings.rerank_onnx_file,
+                max_length=settings.rerank_max_length,
+                num_threads=settings.rerank_num_threads,
+            )
+            return _reranker
+
         try:
             from sentence_transformers import CrossEncoder
-            _reranker = CrossEncoder(settings.rerank_model)
+            # max_length truncates (query, chunk) pairs at tokenization time
+            _reranker = CrossEncoder(settings.rerank_model, max_length=settings.rerank_max_length)
+            if settings.rerank_num_threads > 0:
+                import torch
+                torch.set_num_threads(settings.rerank_num_threads)
         except ImportError:
             raise ImportError(
                 "sentence-transformers is required for reranking. "
@@ -28,10 +50,78 @@ def _get_reranker():
     return _reranker
 
 
+class RerankEngine:
+    """Cross-encoder scoring with batching and a score cache.
+
+    Scores are cached per (query, document ID, content hash), so a document
+    that changed under the same ID is scored again. Only uncached pairs are
+    sent to the model, in batches of ``batch_size``.
+    """
+
+    def __init__(self, model: Any, batch_size: int = 16, cache_size: int = 4096):
+        self.model = model
+        self.batch_size = batch_size
+        self.cache = TTLCache(max_entries=cache_size)
+        self.scored_pairs = 0
+
+    @staticmethod
+    def _key(query: str, doc: dict[str, Any]) -> tuple[str, str, str]:
+        content = doc.get("content", "")
+        digest = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+        return (" ".join(query.split()), str(doc.get("id", "")), digest)
+
+    def score(self, query: str, documents: Sequence[dict[str, Any]]) -> list[float]:
+        """Relevance score of each document for ``query`` (blocking)."""
+        keys = [self._key(query, doc) for doc in documents]
+        scores: dict[tuple[str, str, str], float] = {}
+        pending: dict[tuple[str, str, str], str] = {}
+        for key, doc in zip(keys, documents):
+            if key in scores or key in pending:
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                scores[key] = cached
+            else:
+                pending[key] = doc.get("content", "")
+
+        if pending:
+            pairs = [(query, content) for content in pending.values()]
+            predicted = self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+            self.scored_pairs += len(pairs)
+            _batch_sizes.observe(len(pairs))
+            for key, value in zip(pending, predicted):
+                scores[key] = float(value)
+                self.cache.set(key, float(value))
+
+        return [scores[key] for key in keys]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "scored_pairs": self.scored_pairs,
+        }
+
+
+def get_rerank_engine() -> RerankEngine:
+    """Get or create the shared rerank engine (lazy initialization)."""
+    global _engine
+
+    if _engine is None:
+        _engine = RerankEngine(
+            _get_reranker(),
+            batch_size=settings.rerank_batch_size,
+            cache_size=settings.rerank_cache_size,
+        )
+        get_metrics().register_stats("rerank", _engine.stats, counters=("cache_hits", "cache_misses", "scored_pairs"))
+    return _engine
+
+
 async def rerank_results(
     query: str,
     documents: list[dict[str, Any]],
     top_k: int | None = None,
+    skip_small_pool: bool | None = None,
 ) -> dict[str, Any]:
     """使用 Cross-Encoder 重新排序檢索結果。
     
@@ -39,12 +129,16 @@ async def rerank_results(
         query: 原始查詢
         documents: 要重排序的文檔列表，每個文檔需有 'content' 欄位
         top_k: 返回的結果數量
+        skip_small_pool: 候選數量不超過 top_k 時跳過模型，保留原順序
+            (rerank_score 為 None)，預設使用設定值
         
     Returns:
         dict: 重排序後的結果
     """
     if top_k is None:
         top_k = settings.rerank_top_k
+    if skip_small_pool is None:
+        skip_small_pool = settings.rerank_skip_small_pool
     
     if not documents:
         return {
@@ -54,14 +148,21 @@ async def rerank_results(
             "reranked_count": 0,
         }
     
+    if skip_small_pool and len(documents) <= top_k:
+        # Every candidate is returned anyway; keep the fused order
+        return {
+            "status": "success",
+            "results": [{**doc, "rerank_score": None} for doc in documents],
+            "original_count": len(documents),
+            "reranked_count": 0,
+        }
+    
     try:
-        reranker = _get_reranker()
-        
-        # 準備 query-document pairs
-        pairs = [(query, doc.get("content", "")) for doc in documents]
+        engine = get_rerank_engine()
         
         # 計算相關性分數 (CPU bound inference, offload to thread)
-        scores = await asyncio.to_thread(reranker.predict, pairs)
+        # Cached pairs are skipped; the rest are scored in batches
+        scores = await asyncio.to_thread(engine.score, query, documents)
         
         # 將分數加入文檔並排序
         scored_docs = []
@@ -0,0 +1,48 @@
+"""Web Result Cache - 網路搜尋結果的持久化快取（支援 stale-while-revalidate）。
+
+Results are keyed on the normalized query and ``num_results`` only, so a
+result fetched from either provider serves both. Within ``ttl`` an entry
+is fresh; for another ``stale_ttl`` it is still served, but the caller
+should refresh it in the background.
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from advence_rag.utils.cache import SQLiteCache, normalize_query
+
+
+class WebResultCache:
+    """SQLite-backed cache of successful ``search_web`` results."""
+
+    def __init__(self, path: Path, ttl: float = 3600, stale_ttl: float = 86400, max_entries: int = 5000):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # Rows are dropped by SQLite only once they are too old to serve even stale
+        self._db = SQLiteCache(path, max_entries=max_entries, ttl=ttl + stale_ttl)
+
+    @staticmethod
+    def key(query: str, num_results: int) -> str:
+        digest = hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+        return f"{num_results}:{digest}"
+
+    def get(self, query: str, num_results: int) -> Optional[Tuple[dict[str, Any], bool]]:
+        """(result, is_fresh), or None on a miss."""
+        blob = self._db.get(self.key(query, num_results))
+        if blob is None:
+            return None
+        entry = json.loads(blob)
+        return entry["result"], time.time() - entry["fetched_at"] < self.ttl
+
+    def set(self, query: str, num_results: int, result: dict[str, Any]):
+        entry = {"fetched_at": time.time(), "result": result}
+        self._db.set(self.key(query, num_results), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+    def clear(self):
+        self._db.clear()
+
+    def __len__(self) -> int:
+        return len(self._db)
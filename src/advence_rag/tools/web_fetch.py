@@ -0,0 +1,276 @@
+"""Web Page Fetch Tool - 下載搜尋結果頁面、擷取正文並切塊，供 CRAG 使用。
+
+Search snippets are ~150 characters; this stage downloads the top result
+pages concurrently (bounded pool, per-page timeout, byte cap), extracts the
+main text with the standard library HTML parser and splits it into
+overlapping chunks that the reranker can score.
+
+Result URLs come from a third party, so only http(s) URLs whose host
+resolves to public addresses are fetched, and redirects are followed one
+hop at a time with the same check (no requests to localhost, the LAN or
+cloud metadata endpoints). The connection goes to the address that was
+checked, so a second DNS answer cannot redirect it (DNS rebinding).
+"""
+
+import asyncio
+import ipaddress
+import logging
+import re
+import socket
+import time
+from html.parser import HTMLParser
+from typing import Optional
+
+import httpx
+
+from advence_rag.utils.http import get_http_pool
+
+logger = logging.getLogger(__name__)
+
+# Elements whose text is never page content
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "header", "footer", "aside", "form", "iframe", "button"}
+# Elements that end a paragraph
+_BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "table", "tr", "td", "th",
+    "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote", "br", "hr", "dd", "dt", "figcaption",
+}
+# Main-content containers preferred over the whole body when they hold enough text
+_MAIN_TAGS = {"article", "main"}
+MIN_MAIN_CHARS = 200
+
+ALLOWED_SCHEMES = {"http", "https"}
+MAX_REDIRECTS = 5
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?。！？])\s*")
+
+
+class _TextExtractor(HTMLParser):
+    """Collects paragraphs (with their link-text share) and the page title."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.paragraphs: list[tuple[str, float, bool]] = []  # (text, link ratio, inside article/main)
+        self._skip_depth = 0
+        self._main_depth = 0
+        self._link_depth = 0
+        self._in_title = False
+        self._parts: list[str] = []
+        self._link_chars = 0
+
+    def _flush(self):
+        text = _WHITESPACE_RE.sub(" ", "".join(self._parts)).strip()
+        if text:
+            self.paragraphs.append((text, min(1.0, self._link_chars / len(text)), self._main_depth > 0))
+        self._parts = []
+        self._link_chars = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "a":
+            self._link_depth += 1
+        if tag in _BLOCK_TAGS:
+            self._flush()
+        if tag in _MAIN_TAGS:
+            self._main_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag == "a":
+            self._link_depth = max(0, self._link_depth - 1)
+        if tag in _BLOCK_TAGS:
+            self._flush()
+        if tag in _MAIN_TAGS:
+            self._main_depth = max(0, self._main_depth - 1)
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self._parts.append(data)
+            if self._link_depth:
+                self._link_chars += len(data.strip())
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def extract_main_text(html: str) -> tuple[str, str]:
+    """Return (title, main text) of an HTML page.
+
+    Navigation-like paragraphs (mostly link text) are dropped, and the
+    ``<article>``/``<main>`` content is used when it is substantial.
+    """
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+
+    paragraphs = [(text, in_main) for text, link_ratio, in_main in parser.paragraphs if link_ratio < 0.5]
+    main = [text for text, in_main in paragraphs if in_main]
+    if sum(len(text) for text in main) >= MIN_MAIN_CHARS:
+        body = main
+    else:
+        body = [text for text, _ in paragraphs]
+    return _WHITESPACE_RE.sub(" ", parser.title).strip(), "\n\n".join(body)
+
+
+def chunk_text(text: str, chunk_size: int = 800, overlap: int = 100) -> list[str]:
+    """Split text into chunks of at most ``chunk_size`` characters.
+
+    Paragraphs are packed together; longer paragraphs are split on sentence
+    boundaries (or hard-cut). Each chunk after the first starts with the
+    last ``overlap`` characters of the previous one.
+    """
+    pieces: list[str] = []
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= chunk_size:
+            pieces.append(paragraph)
+            continue
+        for sentence in _SENTENCE_RE.split(paragraph):
+            sentence = sentence.strip()
+            while len(sentence) > chunk_size:
+                pieces.append(sentence[:chunk_size])
+                sentence = sentence[chunk_size:]
+            if sentence:
+                pieces.append(sentence)
+
+    chunks: list[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > chunk_size:
+            chunks.append(current)
+            tail = current[-overlap:] if overlap > 0 else ""
+            current = f"{tail} {piece}".strip() if len(tail) + 1 + len(piece) <= chunk_size else piece
+        else:
+            current = f"{current} {piece}".strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+_Address = ipaddress.IPv4Address | ipaddress.IPv6Address
+
+
+def _is_public_address(address: _Address) -> bool:
+    if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    return not (
+        address.is_private or address.is_loopback or address.is_link_local
+        or address.is_reserved or address.is_multicast or address.is_unspecified
+    )
+
+
+async def _resolve(host: str, port: int) -> list[_Address]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [ipaddress.ip_address(sockaddr[0].split("%", 1)[0]) for *_, sockaddr in infos]
+
+
+async def _check_url(url: httpx.URL) -> _Address:
+    """Return the address to connect to for ``url``.
+
+    Raises ValueError unless ``url`` is http(s) and its host resolves only
+    to public addresses.
+    """
+    if url.scheme not in ALLOWED_SCHEMES:
+        raise ValueError(f"scheme '{url.scheme}' is not allowed")
+    if not url.host:
+        raise ValueError("URL has no host")
+    addresses = await _resolve(url.host, url.port or (443 if url.scheme == "https" else 80))
+    if not addresses:
+        raise ValueError(f"host {url.host} did not resolve")
+    for address in addresses:
+        if not _is_public_address(address):
+            raise ValueError(f"host {url.host} resolves to non-public address {address}")
+    return addresses[0]
+
+
+def _pinned_request(url: httpx.URL, address: _Address) -> tuple[httpx.URL, dict, dict]:
+    """URL, headers and extensions that connect to ``address`` while keeping the Host header and TLS SNI."""
+    extensions = {"sni_hostname": url.raw_host.decode("ascii")} if url.scheme == "https" else {}
+    return url.copy_with(host=str(address)), {"Host": url.netloc.decode("ascii")}, extensions
+
+
+async def _fetch_page(url: str, timeout: float, max_bytes: int) -> Optional[str]:
+    """Download one HTML page (None for non-HTML, blocked URLs, errors or timeouts)."""
+    client = get_http_pool().get("pages")
+
+    async def download() -> Optional[str]:
+        target = httpx.URL(url)
+        # Redirects are followed by hand so every hop goes through _check_url
+        for _ in range(MAX_REDIRECTS + 1):
+            address = await _check_url(target)
+            pinned, headers, extensions = _pinned_request(target, address)
+            async with client.stream(
+                "GET", pinned, headers=headers, extensions=extensions, follow_redirects=False, timeout=timeout
+            ) as response:
+                if response.is_redirect:
+                    target = target.join(response.headers["location"])
+                    continue
+                response.raise_for_status()
+                content_type = response.headers.get("content-type", "")
+                if "html" not in content_type:
+                    return None
+                body = bytearray()
+                async for data in response.aiter_bytes():
+                    body.extend(data)
+                    if len(body) >= max_bytes:
+                        break
+                return bytes(body[:max_bytes]).decode(response.encoding or "utf-8", errors="replace")
+        raise ValueError(f"more than {MAX_REDIRECTS} redirects")
+
+    try:
+        return await asyncio.wait_for(download(), timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.info(f"Page fetch timed out after {timeout}s: {url}")
+    except Exception as e:
+        logger.info(f"Page fetch failed for {url}: {e}")
+    return None
+
+
+async def fetch_pages(
+    urls: list[str],
+    max_concurrency: int = 4,
+    timeout: float = 3.0,
+    budget: float = 5.0,
+    max_bytes: int = 2_000_000,
+) -> dict[str, str]:
+    """Download pages concurrently.
+
+    At most ``max_concurrency`` downloads run at once, each is capped at
+    ``timeout`` seconds and ``max_bytes``; whatever has not finished when
+    ``budget`` runs out is cancelled.
+
+    Returns:
+        dict: url -> HTML for the pages that were fetched in time
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded(url: str) -> Optional[str]:
+        async with semaphore:
+            return await _fetch_page(url, timeout, max_bytes)
+
+    start = time.perf_counter()
+    tasks = {asyncio.create_task(bounded(url)): url for url in dict.fromkeys(urls)}
+    if not tasks:
+        return {}
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+        logger.info(f"Page fetch budget of {budget}s exhausted, dropped {len(pending)} pages")
+
+    pages = {tasks[task]: task.result() for task in done if task.result()}
+    logger.debug(f"Fetched {len(pages)}/{len(tasks)} pages in {time.perf_counter() - start:.2f}s")
+    return pages
@@ -1,13 +1,20 @@
 """Web Search Tool - Network search capabilities."""
 
+import asyncio
 import logging
+import time
 from typing import Any
 import httpx
 
 from advence_rag.config import get_settings
+from advence_rag.utils.http import get_http_pool
+from advence_rag.utils.latency import LatencyWindow
 
 logger = logging.getLogger(__name__)
 
+SERPER_URL = "https://google.serper.dev/search"
+GOOGLE_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+
 
 async def search_serper(query: str, num_results: int = 5) -> dict[str, Any]:
     """Execute a Serper.dev Google Search asynchronously.
@@ -31,7 +38,7 @@ async def search_serper(query: str, num_results: int = 5) -> dict[str, Any]:
         }
 
     try:
-        url = "https://google.serper.dev/search"
+        url = SERPER_URL
         headers = {
             "X-API-KEY": api_key,
             "Content-Type": "application/json"
@@ -41,20 +48,21 @@ async def search_serper(query: str, num_results: int = 5) -> dict[str, Any]:
             "num": min(num_results, 20), # Serper supports more than 10
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=payload, timeout=10.0)
+        # Pooled client: keep-alive connections are reused across searches
+        client = get_http_pool().get("serper")
+        response = await client.post(url, headers=headers, json=payload)
+        
+        # Check for Rate Limit (429) specifically
+        if response.status_code == 429:
+            return {
+                "status": "error",
+                "error": "Serper Rate Limit",
+                "code": 429,
+                "results": [],
+            }
             
-            # Check for Rate Limit (429) specifically
-            if response.status_code == 429:
-                return {
-                    "status": "error",
-                    "error": "Serper Rate Limit",
-                    "code": 429,
-                    "results": [],
-                }
-                
-            response.raise_for_status()
-            data = response.json()
+        response.raise_for_status()
+        data = response.json()
 
         # Process results
         search_results = []
@@ -91,58 +99,83 @@ async def search_serper(query: str, num_results: int = 5) -> dict[str, Any]:
         }
 
 
-async def search_web(query: str, num_results: int = 5) -> dict[str, Any]:
-    """Unified web search interface with smart fallback.
-    
-    Tries the configured primary provider first. If it fails (especially due to rate limits),
-    it automatically falls back to the other provider if configured.
+# Per-provider latency of successful calls, for hedging and the adaptive primary
+_latency: dict[str, LatencyWindow] = {}
+_counters = {"hedges": 0, "cancelled": 0, "cache_hits": 0, "cache_stale_hits": 0, "cache_misses": 0, "revalidations": 0}
+_wins: dict[str, int] = {}
+_errors: dict[str, int] = {}
+
+# The adaptive primary only switches once both providers have this many samples
+ADAPTIVE_MIN_SAMPLES = 20
+# ...and the other provider's median is at least this much faster
+ADAPTIVE_SWITCH_RATIO = 0.8
+
+
+def _window(provider: str) -> LatencyWindow:
+    if provider not in _latency:
+        _latency[provider] = LatencyWindow()
+    return _latency[provider]
+
+
+async def _timed_search(provider: str, query: str, num_results: int) -> dict[str, Any]:
+    """Call a provider and record its latency.
+
+    Only successful calls are latency samples: a fast failure (missing key,
+    429) or a hedge loser cancelled early would make a broken or slower
+    provider look fast to the adaptive primary.
     """
-    settings = get_settings()
-    primary = settings.search_provider
-    
-    # Define provider functions
-    providers = {
-        "google": search_google,
-        "serper": search_serper
-    }
-    
-    ordered_providers = []
-    if primary in providers:
-        ordered_providers.append(primary)
-        # Add the other one as fallback
-        other = "google" if primary == "serper" else "serper"
-        ordered_providers.append(other)
+    search_func = {"google": search_google, "serper": search_serper}[provider]
+    start = time.perf_counter()
+    try:
+        result = await search_func(query, num_results)
+    except asyncio.CancelledError:
+        _counters["cancelled"] += 1
+        raise
+    if result["status"] == "success":
+        _window(provider).record(time.perf_counter() - start)
+    else:
+        _errors[provider] = _errors.get(provider, 0) + 1
+    return result
+
+
+def _provider_order(primary: str, adaptive: bool) -> list[str]:
+    """Providers to try, primary first; with ``adaptive`` the faster provider leads."""
+    if primary in ("google", "serper"):
+        order = [primary, "google" if primary == "serper" else "serper"]
     else:
         # Default fallback order if primary is invalid
-        ordered_providers = ["serper", "google"]
+        order = ["serper", "google"]
+
+    if adaptive:
+        first, second = (_window(p) for p in order)
+        if len(first) >= ADAPTIVE_MIN_SAMPLES and len(second) >= ADAPTIVE_MIN_SAMPLES:
+            if second.percentile(50) < first.percentile(50) * ADAPTIVE_SWITCH_RATIO:
+                order.reverse()
+    return order
+
+
+def _log_failure(provider_name: str, result: dict[str, Any]) -> str:
+    """Log a failed provider result and return its error message."""
+    error_msg = result.get("error", "Unknown error")
+    logger.warning(f"Search provider {provider_name} failed: {error_msg}")
+    return error_msg
+
 
+async def _search_sequential(order: list[str], query: str, num_results: int) -> dict[str, Any]:
     last_error = "No providers configured"
     
-    for provider_name in ordered_providers:
-        search_func = providers[provider_name]
+    for provider_name in order:
         logger.info(f"Attempting web search with provider: {provider_name}")
         
-        result = await search_func(query, num_results)
+        result = await _timed_search(provider_name, query, num_results)
         
         if result["status"] == "success":
+            _wins[provider_name] = _wins.get(provider_name, 0) + 1
             return result
         
-        # Log error and decide whether to fallback
-        error_msg = result.get("error", "Unknown error")
-        error_code = result.get("code")
-        
-        # If it's a configuration error (key missing), we should definitely try fallback
-        # If it's a rate limit error (429), try fallback
-        logger.warning(f"Search provider {provider_name} failed: {error_msg}")
-        last_error = error_msg
-        
-        # Special case: Google search implementation above doesn't return "code" yet
-        # but check for 429 or "not configured"
-        if "not configured" in error_msg or error_code == 429 or "Rate Limit" in error_msg:
-            continue
-        
-        # For other errors, we might still want to try the fallback anyway for robustness
-        continue
+        # Configuration errors (key missing), rate limits (429) and any other
+        # error all move on to the next provider
+        last_error = _log_failure(provider_name, result)
         
     return {
         "status": "error",
@@ -151,6 +184,163 @@ async def search_web(query: str, num_results: int = 5) -> dict[str, Any]:
     }
 
 
+async def _search_hedged(order: list[str], query: str, num_results: int, delay: float) -> dict[str, Any]:
+    """Start the primary, then the secondary after ``delay`` (or as soon as the primary fails).
+
+    The first successful result wins and the other call is cancelled.
+    """
+    tasks: dict[asyncio.Task, str] = {}
+
+    def launch(provider_name: str):
+        logger.info(f"Attempting web search with provider: {provider_name}")
+        tasks[asyncio.create_task(_timed_search(provider_name, query, num_results))] = provider_name
+
+    waiting = list(order)
+    launch(waiting.pop(0))
+    last_error = "No providers configured"
+    try:
+        while tasks:
+            pending = [t for t in tasks if not t.done()]
+            timeout = delay if waiting else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # Primary is slow, not failing: hedge with the next provider
+                _counters["hedges"] += 1
+                launch(waiting.pop(0))
+                continue
+            for task in done:
+                provider_name = tasks.pop(task)
+                result = task.result()
+                if result["status"] == "success":
+                    _wins[provider_name] = _wins.get(provider_name, 0) + 1
+                    return result
+                last_error = _log_failure(provider_name, result)
+                if waiting:
+                    launch(waiting.pop(0))
+    finally:
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {
+        "status": "error",
+        "error": f"All search providers failed. Last error: {last_error}",
+        "results": [],
+    }
+
+
+_web_cache = None
+# Background refreshes of stale entries, keyed by cache key (keeps the tasks referenced)
+_revalidating: dict[str, asyncio.Task] = {}
+
+
+def _get_web_cache():
+    """Persistent web result cache (None if disabled)."""
+    global _web_cache
+    settings = get_settings()
+    if _web_cache is None and settings.web_cache_enabled:
+        from advence_rag.tools.web_cache import WebResultCache
+        _web_cache = WebResultCache(
+            settings.data_dir / "cache" / "web_results.sqlite",
+            ttl=settings.web_cache_ttl,
+            stale_ttl=settings.web_cache_stale_ttl,
+            max_entries=settings.web_cache_max_entries,
+        )
+    return _web_cache
+
+
+async def _search_and_store(cache, query: str, num_results: int) -> dict[str, Any]:
+    result = await _search_providers(query, num_results)
+    if result["status"] == "success":
+        try:
+            await asyncio.to_thread(cache.set, query, num_results, result)
+        except Exception as e:
+            logger.warning(f"Web result cache write failed: {e}")
+    return result
+
+
+def _revalidate(cache, query: str, num_results: int):
+    """Refresh a stale entry in the background (at most one refresh per key)."""
+    key = cache.key(query, num_results)
+    if key in _revalidating:
+        return
+    _counters["revalidations"] += 1
+    task = asyncio.create_task(_search_and_store(cache, query, num_results))
+    _revalidating[key] = task
+    task.add_done_callback(lambda _: _revalidating.pop(key, None))
+
+
+async def search_web(query: str, num_results: int = 5) -> dict[str, Any]:
+    """Web search with a persistent result cache in front of the providers.
+    
+    Fresh hits cost no network call or quota; stale hits (older than
+    ``web_cache_ttl`` but within ``web_cache_stale_ttl``) are served at once
+    and refreshed in the background.
+    """
+    cache = _get_web_cache()
+    if cache is None:
+        return await _search_providers(query, num_results)
+    
+    try:
+        cached = await asyncio.to_thread(cache.get, query, num_results)
+    except Exception as e:
+        logger.warning(f"Web result cache lookup failed: {e}")
+        cached = None
+    
+    if cached is not None:
+        result, fresh = cached
+        if fresh:
+            _counters["cache_hits"] += 1
+        else:
+            _counters["cache_stale_hits"] += 1
+            _revalidate(cache, query, num_results)
+        return {**result, "cached": True}
+    
+    _counters["cache_misses"] += 1
+    return await _search_and_store(cache, query, num_results)
+
+
+async def _search_providers(query: str, num_results: int = 5) -> dict[str, Any]:
+    """Unified web search interface with smart fallback.
+    
+    Modes (``search_mode``):
+        sequential: try the primary provider, fall back to the other one on failure
+        hedged: also start the other provider if the primary has not answered
+            within ``search_hedge_delay_ms``; the first good result wins
+        parallel: start both providers at once; the first good result wins
+    
+    With ``search_adaptive_primary`` the provider with the lower median
+    latency becomes the primary once both have enough samples.
+    """
+    settings = get_settings()
+    order = _provider_order(settings.search_provider, settings.search_adaptive_primary)
+    
+    if settings.search_mode == "sequential":
+        return await _search_sequential(order, query, num_results)
+    delay = 0.0 if settings.search_mode == "parallel" else settings.search_hedge_delay_ms / 1000.0
+    return await _search_hedged(order, query, num_results, delay)
+
+
+# Stats (and per-provider fields) of web_search_stats() that only go up
+WEB_SEARCH_COUNTERS = (*_counters, "successes", "wins", "errors")
+
+
+def web_search_stats() -> dict[str, Any]:
+    """Per-provider latency percentiles, wins and errors, plus hedging counters."""
+    providers = {}
+    # A provider that only ever failed has errors but no latency samples
+    for name in sorted({*_latency, *_errors}):
+        window = _window(name)
+        providers[name] = {
+            "successes": window.count,
+            "wins": _wins.get(name, 0),
+            "errors": _errors.get(name, 0),
+            **window.summary(),
+        }
+    return {"providers": providers, **_counters}
+
+
 async def search_google(query: str, num_results: int = 5) -> dict[str, Any]:
     """Execute a Google Custom Search asynchronously.
 
@@ -185,7 +375,7 @@ async def search_google(query: str, num_results: int = 5) -> dict[str, Any]:
 
     # 2. Call Google API
     try:
-        url = "https://www.googleapis.com/customsearch/v1"
+        url = GOOGLE_SEARCH_URL
         params = {
             "key": api_key,
             "cx": cse_id,
@@ -193,20 +383,20 @@ async def search_google(query: str, num_results: int = 5) -> dict[str, Any]:
             "num": min(num_results, 10),
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params, timeout=10.0)
+        client = get_http_pool().get("google")
+        response = await client.get(url, params=params)
+        
+        # Check for Rate Limit (429) specifically for fallback logic
+        if response.status_code == 429:
+            return {
+                "status": "error",
+                "error": "Google Rate Limit",
+                "code": 429,
+                "results": [],
+            }
             
-            # Check for Rate Limit (429) specifically for fallback logic
-            if response.status_code == 429:
-                return {
-                    "status": "error",
-                    "error": "Google Rate Limit",
-                    "code": 429,
-                    "results": [],
-                }
-                
-            response.raise_for_status()
-            data = response.json()
+        response.raise_for_status()
+        data = response.json()
         
         # 3. Process results
         search_results = []
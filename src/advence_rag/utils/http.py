@@ -0,0 +1,91 @@
+import asyncio
+import importlib.util
+import logging
+import weakref
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClientPool:
+    """Long-lived ``httpx.AsyncClient`` per provider.
+
+    Each provider gets its own client, so connection limits apply per
+    provider and one slow API cannot starve the others' keep-alive
+    connections. Clients are bound to the event loop they were created on
+    (the CLI runs several loops over its lifetime), so they are kept per
+    loop and closed with :meth:`aclose`.
+
+    HTTP/2 is used when requested and the ``h2`` package is installed
+    (``pip install 'advence-rag[http2]'``); otherwise connections fall back
+    to HTTP/1.1 keep-alive.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        http2: bool = True,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        if http2 and not self.http2:
+            logger.info("h2 is not installed, web clients use HTTP/1.1 keep-alive. Install with: pip install 'advence-rag[http2]'")
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get(self, provider: str) -> httpx.AsyncClient:
+        """Shared client for ``provider`` on the running event loop."""
+        clients = self._clients.setdefault(asyncio.get_running_loop(), {})
+        client = clients.get(provider)
+        if client is None or client.is_closed:
+            client = clients[provider] = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+            )
+            logger.debug(f"Opened HTTP client pool for {provider} (http2={self.http2})")
+        return client
+
+    async def aclose(self):
+        """Close the clients of the running event loop."""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+
+
+_pool: Optional[HTTPClientPool] = None
+
+
+def get_http_pool() -> HTTPClientPool:
+    """Get or create the process-wide client pool (lazy initialization)."""
+    global _pool
+
+    if _pool is None:
+        from advence_rag.config import get_settings
+
+        settings = get_settings()
+        _pool = HTTPClientPool(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+            timeout=settings.http_timeout,
+            http2=settings.http2_enabled,
+        )
+    return _pool
+
+
+async def close_http_clients():
+    """Shutdown hook: close pooled connections of the running loop."""
+    if _pool is not None:
+        await _pool.aclose()
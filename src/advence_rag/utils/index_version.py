@@ -0,0 +1,73 @@
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class IndexVersionLog:
+    """Generation counter for the knowledge base, shared by processes via SQLite.
+
+    Every write to the index (add or delete) bumps a global generation and
+    stamps the touched chunk IDs with it. Caches remember the generation
+    they were filled at and ask whether the chunks they depend on changed
+    since then, which also covers writes made by another process (e.g. the
+    ingestion scheduler).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=10.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS generation (id INTEGER PRIMARY KEY CHECK (id = 0), value INTEGER NOT NULL)")
+        self._conn.execute("INSERT OR IGNORE INTO generation (id, value) VALUES (0, 0)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS chunks (id TEXT PRIMARY KEY, generation INTEGER NOT NULL)")
+
+    def generation(self) -> int:
+        """Current index generation (0 for an index that was never written)."""
+        with self._lock:
+            return self._conn.execute("SELECT value FROM generation WHERE id = 0").fetchone()[0]
+
+    def bump(self, ids: Iterable[str]) -> int:
+        """Record a write touching ``ids`` and return the new generation."""
+        ids = [str(i) for i in ids]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("UPDATE generation SET value = value + 1 WHERE id = 0")
+                (value,) = self._conn.execute("SELECT value FROM generation WHERE id = 0").fetchone()
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO chunks (id, generation) VALUES (?, ?)", [(i, value) for i in ids]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.debug(f"Index generation {value}: {len(ids)} chunks changed")
+        return value
+
+    def changed_since(self, ids: Iterable[str], generation: int) -> bool:
+        """Whether any of ``ids`` was added, replaced or deleted after ``generation``."""
+        ids = list(dict.fromkeys(str(i) for i in ids))
+        with self._lock:
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                marks = ",".join("?" * len(chunk))
+                row = self._conn.execute(
+                    f"SELECT 1 FROM chunks WHERE id IN ({marks}) AND generation > ? LIMIT 1",
+                    (*chunk, generation),
+                ).fetchone()
+                if row is not None:
+                    return True
+        return False
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
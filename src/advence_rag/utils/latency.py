@@ -0,0 +1,37 @@
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class LatencyWindow:
+    """Rolling window of the most recent latency samples (seconds)."""
+
+    def __init__(self, size: int = 200):
+        self._samples: "deque[float]" = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.count = 0  # All samples ever recorded, not just the window
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """``q``-th percentile (0-100) of the window, None when empty."""
+        with self._lock:
+            if not self._samples:
+                return None
+            return float(np.percentile(np.fromiter(self._samples, dtype=np.float64), q))
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """p50/p95/p99 in milliseconds."""
+        result: Dict[str, Optional[float]] = {}
+        for q in (50, 95, 99):
+            value = self.percentile(q)
+            result[f"p{q}_ms"] = round(value * 1000, 2) if value is not None else None
+        return result
@@ -5,6 +5,8 @@ import sys
 from typing import Literal
 from pythonjsonlogger import jsonlogger
 
+from advence_rag.utils.tracing import TraceContextFilter
+
 def setup_logging(
     level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO",
 ) -> logging.Logger:
@@ -31,6 +33,8 @@ def setup_logging(
         )
         
         handler.setFormatter(formatter)
+        # Fills the trace_id/span_id fields of the format from the current request trace
+        handler.addFilter(TraceContextFilter())
         logger.addHandler(handler)
 
     # Silence noisy libraries
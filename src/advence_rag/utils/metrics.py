@@ -0,0 +1,226 @@
+"""Metrics - 行程內的 Prometheus 指標（counter / histogram）與文字格式輸出。
+
+Request paths only touch pre-registered metrics (a bisect and a locked
+increment per observation). Existing ``stats()`` counters are not copied on
+every request: sources register their ``stats`` callable once and are read
+when ``/metrics`` is scraped. Numeric entries become gauges named
+``advence_rag_<source>_<key>``, or counters named ``..._total`` for the
+keys the source declares as monotonic (so ``rate()`` handles restarts); a
+nested dict of dicts (e.g. per provider) becomes one labeled series per
+entry.
+"""
+
+import bisect
+import logging
+import math
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "advence_rag"
+
+# Seconds; covers cached lookups (ms) up to multi-agent chats (tens of seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        label_str = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        return f"{name}{{{label_str}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(f"{name}_total", documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: Any):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    def count(self, **labels: Any) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+        samples: List[Sample] = []
+        for key, counts, total in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """Holds the metrics and the ``stats()`` sources of one process."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._sources: Dict[str, Tuple[Callable[[], Dict[str, Any]], Union[bool, frozenset]]] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, **kwargs) -> Any:
+        full_name = f"{PREFIX}_{name}"
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = cls(full_name, documentation, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {full_name} is already registered as a {metric.type}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames=labelnames)
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames=labelnames, buckets=buckets)
+
+    def register_stats(
+        self, source: str, stats: Callable[[], Dict[str, Any]], counters: Union[bool, Iterable[str]] = ()
+    ):
+        """Expose a ``stats()`` callable (the latest registration of a source wins).
+
+        ``counters`` names the keys (or nested fields) that only go up and are
+        exported as counters; ``True`` makes every stat a counter. The rest
+        (sizes, ratios, percentiles) are gauges.
+        """
+        with self._lock:
+            self._sources[source] = (stats, counters if isinstance(counters, bool) else frozenset(counters))
+
+    def _stats_samples(self) -> Iterable[Tuple[str, str, str, List[Sample]]]:
+        """(name, documentation, type, samples) per exported stat."""
+        with self._lock:
+            sources = list(self._sources.items())
+        for source, (stats, counters) in sources:
+            try:
+                values = stats()
+            except Exception as e:
+                logger.warning(f"Metrics source '{source}' failed: {e}")
+                continue
+
+            def typed(name: str, key: str) -> Tuple[str, str]:
+                if counters is True or (counters is not False and key in counters):
+                    return f"{name}_total", "counter"
+                return name, "gauge"
+
+            for key, value in values.items():
+                name = f"{PREFIX}_{source}_{_NAME_RE.sub('_', key)}"
+                if isinstance(value, bool) or value is None:
+                    continue
+                if isinstance(value, (int, float)):
+                    name, metric_type = typed(name, key)
+                    yield name, f"{source} stats: {key}", metric_type, [(name, {}, value)]
+                elif isinstance(value, dict):
+                    # {"serper": {"wins": 3, ...}} -> <name>_wins_total{provider="serper"} 3
+                    label = key[:-1] if key.endswith("s") else key
+                    series: Dict[str, Tuple[str, List[Sample]]] = {}
+                    for entry, fields in value.items():
+                        if not isinstance(fields, dict):
+                            continue
+                        for field, field_value in fields.items():
+                            if isinstance(field_value, (int, float)) and not isinstance(field_value, bool):
+                                metric, metric_type = typed(f"{name}_{_NAME_RE.sub('_', field)}", field)
+                                series.setdefault(metric, (metric_type, []))[1].append(
+                                    (metric, {label: str(entry)}, field_value)
+                                )
+                    for metric, (metric_type, samples) in series.items():
+                        yield metric, f"{source} stats: {key}", metric_type, samples
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(_format_sample(*sample) for sample in metric.samples())
+        for name, documentation, metric_type, samples in self._stats_samples():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(_format_sample(*sample) for sample in samples)
+        return "\n".join(lines) + "\n"
+
+
+_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Process-wide metrics registry."""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
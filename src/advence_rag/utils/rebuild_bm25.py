@@ -29,14 +29,14 @@ def rebuild():
     # 2. Re-initialize BM25 Index
     index = _get_bm25_index()
     # Clear existing
-    index.corpus = []
-    index.doc_ids = []
+    index.clear()
     
     # 3. Add all documents
     print("🔧 Tokenizing and indexing...")
     index.add(documents, ids)
+    index.compact()
     
-    print(f"✅ Successfully rebuilt BM25 index at: {index.persist_path}")
+    print(f"✅ Successfully rebuilt BM25 index at: {index.persist_dir}")
 
 if __name__ == "__main__":
     rebuild()
@@ -0,0 +1,203 @@
+"""Request tracing - 以 contextvars 記錄每個請求各階段的耗時（span tree）。
+
+A ``Trace`` is started per chat request; code anywhere below it opens
+child spans with ``span("retrieval.vector")`` and records instants such as
+the first token with ``mark("first_token")``. Without an active trace both
+are no-ops, so library code can be instrumented unconditionally.
+
+Finished traces are logged as one structured record (TTFT, total and
+per-stage milliseconds) and, when enabled, replayed into OpenTelemetry
+(``pip install 'advence-rag[otel]'``) with their original timestamps.
+The log formatter's ``trace_id``/``span_id`` fields come from
+``TraceContextFilter``.
+"""
+
+import contextlib
+import logging
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+@dataclass
+class Span:
+    """One timed stage (``perf_counter`` seconds)."""
+    name: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    end: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end is None else (self.end - self.start) * 1000
+
+
+class Trace:
+    """Spans and marks of one request; ids follow the W3C/OpenTelemetry sizes."""
+
+    def __init__(self, name: str, **attributes: Any):
+        self.trace_id = _new_id(16)
+        # Converts perf_counter readings to wall-clock time for exporters
+        self._epoch = time.time() - time.perf_counter()
+        self.root = Span(name, _new_id(8), None, time.perf_counter(), attributes=dict(attributes))
+        self.spans: List[Span] = [self.root]
+        self.marks: Dict[str, float] = {}
+
+    def start_span(self, name: str, parent_id: Optional[str] = None, start: Optional[float] = None, **attributes: Any) -> Span:
+        span = Span(
+            name,
+            _new_id(8),
+            parent_id or self.root.span_id,
+            time.perf_counter() if start is None else start,
+            attributes=dict(attributes),
+        )
+        self.spans.append(span)
+        return span
+
+    def end_span(self, span: Span, end: Optional[float] = None):
+        if span.end is None:
+            span.end = time.perf_counter() if end is None else end
+
+    def mark(self, name: str, first: bool = False):
+        """Record an instant; with ``first`` only the earliest one is kept."""
+        if first and name in self.marks:
+            return
+        self.marks[name] = time.perf_counter()
+
+    def finish(self):
+        for span in self.spans:
+            self.end_span(span)
+
+    def unix_ns(self, perf: float) -> int:
+        return int((self._epoch + perf) * 1e9)
+
+    def summary(self) -> Dict[str, Any]:
+        """Flat view for logs: total, marks and summed stage durations in ms."""
+        stages: Dict[str, float] = {}
+        for span in self.spans[1:]:
+            if span.duration_ms is not None:
+                stages[span.name] = round(stages.get(span.name, 0.0) + span.duration_ms, 2)
+        marks = {name: round((t - self.root.start) * 1000, 2) for name, t in self.marks.items()}
+        return {
+            "trace_id": self.trace_id,
+            "total_ms": self.root.duration_ms and round(self.root.duration_ms, 2),
+            "ttft_ms": marks.get("first_token"),
+            "marks_ms": marks,
+            "stages_ms": stages,
+        }
+
+    def as_otel(self) -> List[Dict[str, Any]]:
+        """Span tree in the OTLP/JSON span layout."""
+        return [
+            {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent_id or "",
+                "name": span.name,
+                "startTimeUnixNano": self.unix_ns(span.start),
+                "endTimeUnixNano": self.unix_ns(span.end if span.end is not None else span.start),
+                "attributes": dict(span.attributes),
+            }
+            for span in self.spans
+        ]
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("advence_rag_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("advence_rag_span", default=None)
+
+
+def start_trace(name: str, **attributes: Any) -> Trace:
+    """Start a trace for the current request (tasks started afterwards inherit it)."""
+    trace = Trace(name, **attributes)
+    _current_trace.set(trace)
+    _current_span.set(trace.root)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Time the enclosed block as a child of the current span (no-op without a trace)."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _current_span.get()
+    current = trace.start_span(name, parent.span_id if parent else None, **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attributes["error"] = repr(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        trace.end_span(current)
+
+
+def mark(name: str, first: bool = False):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.mark(name, first=first)
+
+
+def finish_trace(trace: Trace, otel: bool = False):
+    """End all open spans, log the summary and optionally export to OpenTelemetry."""
+    trace.finish()
+    logger.info("Request trace", extra={"span_id": trace.root.span_id, **trace.summary()})
+    if otel:
+        export_otel(trace)
+
+
+_otel_missing_logged = False
+
+
+def export_otel(trace: Trace):
+    """Replay the trace into the globally configured OpenTelemetry tracer provider."""
+    global _otel_missing_logged
+    try:
+        from opentelemetry import trace as otel_trace
+    except ImportError:
+        if not _otel_missing_logged:
+            _otel_missing_logged = True
+            logger.warning("opentelemetry-api is not installed, traces are only logged. Install with: pip install 'advence-rag[otel]'")
+        return
+
+    tracer = otel_trace.get_tracer("advence_rag")
+    exported = {}
+    for span in sorted(trace.spans, key=lambda s: s.start):
+        parent = exported.get(span.parent_id)
+        exported[span.span_id] = tracer.start_span(
+            span.name,
+            context=otel_trace.set_span_in_context(parent) if parent is not None else None,
+            start_time=trace.unix_ns(span.start),
+            attributes={k: v for k, v in span.attributes.items() if isinstance(v, (str, bool, int, float))},
+        )
+    for span in trace.spans:
+        exported[span.span_id].end(end_time=trace.unix_ns(span.end if span.end is not None else span.start))
+
+
+class TraceContextFilter(logging.Filter):
+    """Adds the current ``trace_id``/``span_id`` to log records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace = _current_trace.get()
+        if not hasattr(record, "trace_id"):
+            record.trace_id = trace.trace_id if trace is not None else None
+        if not hasattr(record, "span_id"):
+            current = _current_span.get()
+            record.span_id = current.span_id if trace is not None and current is not None else None
+        return True
@@ -1,15 +1,28 @@
 """RAG Pipeline - 檢索→審核→回答 流程。
 
-提供兩種模式：
+提供三種模式：
 1. simple: Search → Review → Write（快速）
 2. full: Planner → Search → LoopAgent(Review) → Write（完整）
+3. direct: 以 Python 直接檢索，只呼叫一次 Writer（低延遲）
 
 透過 settings.rag_pipeline_mode 設定切換。
 """
 
-from google.adk.agents import Agent, LoopAgent, SequentialAgent
+import logging
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import Agent, BaseAgent, LoopAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
 from advence_rag.config import get_settings
 
+logger = logging.getLogger(__name__)
+
+# agent_service wraps multi-turn chats as "[Conversation History]...[Current Message]\n<question>"
+_CURRENT_MESSAGE_MARKER = "[Current Message]\n"
+
 def _recreate_agent(agent: Agent) -> Agent:
     """重建 agent 以避免 parent ownership 問題。"""
     return Agent(
@@ -21,9 +34,69 @@ def _recreate_agent(agent: Agent) -> Agent:
         output_key=getattr(agent, "output_key", None),
     )
 
-def get_rag_pipeline() -> SequentialAgent:
+def _current_message(content: Optional[types.Content]) -> str:
+    """The latest user question (without the conversation history prefix)."""
+    if content is None or not content.parts:
+        return ""
+    text = "".join(part.text or "" for part in content.parts)
+    return text.rsplit(_CURRENT_MESSAGE_MARKER, 1)[-1].strip()
+
+
+class DirectRagPipeline(BaseAgent):
+    """Direct RAG: 檢索在 Python 中執行，結果寫入 state 後交由 Writer 一次生成回答。
+
+    Skips the search and reviewer LLM turns, so the first token comes after
+    one model call. The writer reads the results from ``{search_results}``.
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        from advence_rag.agents.search import search_knowledge_base
+
+        # Lets the stream show the retrieval status before the writer starts
+        yield Event(invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch)
+
+        query = _current_message(ctx.user_content)
+        try:
+            search_results = await search_knowledge_base(query) if query else "（沒有可檢索的問題）"
+        except Exception as e:
+            logger.warning(f"Direct pipeline retrieval failed: {e}")
+            search_results = f"（知識庫檢索失敗：{e}）"
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={"search_results": search_results}),
+        )
+        for sub_agent in self.sub_agents:
+            async for event in sub_agent.run_async(ctx):
+                yield event
+
+
+def build_direct_pipeline() -> DirectRagPipeline:
+    """建立 direct 模式的 pipeline（每次呼叫回傳新實例，可作為 Runner 的 root agent）。"""
+    from advence_rag.agents.writer import writer_agent
+
+    writer = Agent(
+        name=writer_agent.name,
+        model=writer_agent.model,
+        description=writer_agent.description,
+        instruction=writer_agent.instruction + "\n\n以下是知識庫檢索結果（search_results）：\n{search_results}",
+        tools=[],
+        output_key=writer_agent.output_key,
+    )
+    return DirectRagPipeline(
+        name="rag_pipeline_direct",
+        description="低延遲 RAG 管線：直接檢索 → 回答（單次 LLM 呼叫）",
+        sub_agents=[writer],
+    )
+
+
+def get_rag_pipeline() -> BaseAgent:
     """獲取配置好的 RAG Pipeline 實例（延遲載入以避免循環導入）。"""
     settings = get_settings()
+    if settings.rag_pipeline_mode == "direct":
+        return build_direct_pipeline()
     
     # 延遲導入 agents 以打破循環依賴
     # rag_pipeline -> agents -> orchestrator -> rag_pipeline
@@ -0,0 +1,43 @@
+import asyncio
+
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+
+from advence_rag.infrastructure.ai.agent_service import OrchestratorAgentService
+
+
+async def test_runner_is_shared_until_closed():
+    """Test that requests reuse one runner and shutdown releases it."""
+    service = OrchestratorAgentService(session_service=InMemorySessionService())
+    runner = service._get_runner()
+    assert service._get_runner() is runner
+
+    await service.aclose()
+    assert service._get_runner() is not runner
+    await service.aclose()
+
+
+async def test_session_setup_is_idempotent():
+    """Test that retries and follow-up turns reuse the existing session."""
+    sessions = InMemorySessionService()
+    service = OrchestratorAgentService(session_service=sessions)
+
+    await service._ensure_session("user", "s1")
+    await service._ensure_session("user", "s1")
+    listed = await sessions.list_sessions(app_name=service.app_name, user_id="user")
+    assert [s.id for s in listed.sessions] == ["s1"]
+
+
+async def test_runs_of_one_session_are_serialized():
+    """Test that the same session runs one at a time while other sessions proceed."""
+    service = OrchestratorAgentService(session_service=InMemorySessionService())
+    events = []
+
+    async def run(session_id: str, name: str):
+        async with service._session_lock(session_id):
+            events.append(f"{name} start")
+            await asyncio.sleep(0.05)
+            events.append(f"{name} end")
+
+    await asyncio.gather(run("s1", "a"), run("s1", "b"), run("s2", "c"))
+    assert events.index("a end") < events.index("b start")
+    assert events.index("c start") < events.index("a end")
@@ -0,0 +1,41 @@
+from advence_rag.tools.analyzer import Analyzer
+
+
+def test_cjk_runs_become_bigrams():
+    """Test that CJK text is split into overlapping bigrams and mixed with words."""
+    analyzer = Analyzer()
+    assert analyzer.analyze("知識庫檢索") == ["知識", "識庫", "庫檢", "檢索"]
+    assert analyzer.analyze("使用ADK的RAG系統") == ["使用", "adk", "的", "rag", "系統"]
+    assert analyzer.analyze("字") == ["字"]
+
+
+def test_english_normalization_stopwords_and_stemming():
+    """Test full-width folding, stop-word removal and light stemming."""
+    analyzer = Analyzer()
+    assert analyzer.analyze("The Ｑｄｒａｎｔ indexes are ranked") == ["qdrant", "index", "rank"]
+    assert analyzer.analyze("queries, queried, query") == ["query", "query", "query"]
+    assert analyzer.analyze("indexing indexed analysis") == ["index", "index", "analysis"]
+
+    plain = Analyzer(stemming=False, stopwords=False)
+    assert plain.analyze("The indexes") == ["the", "indexes"]
+
+
+def test_whitespace_analyzer_matches_legacy_tokenizer():
+    """Test that the legacy analyzer keeps lower().split() behaviour."""
+    text = "Hello, 世界 BM25!"
+    assert Analyzer("whitespace").analyze(text) == text.lower().split()
+
+
+def test_query_analysis_is_cached():
+    """Test that repeated queries hit the memoized fast path."""
+    analyzer = Analyzer()
+    first = analyzer.analyze_query("混合搜尋 rankings")
+    assert analyzer.analyze_query("混合搜尋 rankings") is first
+    assert first == ("混合", "合搜", "搜尋", "rank")
+
+
+def test_config_round_trip():
+    """Test that an analyzer can be rebuilt from its stored configuration."""
+    analyzer = Analyzer(cjk="bigram", stemming=False)
+    assert Analyzer.from_config(analyzer.config) == analyzer
+    assert Analyzer.from_config({"name": "whitespace"}) != analyzer
@@ -0,0 +1,185 @@
+import asyncio
+import time
+from typing import Dict, List
+
+from advence_rag.domain.interfaces import EmbeddingService
+from advence_rag.infrastructure.ai.answer_cache import SemanticAnswerCache, collect_citations, record_citations
+from advence_rag.utils.index_version import IndexVersionLog
+
+
+class TableEmbeddingService(EmbeddingService):
+    """Embeds known questions to fixed vectors (paraphrases share a direction)."""
+
+    def __init__(self, table: Dict[str, List[float]]):
+        self.table = table
+        self.calls = 0
+
+    async def embed_text(self, text: str) -> List[float]:
+        self.calls += 1
+        return self.table[text]
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return [await self.embed_text(t) for t in texts]
+
+
+QUESTIONS = {
+    "How do I switch to Qdrant?": [1.0, 0.0, 0.0],
+    "How can I switch to Qdrant?": [0.99, 0.05, 0.0],
+    "What is BM25?": [0.0, 1.0, 0.0],
+    "What does the guard agent do?": [0.0, 0.0, 1.0],
+}
+
+
+async def test_paraphrase_hits_and_unrelated_question_misses():
+    """Test that near-duplicate questions share an answer while others miss."""
+    cache = SemanticAnswerCache(TableEmbeddingService(QUESTIONS), threshold=0.95)
+    await cache.store("How do I switch to Qdrant?", "Set VECTOR_DB_TYPE=qdrant.", ["c1"])
+
+    hit = await cache.lookup("How can I switch to Qdrant?")
+    assert hit is not None and hit.answer == "Set VECTOR_DB_TYPE=qdrant."
+    assert hit.citations == ["c1"] and hit.similarity > 0.95
+
+    assert await cache.lookup("What is BM25?") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+async def test_entry_invalidated_when_cited_chunk_changes(tmp_path):
+    """Test that replacing or deleting a cited chunk drops the cached answer."""
+    versions = IndexVersionLog(tmp_path / "versions.sqlite")
+    versions.bump(["c1", "c2"])
+    cache = SemanticAnswerCache(TableEmbeddingService(QUESTIONS), versions=versions)
+
+    generation = await cache.index_generation()
+    await cache.store("How do I switch to Qdrant?", "answer", ["c1"], generation=generation)
+    versions.bump(["c2"])  # Unrelated chunk
+    assert await cache.lookup("How do I switch to Qdrant?") is not None
+
+    versions.bump(["c1"])
+    assert await cache.lookup("How do I switch to Qdrant?") is None
+    assert cache.stats()["invalidated"] == 1 and len(cache) == 0
+
+
+async def test_uncited_entry_invalidated_by_any_index_write(tmp_path):
+    """Test that an answer citing nothing is dropped once the index changes."""
+    versions = IndexVersionLog(tmp_path / "versions.sqlite")
+    cache = SemanticAnswerCache(TableEmbeddingService(QUESTIONS), versions=versions)
+
+    await cache.store("What is BM25?", "Not in the knowledge base.", [], generation=await cache.index_generation())
+    assert await cache.lookup("What is BM25?") is not None
+
+    versions.bump(["new-chunk"])
+    assert await cache.lookup("What is BM25?") is None
+    assert cache.stats()["invalidated"] == 1
+
+
+async def test_least_recently_used_answer_is_evicted():
+    """Test LRU eviction once the index is full."""
+    cache = SemanticAnswerCache(TableEmbeddingService(QUESTIONS), max_entries=2)
+    await cache.store("How do I switch to Qdrant?", "qdrant")
+    await cache.store("What is BM25?", "bm25")
+    assert await cache.lookup("How do I switch to Qdrant?") is not None
+
+    await cache.store("What does the guard agent do?", "guard")
+    assert len(cache) == 2
+    assert await cache.lookup("What is BM25?") is None
+    assert (await cache.lookup("What does the guard agent do?")).answer == "guard"
+
+
+class SlowTableEmbeddingService(TableEmbeddingService):
+    async def embed_text(self, text: str) -> List[float]:
+        await asyncio.sleep(0.05)
+        return await super().embed_text(text)
+
+
+class SlowVersions:
+    """Version log whose staleness check takes a while (nothing ever changes)."""
+
+    def generation(self) -> int:
+        return 0
+
+    def changed_since(self, ids, generation) -> bool:
+        time.sleep(0.1)
+        return False
+
+
+async def test_lookup_survives_concurrent_clear_and_store():
+    """Test that entries removed or replaced while a lookup awaits are treated as a miss."""
+    cache = SemanticAnswerCache(SlowTableEmbeddingService(QUESTIONS), max_entries=1)
+    await cache.store("How do I switch to Qdrant?", "answer", ["c1"])
+    lookup = asyncio.create_task(cache.lookup("How can I switch to Qdrant?"))
+    await asyncio.sleep(0.01)
+    cache.clear()
+    assert await lookup is None
+
+    cache = SemanticAnswerCache(TableEmbeddingService(QUESTIONS), versions=SlowVersions(), max_entries=1)
+    await cache.store("How do I switch to Qdrant?", "qdrant answer", ["c1"])
+    lookup = asyncio.create_task(cache.lookup("How can I switch to Qdrant?"))
+    await asyncio.sleep(0.02)
+    await cache.store("What is BM25?", "bm25 answer", ["c2"])  # Evicts and reuses the row
+    assert await lookup is None
+    hit = await cache.lookup("What is BM25?")
+    assert hit is not None and hit.answer == "bm25 answer" and hit.hits == 1
+
+
+async def test_citations_recorded_from_spawned_tasks():
+    """Test that tool calls running in child tasks report into the collecting context."""
+    async def tool(ids):
+        record_citations(ids)
+
+    cited = collect_citations()
+    await asyncio.gather(tool(["a", "b"]), tool(["c"]))
+    assert cited == {"a", "b", "c"}
+
+
+async def test_chat_serves_cached_answer_for_single_turn_questions():
+    """Test that the chat service answers (and streams) hits without running the agents."""
+    from advence_rag.infrastructure.ai.agent_service import OrchestratorAgentService
+
+    cache = SemanticAnswerCache(TableEmbeddingService(QUESTIONS))
+    await cache.store("How do I switch to Qdrant?", "Set VECTOR_DB_TYPE=qdrant.", ["c1"])
+    service = OrchestratorAgentService(answer_cache=cache)
+
+    result = await service.chat([{"role": "user", "content": "How can I switch to Qdrant?"}])
+    assert result["answer"] == "Set VECTOR_DB_TYPE=qdrant." and result["cached"] is True
+
+    stream = await service.chat([{"role": "user", "content": "How can I switch to Qdrant?"}], stream=True)
+    assert [chunk async for chunk in stream] == ["Set VECTOR_DB_TYPE=qdrant."]
+
+    follow_up = [
+        {"role": "user", "content": "What is BM25?"},
+        {"role": "assistant", "content": "A ranking function."},
+        {"role": "user", "content": "How can I switch to Qdrant?"},
+    ]
+    assert service._cacheable_question(follow_up) is None
+
+
+async def test_chat_caches_only_cited_writer_answers(monkeypatch):
+    """Test that writer answers grounded in retrieved chunks are cached and uncited ones are not."""
+    from google.adk.sessions.in_memory_session_service import InMemorySessionService
+
+    from advence_rag.infrastructure.ai.agent_service import OrchestratorAgentService
+    from advence_rag.infrastructure.ai.intent_router import IntentRouter
+    from tests.utils.fakes import FakeLlm
+
+    retrieved = {"What is BM25?": ["c1"], "What does the guard agent do?": []}
+
+    async def search_knowledge_base(query: str, top_k=None, collection_name=None) -> str:
+        record_citations(retrieved[query])
+        return f"### Search found {len(retrieved[query])} documents"
+
+    monkeypatch.setattr("advence_rag.agents.search.search_knowledge_base", search_knowledge_base)
+    cache = SemanticAnswerCache(TableEmbeddingService(QUESTIONS))
+    service = OrchestratorAgentService(
+        session_service=InMemorySessionService(), intent_router=IntentRouter(), answer_cache=cache
+    )
+    service._get_direct_runner().agent.sub_agents[0].model = FakeLlm(reply="A ranking function [1]", requests=[])
+
+    result = await service.chat([{"role": "user", "content": "What is BM25?"}])
+    assert result["answer"] == "A ranking function [1]"
+    stream = await service.chat([{"role": "user", "content": "What does the guard agent do?"}], stream=True)
+    assert "A ranking function [1]" in "".join([chunk async for chunk in stream])
+    await service.aclose()
+
+    assert len(cache) == 1
+    hit = await cache.lookup("What is BM25?")
+    assert hit.answer == "A ranking function [1]" and hit.citations == ["c1"]
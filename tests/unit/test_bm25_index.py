@@ -0,0 +1,167 @@
+import json
+import logging
+import pickle
+import sys
+
+from advence_rag.tools.analyzer import Analyzer
+from advence_rag.tools.bm25 import BM25Index
+
+
+def _build(tmp_path, sample_docs, sample_ids):
+    index = BM25Index(tmp_path / "bm25_index")
+    index.add(sample_docs, sample_ids)
+    return index
+
+
+def test_add_and_search(tmp_path, sample_docs, sample_ids):
+    """Test that keyword search finds documents added incrementally."""
+    index = _build(tmp_path, sample_docs, sample_ids)
+    index.add(["Qdrant is another vector store."], ["extra"])
+
+    results = index.search("adk", top_k=3)
+    assert results[0]["id"] == "test_id_1"
+
+    results = index.search("vector", top_k=3)
+    assert {r["id"] for r in results} == {"test_id_2", "extra"}
+
+
+def test_delete_tombstones_and_compacts(tmp_path, sample_docs, sample_ids):
+    """Test that deleted documents disappear from results and are compacted away."""
+    index = _build(tmp_path, sample_docs, sample_ids)
+
+    index.delete(["test_id_1"])
+    assert "test_id_1" not in index.doc_ids
+    assert all(r["id"] != "test_id_1" for r in index.search("adk coordination"))
+
+    # 1 of 4 documents deleted exceeds the compaction ratio
+    assert index.tombstone_count == 0
+    assert len(index) == 3
+
+
+def test_readd_replaces_previous_version(tmp_path, sample_docs, sample_ids):
+    """Test that adding an existing ID replaces the old content."""
+    index = _build(tmp_path, sample_docs, sample_ids)
+    index.add(["Completely different text."], ["test_id_1"])
+
+    assert index.search("adk") == []
+    assert index.search("different")[0]["id"] == "test_id_1"
+    assert len(index) == 4
+
+
+def test_journal_replay_after_restart(tmp_path, sample_docs, sample_ids):
+    """Test that writes survive a reload through snapshot + journal."""
+    index = _build(tmp_path, sample_docs, sample_ids)
+    index.delete(["test_id_3"])
+    index.add(["Late addition about ADK."], ["late"])
+
+    reloaded = BM25Index(tmp_path / "bm25_index")
+    assert sorted(reloaded.doc_ids) == sorted(index.doc_ids)
+    assert [r["id"] for r in reloaded.search("adk")] == [r["id"] for r in index.search("adk")]
+
+
+def test_legacy_pickle_is_migrated(tmp_path, sample_docs, sample_ids):
+    """Test that a corpus-only pickle from older versions is still readable."""
+    path = tmp_path / "bm25_index.pkl"
+    with open(path, "wb") as f:
+        pickle.dump({"corpus": sample_docs, "doc_ids": sample_ids}, f)
+
+    index = BM25Index(tmp_path / "bm25_index", legacy_path=path)
+    assert len(index) == 4
+    assert not path.exists()
+    assert index.search("bm25")[0]["id"] == "test_id_3"
+
+
+def test_pruned_scoring_matches_exhaustive(tmp_path):
+    """Test that MaxScore pruning returns the same top-k as scoring every posting."""
+    import random
+    from collections import Counter
+
+    rng = random.Random(7)
+    vocab = [f"w{i}" for i in range(60)]
+    # Zipf-like skew so that some terms are common and others rare
+    weights = [1.0 / (i + 1) for i in range(len(vocab))]
+    docs = [" ".join(rng.choices(vocab, weights, k=rng.randint(5, 40))) for _ in range(400)]
+    index = BM25Index(tmp_path / "bm25_index")
+    index.add(docs[:300], [f"d{i}" for i in range(300)])
+    index.compact()  # Score across a mapped segment and an in-memory delta
+    index.add(docs[300:], [f"d{i}" for i in range(300, len(docs))])
+
+    for query in ["w0 w37", "w1 w2 w55", "w59", "w3 w3 w10 w40"]:
+        exhaustive = index._score(Counter(index.analyzer.analyze_query(query)), top_k=len(docs))
+        pruned = index.search(query, top_k=5)
+        assert [r["id"] for r in pruned] == [f"d{doc}" for doc, _ in exhaustive[:5]]
+
+
+def test_segment_and_delta_are_shared_across_instances(tmp_path, sample_docs, sample_ids):
+    """Test that a second process-like reader sees segment, journal and merges of a writer."""
+    writer = _build(tmp_path, sample_docs, sample_ids)
+    writer.compact()
+    reader = BM25Index(tmp_path / "bm25_index")
+    assert reader.search("chroma")[0]["id"] == "test_id_2"
+
+    # Journal tail written after the reader opened the segment
+    writer.add(["Chroma and Qdrant both store vectors."], ["late"])
+    assert {r["id"] for r in reader.search("chroma")} == {"test_id_2", "late"}
+
+    # A merge swaps CURRENT; the reader reopens the new segment
+    writer.delete(["test_id_2"])
+    assert [r["id"] for r in reader.search("chroma")] == ["late"]
+    assert len(reader) == 4
+
+
+def test_cjk_documents_are_searchable(tmp_path):
+    """Test that Chinese sentences are segmented instead of indexed as one token."""
+    index = BM25Index(tmp_path / "bm25_index")
+    index.add(
+        ["知識庫檢索使用混合搜尋與重排序。", "Indexing documents with embeddings."],
+        ["zh", "en"],
+    )
+
+    assert index.search("知識庫")[0]["id"] == "zh"
+    assert index.search("混合搜尋")[0]["id"] == "zh"
+    assert index.search("indexed document")[0]["id"] == "en"
+
+
+def test_analyzer_is_persisted_and_not_rerun(tmp_path, monkeypatch, sample_docs, sample_ids):
+    """Test that segments record their analyzer and journal replay reuses stored term counts."""
+    whitespace = Analyzer("whitespace")
+    writer = BM25Index(tmp_path / "bm25_index", analyzer=whitespace)
+    writer.add(sample_docs, sample_ids)
+    writer.compact()
+    writer.add(["Late addition about ADK agents"], ["late"])
+
+    segment = (tmp_path / "bm25_index" / "CURRENT").read_text()
+    meta = json.loads((tmp_path / "bm25_index" / segment / "meta.json").read_text())
+    assert meta["analyzer"] == {"name": "whitespace"}
+
+    def fail(self, text):
+        raise AssertionError("documents must not be re-analyzed")
+
+    monkeypatch.setattr(Analyzer, "analyze", fail)
+    # A differently configured reader keeps the analyzer the index was built with
+    reader = BM25Index(tmp_path / "bm25_index", analyzer=Analyzer())
+    assert reader.analyzer == whitespace
+    assert len(reader) == 5
+
+    monkeypatch.undo()
+    assert {r["id"] for r in reader.search("adk")} == {"test_id_1", "late"}
+    reader.clear()
+    assert reader.analyzer == Analyzer()
+
+
+def test_jieba_index_without_jieba_is_reported(tmp_path, monkeypatch, caplog, sample_docs, sample_ids):
+    """Test that opening a jieba-built index where jieba cannot be imported logs an error."""
+    writer = BM25Index(tmp_path / "bm25_index")
+    writer.add(sample_docs, sample_ids)
+    writer.compact()
+    segment = (tmp_path / "bm25_index" / "CURRENT").read_text()
+    meta_path = tmp_path / "bm25_index" / segment / "meta.json"
+    meta = json.loads(meta_path.read_text())
+    meta["analyzer"] = {**meta["analyzer"], "cjk": "jieba"}
+    meta_path.write_text(json.dumps(meta))
+
+    monkeypatch.setitem(sys.modules, "jieba", None)  # import jieba raises ImportError
+    with caplog.at_level(logging.WARNING):
+        reader = BM25Index(tmp_path / "bm25_index")
+    assert reader.analyzer.cjk == "bigram"
+    assert any(r.levelno == logging.ERROR and "jieba" in r.getMessage() for r in caplog.records)
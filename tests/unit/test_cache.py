@@ -0,0 +1,38 @@
+import time
+
+from advence_rag.utils.cache import SQLiteCache, TTLCache
+
+
+def test_ttl_cache_lru_and_expiry():
+    """Test LRU eviction, expiry and hit/miss counters of the in-process cache."""
+    cache = TTLCache(max_entries=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" becomes most recently used
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_sqlite_cache_persists_and_evicts(tmp_path, monkeypatch):
+    """Test that the SQLite tier survives reopening and honours TTL and size bounds."""
+    path = tmp_path / "cache.sqlite"
+    cache = SQLiteCache(path, max_entries=3, ttl=60)
+    cache.set_many({"a": b"1", "b": b"2"})
+    cache.set("short", b"x", ttl=-1)  # Already expired
+    cache.close()
+
+    cache = SQLiteCache(path, max_entries=3, ttl=60)
+    assert cache.get_many(["a", "b", "short", "missing"]) == {"a": b"1", "b": b"2"}
+    assert cache.get("short") is None
+    assert (cache.hits, cache.misses) == (2, 3)
+
+    monkeypatch.setattr(SQLiteCache, "EVICT_EVERY", 1)
+    for key in "cdef":
+        cache.set(key, key.encode())
+    assert len(cache) == 3
+    assert cache.get("f") == b"f"
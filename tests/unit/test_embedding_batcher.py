@@ -0,0 +1,72 @@
+import asyncio
+
+import numpy as np
+
+from advence_rag.infrastructure.ai.embedding_service import EmbeddingMicroBatcher, LocalEmbeddingService
+
+
+async def test_concurrent_calls_are_coalesced():
+    """Test that concurrent requests share batches and each gets its own vector."""
+    batches = []
+
+    async def embed_batch(texts):
+        batches.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    batcher = EmbeddingMicroBatcher(embed_batch, max_batch_size=8, max_wait_ms=20)
+    texts = ["x" * i for i in range(1, 21)]
+    vectors = await asyncio.gather(*(batcher.submit(t) for t in texts))
+
+    assert vectors == [[float(i)] for i in range(1, 21)]
+    assert [len(b) for b in batches] == [8, 8, 4]
+    assert (batcher.requests, batcher.batches) == (20, 3)
+
+
+async def test_batch_failure_reaches_every_caller():
+    """Test that an embedding error is raised in each waiting caller."""
+    async def embed_batch(texts):
+        raise RuntimeError("quota exceeded")
+
+    batcher = EmbeddingMicroBatcher(embed_batch, max_batch_size=4, max_wait_ms=1)
+    results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+async def test_cancelled_batch_does_not_leave_callers_waiting():
+    """Test that cancelling an in-flight batch cancels its callers instead of hanging them."""
+    started = asyncio.Event()
+
+    async def embed_batch(texts):
+        started.set()
+        await asyncio.sleep(10)
+
+    batcher = EmbeddingMicroBatcher(embed_batch, max_batch_size=2, max_wait_ms=1)
+    callers = asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+    await started.wait()
+    for task in list(batcher._tasks):
+        task.cancel()
+
+    results = await asyncio.wait_for(callers, timeout=1.0)
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+    await asyncio.sleep(0)
+    assert not batcher._tasks
+
+
+class _CountingModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[float(len(t)), 1.0] for t in texts])
+
+
+async def test_local_service_encodes_concurrent_texts_once():
+    """Test that LocalEmbeddingService.embed_text runs one encode for concurrent calls."""
+    service = LocalEmbeddingService()
+    model = _CountingModel()
+    service._model = model
+
+    vectors = await asyncio.gather(*(service.embed_text(t) for t in ["a", "bb", "ccc"]))
+    assert vectors == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+    assert model.calls == [["a", "bb", "ccc"]]
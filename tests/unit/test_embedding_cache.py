@@ -0,0 +1,93 @@
+from typing import List
+
+from advence_rag.domain.interfaces import EmbeddingService
+from advence_rag.infrastructure.ai.embedding_cache import CachedEmbeddingService, EmbeddingStore
+
+
+class CountingEmbeddingService(EmbeddingService):
+    model_id = "test-model"
+
+    def __init__(self):
+        self.embedded: List[str] = []
+
+    async def embed_text(self, text: str) -> List[float]:
+        return (await self.embed_batch([text]))[0]
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        self.embedded.extend(texts)
+        return [[float(len(t)), 0.5] for t in texts]
+
+
+async def test_repeated_queries_hit_the_cache():
+    """Test that normalized duplicates are only embedded once."""
+    inner = CountingEmbeddingService()
+    service = CachedEmbeddingService(inner)
+
+    first = await service.embed_text("What is  ADK?")
+    assert await service.embed_text(" What is ADK? ") == first
+    assert inner.embedded == ["What is  ADK?"]
+
+    vectors = await service.embed_batch(["new", "What is ADK?", "new"])
+    assert vectors == [[3.0, 0.5], first, [3.0, 0.5]]
+    assert inner.embedded == ["What is  ADK?", "new"]
+
+    stats = service.stats()
+    assert stats["misses"] == 2 and stats["memory_hits"] == 2
+
+
+async def test_persistent_tier_is_shared(tmp_path):
+    """Test that a fresh process reads embeddings computed by another one."""
+    path = tmp_path / "embeddings.sqlite"
+    await CachedEmbeddingService(CountingEmbeddingService(), persist_path=path).embed_batch(["a", "bb"])
+
+    inner = CountingEmbeddingService()
+    service = CachedEmbeddingService(inner, persist_path=path)
+    assert await service.embed_batch(["bb", "a"]) == [[2.0, 0.5], [1.0, 0.5]]
+    assert inner.embedded == []
+    assert service.stats()["persistent_hits"] == 2
+
+
+async def test_embedding_store_only_embeds_changed_chunks(tmp_path):
+    """Test that re-ingesting a document only embeds chunks whose content changed."""
+    path = tmp_path / "chunk_embeddings.sqlite"
+    inner = CountingEmbeddingService()
+    store = EmbeddingStore(path, model_id="test-model")
+
+    first = await store.embed(["page one", "page two", "page three"], inner.embed_batch)
+
+    store = EmbeddingStore(path, model_id="test-model")
+    second = await store.embed(["page one", "page 2 (revised)", "page three"], inner.embed_batch)
+    assert inner.embedded == ["page one", "page two", "page three", "page 2 (revised)"]
+    assert second[0] == first[0] and second[2] == first[2]
+    assert store.stats() == {"model_id": "test-model", "reused": 2, "computed": 1}
+
+    # Vectors are namespaced by model
+    other = EmbeddingStore(path, model_id="other-model")
+    await other.embed(["page one"], inner.embed_batch)
+    assert other.computed == 1
+
+
+def test_ingestion_bypasses_the_query_cache(monkeypatch):
+    """Test that chunk embeddings for ingestion come from the model, not the query cache."""
+    from advence_rag.infrastructure.persistence import repository_factory
+
+    inner = CountingEmbeddingService()
+    monkeypatch.setattr(repository_factory, "_embedding_service_instance", CachedEmbeddingService(inner))
+    assert repository_factory.get_document_embedding_service() is inner
+
+    monkeypatch.setattr(repository_factory, "_embedding_service_instance", inner)
+    assert repository_factory.get_document_embedding_service() is inner
+
+
+def test_embedding_store_is_shared_per_model(tmp_path, monkeypatch):
+    """Test that Chroma and Qdrant ingestion get one store instance per model over the same file."""
+    from advence_rag.infrastructure.persistence import repository_factory
+
+    monkeypatch.setattr(repository_factory.settings, "chroma_persist_directory", tmp_path / "chroma")
+    monkeypatch.setattr(repository_factory.settings, "embedding_store_enabled", True)
+    monkeypatch.setattr(repository_factory, "_embedding_store_instances", {})
+
+    store = repository_factory.get_embedding_store("chroma/all-MiniLM-L6-v2")
+    assert repository_factory.get_embedding_store("chroma/all-MiniLM-L6-v2") is store
+    assert repository_factory.get_embedding_store("other-model") is not store
+    assert (tmp_path / "cache" / "chunk_embeddings.sqlite").exists()
@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from advence_rag.application.fusion import fuse, reciprocal_rank_fusion, top_k_indices
+from advence_rag.config.settings import Settings
+from advence_rag.domain.entities import SearchResult
+
+
+def _results(pairs):
+    return [SearchResult(content=doc_id, metadata={}, id=doc_id, score=score) for doc_id, score in pairs]
+
+
+def _reference_rrf(ranked_lists, k=60, weights=None):
+    """Dict-based RRF, as previously implemented in HybridSearchUseCase."""
+    weights = weights or [1.0] * len(ranked_lists)
+    scores = {}
+    for ranked, weight in zip(ranked_lists, weights):
+        for rank, doc in enumerate(ranked, 1):
+            scores[doc.id] = scores.get(doc.id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def test_rrf_matches_reference_and_does_not_mutate():
+    """Test that vectorized (weighted) RRF matches the dict version and leaves inputs untouched."""
+    rng = random.Random(3)
+    pool = [f"d{i}" for i in range(500)]
+    lists = [_results((d, rng.random()) for d in rng.sample(pool, 200)) for _ in range(3)]
+    before = [[r.score for r in ranked] for ranked in lists]
+
+    for weights in (None, [1.0, 0.5, 2.0]):
+        fused = reciprocal_rank_fusion(lists, top_k=50, weights=weights)
+        expected = _reference_rrf(lists, weights=weights)[:50]
+        assert [r.id for r in fused] == [doc_id for doc_id, _ in expected]
+        assert [r.score for r in fused] == pytest.approx([score for _, score in expected])
+
+    assert [[r.score for r in ranked] for ranked in lists] == before
+
+
+def test_combsum_and_combmnz_normalize_leg_scores():
+    """Test score-based fusion, including distance legs where lower is better."""
+    vector = _results([("a", 0.1), ("b", 0.3), ("c", 0.9)])  # Distances, best first
+    keyword = _results([("b", 12.0), ("d", 4.0), ("a", 2.0)])  # BM25 scores
+
+    combsum = fuse([vector, keyword], method="combsum", top_k=4)
+    assert [r.id for r in combsum] == ["b", "a", "d", "c"]
+    assert combsum[0].score == pytest.approx(0.75 + 1.0)
+
+    combmnz = fuse([vector, keyword], method="combmnz", top_k=4)
+    assert [r.id for r in combmnz] == ["b", "a", "d", "c"]
+    assert combmnz[0].score == pytest.approx(2 * 1.75)
+
+    zscore = fuse([vector, keyword], method="combsum", normalization="zscore", top_k=1)
+    assert zscore[0].id == "b"
+
+
+def test_top_k_selection_breaks_ties_by_first_seen_order():
+    """Test the partial top-k selection, including ties at the cut-off."""
+    scores = np.array([0.5, 0.9, 0.5, 0.1, 0.9, 0.5])
+    assert top_k_indices(scores, 3).tolist() == [1, 4, 0]
+    assert top_k_indices(scores, 10).tolist() == [1, 4, 0, 2, 5, 3]
+    assert top_k_indices(scores, 0).tolist() == []
+
+
+def test_fusion_weights_setting_is_parsed():
+    """Test parsing of FUSION_WEIGHTS."""
+    settings = Settings(fusion_weights="vector=1.0, keyword=0.5")
+    assert settings.fusion_weights == {"vector": 1.0, "keyword": 0.5}
+    assert Settings().fusion_weights == {}
+
+
+def test_invalid_fusion_weights_fail_at_startup():
+    """Test that a malformed FUSION_WEIGHTS is rejected when settings load."""
+    for value in ("vector=fast", "vector", "=1.0", "keyword=-1", "vector=nan"):
+        with pytest.raises(ValidationError):
+            Settings(fusion_weights=value)
+    assert Settings(fusion_weights="vector=1.0,").fusion_weights == {"vector": 1.0}
@@ -0,0 +1,83 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from advence_rag.infrastructure.ai import embedding_service
+from advence_rag.infrastructure.ai.embedding_service import GeminiEmbeddingService
+from advence_rag.utils.rate_limit import TokenBucket
+
+
+class FakeModels:
+    """Stands in for genai Client.models, failing selected calls with a 429."""
+
+    def __init__(self, fail_first=()):
+        self.requests = []
+        self.fail_first = set(fail_first)
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def embed_content(self, model, contents):
+        with self._lock:
+            self.requests.append(list(contents))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.02)
+            if contents[0] in self.fail_first:
+                self.fail_first.discard(contents[0])
+                raise RuntimeError("429 RESOURCE_EXHAUSTED")
+            return SimpleNamespace(embeddings=[SimpleNamespace(values=[float(t)]) for t in contents])
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    for name, value in {
+        "google_api_key": "test-key",
+        "gemini_embedding_chunk_size": 3,
+        "gemini_embedding_concurrency": 2,
+        "gemini_embedding_rpm": 60000,
+        "embedding_batch_max_size": 1,
+    }.items():
+        monkeypatch.setattr(embedding_service.settings, name, value)
+    monkeypatch.setattr(GeminiEmbeddingService, "RETRY_INITIAL_DELAY", 0.0)
+    return GeminiEmbeddingService()
+
+
+async def test_embed_batch_is_chunked_with_bounded_concurrency(gemini):
+    """Test that large batches are split into chunks, run at most N at a time, in order."""
+    gemini.client = SimpleNamespace(models=FakeModels())
+    texts = [str(i) for i in range(10)]
+
+    vectors = await gemini.embed_batch(texts)
+
+    assert vectors == [[float(i)] for i in range(10)]
+    assert sorted(len(r) for r in gemini.client.models.requests) == [1, 3, 3, 3]
+    assert gemini.client.models.max_active == 2
+
+
+async def test_rate_limited_chunk_is_retried_alone(gemini):
+    """Test that a 429 only retries the affected chunk."""
+    models = FakeModels(fail_first={"3"})
+    gemini.client = SimpleNamespace(models=models)
+
+    vectors = await gemini.embed_batch([str(i) for i in range(6)])
+
+    assert vectors == [[float(i)] for i in range(6)]
+    assert [r[0] for r in models.requests].count("3") == 2
+    assert [r[0] for r in models.requests].count("0") == 1
+
+
+async def test_token_bucket_spaces_out_requests():
+    """Test that the bucket allows a burst, then throttles to the configured rate."""
+    bucket = TokenBucket(rate=100.0, capacity=2)
+    start = time.perf_counter()
+    for _ in range(6):
+        await bucket.acquire()
+    # 2 burst tokens, then 4 more at 10ms each
+    assert 0.03 <= time.perf_counter() - start < 0.2
@@ -0,0 +1,202 @@
+import asyncio
+import time
+
+from advence_rag.application.use_cases.search import HybridSearchUseCase
+from advence_rag.utils.index_version import IndexVersionLog
+from tests.utils.fakes import FakeRepository, FakeWebSearch, PassthroughReranker, make_results
+
+
+async def test_legs_run_concurrently():
+    """Test that hybrid latency is the slowest leg rather than the sum of both."""
+    repo = FakeRepository(
+        make_results("a", "b"), make_results("b", "c"), delays={"vector": 0.2, "keyword": 0.2}
+    )
+    use_case = HybridSearchUseCase(repo, PassthroughReranker(), leg_timeout=1.0)
+
+    start = time.perf_counter()
+    results = await use_case.execute("query", top_k=3, enable_crag=False)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.35
+    assert [r.id for r in results] == ["b", "a", "c"]
+    assert {name for name, _, _ in repo.calls} == {"vector", "keyword"}
+
+
+async def test_slow_or_failing_leg_degrades_to_partial_results():
+    """Test that a timed-out or failing leg is dropped instead of stalling the request."""
+    repo = FakeRepository(make_results("a", "b"), make_results("c"), delays={"keyword": 5.0})
+    use_case = HybridSearchUseCase(repo, PassthroughReranker(), leg_timeout=0.1)
+
+    start = time.perf_counter()
+    results = await use_case.execute("query", top_k=3, enable_crag=False)
+    assert time.perf_counter() - start < 1.0
+    assert [r.id for r in results] == ["a", "b"]
+
+    repo = FakeRepository(make_results("a"), make_results("c"), errors={"vector": RuntimeError("down")})
+    use_case = HybridSearchUseCase(repo, PassthroughReranker(), leg_timeout=1.0)
+    assert [r.id for r in await use_case.execute("query", enable_crag=False)] == ["c"]
+
+
+async def test_crag_merges_web_results_without_duplicates():
+    """Test the CRAG fallback when reranked knowledge base results score poorly."""
+    repo = FakeRepository(make_results("a"), make_results("a"))
+    web = FakeWebSearch(make_results("a", "web1", source="web"))
+    use_case = HybridSearchUseCase(repo, PassthroughReranker(score=-5.0), web, leg_timeout=1.0)
+
+    results = await use_case.execute("query", top_k=3, enable_crag=True)
+    assert web.calls == 1
+    assert [r.id for r in results] == ["web1", "a"]
+
+
+async def test_crag_web_results_survive_a_full_kb_result_list():
+    """Test that web results displace poor KB hits when the KB returns at least top_k."""
+    repo = FakeRepository(make_results("a", "b", "c", "d"), make_results("a", "b", "c", "d"))
+    web = FakeWebSearch(make_results("web1", "web2", source="web"))
+    use_case = HybridSearchUseCase(repo, PassthroughReranker(score=-5.0), web, leg_timeout=1.0)
+
+    results = await use_case.execute("query", top_k=3, enable_crag=True)
+    assert web.calls == 1
+    assert [r.id for r in results] == ["web1", "web2", "a"]
+
+
+async def test_adaptive_pool_skips_rerank_when_legs_agree():
+    """Test that agreeing legs keep the small pool and skip the reranker."""
+    ids = [f"d{i}" for i in range(20)]
+    repo = FakeRepository(make_results(*ids), make_results(*ids))
+    reranker = PassthroughReranker()
+    use_case = HybridSearchUseCase(repo, reranker, leg_timeout=1.0, pool_mode="adaptive")
+
+    results = await use_case.execute("query", top_k=3, enable_crag=False)
+    assert [r.id for r in results] == ["d0", "d1", "d2"]
+    assert reranker.calls == 0
+    assert {top_k for _, _, top_k in repo.calls} == {6}
+
+    stats = use_case.stats.as_dict()
+    assert stats["rerank_skipped"] == 1 and stats["pools_widened"] == 0
+    assert stats["candidates_rerank_saved"] == 6
+    assert stats["candidates_fetch_saved"] == 12
+
+
+async def test_adaptive_pool_widens_when_legs_disagree():
+    """Test that disjoint legs widen the pool and rerank every candidate."""
+    repo = FakeRepository(
+        make_results(*[f"v{i}" for i in range(20)]), make_results(*[f"k{i}" for i in range(20)])
+    )
+    reranker = PassthroughReranker()
+    use_case = HybridSearchUseCase(repo, reranker, leg_timeout=1.0, pool_mode="adaptive")
+
+    await use_case.execute("query", top_k=3, enable_crag=False)
+    assert [top_k for _, _, top_k in repo.calls].count(12) == 2
+    assert reranker.pool_sizes == [12]
+    assert use_case.stats.pools_widened == 1
+
+
+async def test_widened_pool_keeps_the_first_round():
+    """Test that a leg failing in the wider round keeps its first-round hits and marks the result degraded."""
+
+    class FailsWhenWidened(FakeRepository):
+        async def _leg(self, name, query, top_k):
+            results = await super()._leg(name, query, top_k)
+            if name == "keyword" and top_k == 12:
+                raise RuntimeError("down")
+            return results
+
+    repo = FailsWhenWidened(
+        make_results(*[f"v{i}" for i in range(20)]), make_results(*[f"k{i}" for i in range(20)])
+    )
+    use_case = HybridSearchUseCase(repo, PassthroughReranker(), leg_timeout=1.0, pool_mode="adaptive")
+
+    results = await use_case.execute("query", top_k=3, enable_crag=False)
+    assert any(r.id.startswith("k") for r in results)
+    assert use_case.stats.pools_widened == 1
+    assert use_case.stats.candidates_fetched == 6 + 6 + 12
+
+    await use_case.execute("query", top_k=3, enable_crag=False)
+    assert len(repo.calls) == 8  # Degraded, so not cached
+
+
+async def test_adaptive_pool_truncates_rerank_when_crag_needs_scores():
+    """Test that a confident ranking is still reranked (top-k only) when CRAG is on."""
+    ids = [f"d{i}" for i in range(20)]
+    repo = FakeRepository(make_results(*ids), make_results(*ids))
+    reranker = PassthroughReranker()
+    web = FakeWebSearch([])
+    use_case = HybridSearchUseCase(repo, reranker, web, leg_timeout=1.0, pool_mode="adaptive")
+
+    await use_case.execute("query", top_k=3, enable_crag=True)
+    assert reranker.pool_sizes == [3]
+    assert use_case.stats.rerank_truncated == 1
+    assert web.calls == 0
+
+
+async def test_repeated_query_served_from_result_cache(tmp_path):
+    """Test that normalized repeats hit the cache until the index generation changes."""
+    versions = IndexVersionLog(tmp_path / "versions.sqlite")
+    repo = FakeRepository(make_results("a", "b"), make_results("b"))
+    use_case = HybridSearchUseCase(repo, PassthroughReranker(), leg_timeout=1.0, index_versions=versions)
+
+    first = await use_case.execute("What is  ADK?", top_k=3, enable_crag=False)
+    again = await use_case.execute("what is ADK?", top_k=3, enable_crag=False)
+    assert [r.id for r in again] == [r.id for r in first]
+    assert len(repo.calls) == 2
+    assert use_case.stats.cache_hits == 1
+
+    await use_case.execute("what is ADK?", top_k=2, enable_crag=False)
+    assert len(repo.calls) == 4
+
+    versions.bump(["a"])
+    await use_case.execute("What is ADK?", top_k=3, enable_crag=False)
+    assert len(repo.calls) == 6
+
+
+async def test_degraded_results_are_not_cached():
+    """Test that results missing a failed leg are recomputed on the next call."""
+    repo = FakeRepository(make_results("a"), make_results("c"), errors={"keyword": RuntimeError("down")})
+    use_case = HybridSearchUseCase(repo, PassthroughReranker(), leg_timeout=1.0)
+
+    await use_case.execute("query", enable_crag=False)
+    await use_case.execute("query", enable_crag=False)
+    assert len(repo.calls) == 4
+    assert use_case.stats.leg_failures == 2
+
+
+async def test_concurrent_leg_failure_does_not_block_caching_other_queries():
+    """Test that a leg failing for one request does not mark a concurrent request as degraded."""
+
+    class FailingForQuery(FakeRepository):
+        async def _leg(self, name, query, top_k):
+            results = await super()._leg(name, query, top_k)
+            if query == "broken" and name == "keyword":
+                raise RuntimeError("down")
+            return results
+
+    repo = FailingForQuery(make_results("a"), make_results("c"), delays={"vector": 0.05, "keyword": 0.05})
+    use_case = HybridSearchUseCase(repo, PassthroughReranker(), leg_timeout=1.0)
+
+    await asyncio.gather(
+        use_case.execute("good", enable_crag=False), use_case.execute("broken", enable_crag=False)
+    )
+    await use_case.execute("good", enable_crag=False)
+    await use_case.execute("broken", enable_crag=False)
+    assert [query for _, query, _ in repo.calls].count("good") == 2
+    assert [query for _, query, _ in repo.calls].count("broken") == 4
+
+
+async def test_chroma_search_errors_are_not_cached_as_empty_results():
+    """Test that a Chroma search error counts as a failed leg rather than an empty hit list."""
+    from advence_rag.infrastructure.persistence.chroma_repository import ChromaKnowledgeBaseRepository
+
+    calls = []
+
+    async def search(query, top_k=5):
+        calls.append(query)
+        return {"status": "error", "query": query, "error": "collection missing", "results": []}
+
+    repo = ChromaKnowledgeBaseRepository()
+    repo._search_v = repo._search_k = search
+    use_case = HybridSearchUseCase(repo, PassthroughReranker(), leg_timeout=1.0)
+
+    assert await use_case.execute("query", enable_crag=False) == []
+    assert await use_case.execute("query", enable_crag=False) == []
+    assert len(calls) == 4
+    assert use_case.stats.leg_failures == 4
@@ -0,0 +1,25 @@
+from advence_rag.utils.index_version import IndexVersionLog
+
+
+def test_bump_stamps_chunks_with_new_generation(tmp_path):
+    """Test that writes advance the generation and mark only the touched chunks."""
+    log = IndexVersionLog(tmp_path / "versions.sqlite")
+    assert log.generation() == 0
+
+    assert log.bump(["a", "b"]) == 1
+    before = log.generation()
+    assert log.bump(["b"]) == 2
+
+    assert log.changed_since(["a"], before) is False
+    assert log.changed_since(["a", "b"], before) is True
+    assert log.changed_since(["unknown"], 0) is False
+
+
+def test_generation_is_shared_between_instances(tmp_path):
+    """Test that a write made by another process is visible (e.g. the ingestion scheduler)."""
+    path = tmp_path / "versions.sqlite"
+    reader = IndexVersionLog(path)
+    IndexVersionLog(path).bump(["chunk-1"])
+
+    assert reader.generation() == 1
+    assert reader.changed_since(["chunk-1"], 0)
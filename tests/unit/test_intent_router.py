@@ -0,0 +1,64 @@
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+
+from advence_rag.infrastructure.ai.agent_service import OrchestratorAgentService
+from advence_rag.infrastructure.ai.intent_router import GREETING_REPLY, IntentRouter, LLM_CALLS_GREETING
+
+
+def user(text: str) -> list[dict]:
+    return [{"role": "user", "content": text}]
+
+
+def test_greetings_get_a_canned_reply():
+    """Test that greetings and thanks are answered locally in the user's language."""
+    router = IntentRouter()
+
+    for text in ("hello", "Hi there!", "你好", "謝謝！"):
+        decision = router.classify(user(text))
+        assert decision.intent == "greeting", text
+        assert decision.reply
+
+    assert router.classify(user("你好")).reply == GREETING_REPLY["zh"]
+    assert router.classify(user("hello")).reply == GREETING_REPLY["en"]
+    assert router.classify(user("hello, what is the refund policy?")).intent != "greeting"
+
+
+def test_clear_single_turn_questions_take_the_fast_path():
+    """Test that self-contained questions are routed straight to retrieval."""
+    router = IntentRouter()
+
+    for text in ("豐收款API是什麼？", "How do I configure the Qdrant collection name?"):
+        assert router.classify(user(text)).intent == "kb_question", text
+
+
+def test_ambiguous_requests_keep_the_agents():
+    """Test that follow-ups, comparisons and sensitive content go to the orchestrator."""
+    router = IntentRouter()
+
+    assert router.classify(user("它在哪裡？")).intent == "agent"
+    assert router.classify(user("Where is it?")).intent == "agent"
+    assert router.classify(user("比較 Chroma 與 Qdrant 的差異")).intent == "agent"
+    assert router.classify(user("我的身分證 A123456789 可以查嗎？")).intent == "agent"
+
+    history = [
+        {"role": "user", "content": "豐收款API是什麼？"},
+        {"role": "assistant", "content": "..."},
+        {"role": "user", "content": "豐收款API如何申請？"},
+    ]
+    assert router.classify(history).intent == "agent"
+
+
+async def test_greeting_skips_the_llm():
+    """Test that the agent service answers greetings without a runner and counts the saved call."""
+    router = IntentRouter()
+    service = OrchestratorAgentService(session_service=InMemorySessionService(), intent_router=router)
+
+    result = await service.chat(user("hello"))
+    assert result["answer"] == GREETING_REPLY["en"]
+    assert service._runner is None
+
+    stream = await service.chat(user("hello"), stream=True)
+    assert [chunk async for chunk in stream] == [GREETING_REPLY["en"]]
+
+    stats = router.stats()
+    assert stats["greeting"] == 2
+    assert stats["llm_calls_avoided"] == 2 * LLM_CALLS_GREETING
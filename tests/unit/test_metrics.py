@@ -0,0 +1,80 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from advence_rag.application.use_cases import search
+from advence_rag.application.use_cases.search import HybridSearchUseCase
+from advence_rag.interfaces.api.v1.metrics import router
+from advence_rag.utils.metrics import MetricsRegistry, get_metrics
+from tests.utils.fakes import FakeRepository, PassthroughReranker, make_results
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test the text exposition of a labeled histogram and a counter."""
+    registry = MetricsRegistry()
+    latency = registry.histogram("chat_duration_seconds", "Chat latency", ["route"], buckets=(0.1, 1.0))
+    latency.observe(0.05, route="simple")
+    latency.observe(0.5, route="simple")
+    latency.observe(5.0, route="simple")
+    registry.counter("ingest_chunks", "Chunks").inc(3)
+
+    text = registry.render()
+    assert "# TYPE advence_rag_chat_duration_seconds histogram" in text
+    assert 'advence_rag_chat_duration_seconds_bucket{route="simple",le="0.1"} 1' in text
+    assert 'advence_rag_chat_duration_seconds_bucket{route="simple",le="1"} 2' in text
+    assert 'advence_rag_chat_duration_seconds_bucket{route="simple",le="+Inf"} 3' in text
+    assert 'advence_rag_chat_duration_seconds_sum{route="simple"} 5.55' in text
+    assert 'advence_rag_chat_duration_seconds_count{route="simple"} 3' in text
+    assert "# TYPE advence_rag_ingest_chunks_total counter" in text
+    assert "advence_rag_ingest_chunks_total 3" in text
+
+
+def test_stats_sources_become_gauges_and_counters():
+    """Test that registered stats() dicts are read at scrape time, nested dicts as labels."""
+    registry = MetricsRegistry()
+    counters = {"hedges": 1}
+    registry.register_stats("web_search", lambda: {
+        "providers": {"serper": {"wins": 4, "p50_ms": 120.5}, "google": {"wins": 2, "p50_ms": None}},
+        "model_id": "ignored",
+        "entries": 7,
+        **counters,
+    }, counters=("hedges", "wins"))
+    counters["hedges"] = 2
+
+    text = registry.render()
+    assert "# TYPE advence_rag_web_search_hedges_total counter" in text
+    assert "advence_rag_web_search_hedges_total 2" in text
+    assert "# TYPE advence_rag_web_search_entries gauge" in text
+    assert "# TYPE advence_rag_web_search_providers_wins_total counter" in text
+    assert 'advence_rag_web_search_providers_wins_total{provider="serper"} 4' in text
+    assert 'advence_rag_web_search_providers_wins_total{provider="google"} 2' in text
+    assert "# TYPE advence_rag_web_search_providers_p50_ms gauge" in text
+    assert 'advence_rag_web_search_providers_p50_ms{provider="serper"} 120.5' in text
+    assert "model_id" not in text
+
+    registry.register_stats("retrieval", lambda: {"queries": 3}, counters=True)
+    assert "advence_rag_retrieval_queries_total 3" in registry.render()
+
+
+async def test_hybrid_search_observes_stage_latency():
+    """Test that execute() records the total and per-leg latency."""
+    repo = FakeRepository(make_results("a", "b"), make_results("b", "c"))
+    use_case = HybridSearchUseCase(repo, PassthroughReranker(), leg_timeout=1.0)
+    stages = search._stage_latency
+    before = {stage: stages.count(stage=stage) for stage in ("total", "vector", "keyword", "fusion", "rerank")}
+
+    await use_case.execute("query", top_k=2)
+    for stage, count in before.items():
+        assert stages.count(stage=stage) == count + 1, stage
+
+
+def test_metrics_endpoint():
+    """Test that /metrics serves the process registry in the Prometheus text format."""
+    app = FastAPI()
+    app.include_router(router)
+    get_metrics().counter("test_scrapes", "Test counter").inc()
+
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "advence_rag_test_scrapes_total" in response.text
+    assert "# TYPE advence_rag_web_search_hedges_total counter" in response.text
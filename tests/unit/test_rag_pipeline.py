@@ -0,0 +1,103 @@
+from google.adk import Runner
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from google.genai import types
+
+from advence_rag.infrastructure.ai.agent_service import OrchestratorAgentService
+from advence_rag.infrastructure.ai.intent_router import IntentRouter
+from advence_rag.workflows import rag_pipeline
+from advence_rag.workflows.rag_pipeline import build_direct_pipeline
+from tests.utils.fakes import FakeLlm
+
+
+def fake_search(monkeypatch) -> list[str]:
+    searched = []
+
+    async def search_knowledge_base(query: str, top_k=None, collection_name=None) -> str:
+        searched.append(query)
+        return "### Search found 1 documents\n[1] 豐收款API 用於代收付款"
+
+    monkeypatch.setattr("advence_rag.agents.search.search_knowledge_base", search_knowledge_base)
+    return searched
+
+
+async def run_direct(monkeypatch, text: str):
+    searched = fake_search(monkeypatch)
+    pipeline = build_direct_pipeline()
+    llm = FakeLlm(reply="豐收款API 是代收付款服務 [1]", requests=[])
+    pipeline.sub_agents[0].model = llm
+
+    runner = Runner(agent=pipeline, app_name="test", session_service=InMemorySessionService())
+    await runner.session_service.create_session(app_name="test", user_id="u", session_id="s")
+    events = [
+        event
+        async for event in runner.run_async(
+            user_id="u", session_id="s", new_message=types.Content(role="user", parts=[types.Part(text=text)])
+        )
+    ]
+    await runner.close()
+    return searched, llm, events
+
+
+async def test_direct_pipeline_makes_one_llm_call(monkeypatch):
+    """Test that direct mode retrieves in-process and answers with a single writer call."""
+    searched, llm, events = await run_direct(monkeypatch, "豐收款API是什麼？")
+
+    assert searched == ["豐收款API是什麼？"]
+    assert len(llm.requests) == 1
+    assert "豐收款API 用於代收付款" in llm.requests[0].config.system_instruction
+
+    answers = [e for e in events if e.content and e.content.parts and e.content.parts[0].text]
+    assert [e.author for e in answers] == ["writer_agent"]
+    assert answers[0].content.parts[0].text == "豐收款API 是代收付款服務 [1]"
+
+
+async def test_direct_pipeline_searches_the_current_message_only(monkeypatch):
+    """Test that the conversation history prefix is not sent to retrieval."""
+    text = "[Conversation History]\nUser: 你好\nAssistant: 您好\n\n[Current Message]\n豐收款API如何申請？"
+    searched, _, _ = await run_direct(monkeypatch, text)
+    assert searched == ["豐收款API如何申請？"]
+
+
+def test_direct_mode_selects_the_direct_pipeline(monkeypatch):
+    """Test that rag_pipeline_mode=direct builds the single-call pipeline."""
+    monkeypatch.setattr(rag_pipeline.get_settings(), "rag_pipeline_mode", "direct")
+    assert rag_pipeline.get_rag_pipeline().name == "rag_pipeline_direct"
+
+
+async def test_fast_path_streams_like_the_agents(monkeypatch):
+    """Test that a routed question streams the status line and the writer answer."""
+    searched = fake_search(monkeypatch)
+    router = IntentRouter()
+    service = OrchestratorAgentService(session_service=InMemorySessionService(), intent_router=router)
+    service._get_direct_runner().agent.sub_agents[0].model = FakeLlm(reply="豐收款API 是代收付款服務 [1]", requests=[])
+
+    stream = await service.chat([{"role": "user", "content": "豐收款API是什麼？"}], stream=True)
+    output = "".join([chunk async for chunk in stream])
+    await service.aclose()
+
+    assert searched == ["豐收款API是什麼？"]
+    assert output == "<thought>\n🔍 搜尋資料中...\n✍️ 生成回答中...\n</thought>\n\n豐收款API 是代收付款服務 [1]"
+    assert service._runner is None
+    assert router.stats()["llm_calls_avoided"] > 0
+
+
+async def test_failed_fast_path_saves_no_llm_calls(monkeypatch):
+    """Test that LLM calls avoided are only counted once the routed run succeeds."""
+
+    class FailingLlm(FakeLlm):
+        async def generate_content_async(self, llm_request, stream=False):
+            raise ValueError("writer unavailable")
+            yield
+
+    fake_search(monkeypatch)
+    router = IntentRouter()
+    service = OrchestratorAgentService(session_service=InMemorySessionService(), intent_router=router)
+    service._get_direct_runner().agent.sub_agents[0].model = FailingLlm(requests=[])
+
+    stream = await service.chat([{"role": "user", "content": "豐收款API是什麼？"}], stream=True)
+    output = "".join([chunk async for chunk in stream])
+    await service.chat([{"role": "user", "content": "豐收款API是什麼？"}])
+    await service.aclose()
+
+    assert "writer unavailable" in output
+    assert router.stats().get("llm_calls_avoided", 0) == 0
@@ -0,0 +1,52 @@
+from advence_rag.tools import rerank
+from advence_rag.tools.rerank import RerankEngine, rerank_results
+
+
+class FakeCrossEncoder:
+    """Scores a pair by how many query words occur in the document."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.calls.append((len(pairs), batch_size))
+        return [float(sum(w in doc.lower() for w in query.lower().split())) for query, doc in pairs]
+
+
+DOCS = [
+    {"id": "a", "content": "Chroma stores vectors"},
+    {"id": "b", "content": "BM25 ranks keyword matches"},
+    {"id": "c", "content": "Chroma and BM25 hybrid search"},
+]
+
+
+async def test_scores_are_cached_per_query_and_content(monkeypatch):
+    """Test that only unseen (query, id, content) pairs reach the model, in configured batches."""
+    model = FakeCrossEncoder()
+    monkeypatch.setattr(rerank, "_engine", RerankEngine(model, batch_size=2))
+
+    first = await rerank_results("chroma bm25", DOCS, top_k=2)
+    assert [d["id"] for d in first["results"]] == ["c", "a"]
+    assert model.calls == [(3, 2)]
+
+    await rerank_results("chroma  bm25", DOCS, top_k=2)
+    assert len(model.calls) == 1  # Whitespace-normalized query hits the cache
+
+    changed = DOCS[:2] + [{"id": "c", "content": "unrelated text"}]
+    result = await rerank_results("chroma bm25", changed, top_k=3)
+    assert model.calls[-1] == (1, 2)  # Only the edited document is rescored
+    assert result["results"][-1]["id"] == "c"
+
+
+async def test_small_pool_can_skip_the_model(monkeypatch):
+    """Test the early exit when every candidate would be returned anyway."""
+    model = FakeCrossEncoder()
+    monkeypatch.setattr(rerank, "_engine", RerankEngine(model))
+
+    result = await rerank_results("chroma", DOCS, top_k=5, skip_small_pool=True)
+    assert [d["id"] for d in result["results"]] == ["a", "b", "c"]
+    assert all(d["rerank_score"] is None for d in result["results"])
+    assert model.calls == []
+
+    result = await rerank_results("chroma", DOCS, top_k=5, skip_small_pool=False)
+    assert result["results"][0]["rerank_score"] == 1.0
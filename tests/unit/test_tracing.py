@@ -0,0 +1,92 @@
+import asyncio
+import logging
+
+from advence_rag.application.use_cases.search import HybridSearchUseCase
+from advence_rag.infrastructure.ai.agent_service import ExecutionContext
+from advence_rag.utils.tracing import TraceContextFilter, current_trace, mark, span, start_trace
+from tests.utils.fakes import FakeRepository, FakeWebSearch, PassthroughReranker, make_results
+
+
+async def test_spans_nest_and_summarize():
+    """Test that spans form a tree under the request and durations are summed per stage."""
+    trace = start_trace("chat", session_id="s1")
+    with span("retrieval"):
+        with span("rerank", candidates=3):
+            await asyncio.sleep(0.01)
+        with span("rerank", candidates=2):
+            pass
+    mark("first_token", first=True)
+    mark("first_token", first=True)
+    trace.finish()
+
+    by_name = {s.name: s for s in trace.spans}
+    assert by_name["retrieval"].parent_id == trace.root.span_id
+    assert by_name["rerank"].parent_id == by_name["retrieval"].span_id
+
+    summary = trace.summary()
+    assert summary["stages_ms"]["rerank"] >= 10
+    assert summary["ttft_ms"] == summary["marks_ms"]["first_token"]
+    assert summary["total_ms"] >= summary["stages_ms"]["retrieval"]
+
+    otel = trace.as_otel()
+    assert {s["traceId"] for s in otel} == {trace.trace_id}
+    assert len(trace.trace_id) == 32 and len(trace.root.span_id) == 16
+    assert all(s["endTimeUnixNano"] >= s["startTimeUnixNano"] for s in otel)
+
+
+def test_span_is_a_noop_without_trace():
+    """Test that instrumented code runs untraced outside a request."""
+    assert current_trace() is None
+    with span("retrieval") as current:
+        assert current is None
+    mark("first_token")
+
+
+async def test_hybrid_search_records_stage_spans():
+    """Test that retrieval legs, fusion, rerank and the CRAG web search are timed."""
+    repo = FakeRepository(make_results("a", "b"), make_results("b", "c"), delays={"vector": 0.02})
+    use_case = HybridSearchUseCase(repo, PassthroughReranker(score=-5.0), FakeWebSearch(make_results("w1")), leg_timeout=1.0)
+
+    trace = start_trace("search")
+    await use_case.execute("query", top_k=3)
+    trace.finish()
+
+    by_name = {s.name: s for s in trace.spans}
+    retrieval = by_name["retrieval"]
+    for name in ("retrieval.vector", "retrieval.keyword", "fusion", "rerank", "web_search"):
+        assert by_name[name].parent_id == retrieval.span_id, name
+    assert by_name["retrieval.vector"].duration_ms >= 20
+
+
+async def test_execution_context_times_agents_and_tools():
+    """Test that agent turns and tool calls become spans with durations."""
+    trace = start_trace("chat")
+    ctx = ExecutionContext(session_id="s1", trace=trace)
+
+    ctx.enter_agent("search_agent")
+    ctx.add_tool_call("search_knowledge_base")
+    await asyncio.sleep(0.01)
+    ctx.mark_tool_success("search_knowledge_base", "找到 3 份文件")
+    ctx.enter_agent("writer_agent")
+    trace.finish()
+
+    tool = ctx.tool_executions[0]
+    assert tool.duration_ms >= 10
+    by_name = {s.name: s for s in trace.spans}
+    assert by_name["tool.search_knowledge_base"].parent_id == by_name["agent.search_agent"].span_id
+    assert by_name["tool.search_knowledge_base"].attributes["status"] == "success"
+    assert by_name["agent.search_agent"].end <= by_name["agent.writer_agent"].start
+
+
+async def test_log_records_carry_trace_ids():
+    """Test that the log filter fills trace_id/span_id from the active span."""
+    record = logging.LogRecord("advence_rag", logging.INFO, __file__, 1, "msg", None, None)
+    TraceContextFilter().filter(record)
+    assert record.trace_id is None
+
+    trace = start_trace("chat")
+    with span("retrieval") as current:
+        record = logging.LogRecord("advence_rag", logging.INFO, __file__, 1, "msg", None, None)
+        TraceContextFilter().filter(record)
+    assert record.trace_id == trace.trace_id
+    assert record.span_id == current.span_id
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+
+from advence_rag.config import get_settings
+from advence_rag.tools import web_search
+from advence_rag.tools.web_cache import WebResultCache
+
+
+class CountingProvider:
+    def __init__(self, ok: bool = True):
+        self.ok = ok
+        self.calls = 0
+
+    async def __call__(self, query: str, num_results: int = 5):
+        self.calls += 1
+        if not self.ok:
+            return {"status": "error", "error": "down", "results": []}
+        return {"status": "success", "query": query, "count": 1, "results": [{"title": f"v{self.calls}"}]}
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "search_mode", "sequential")
+    monkeypatch.setattr(settings, "search_provider", "serper")
+    monkeypatch.setattr(web_search, "_counters", dict.fromkeys(web_search._counters, 0))
+    serper = CountingProvider()
+    monkeypatch.setattr(web_search, "search_serper", serper)
+    monkeypatch.setattr(web_search, "search_google", CountingProvider(ok=False))
+    return serper
+
+
+async def test_repeat_queries_cost_no_provider_calls(monkeypatch, tmp_path, provider):
+    """Test that normalized repeats are served from the cache."""
+    monkeypatch.setattr(web_search, "_web_cache", WebResultCache(tmp_path / "web.sqlite"))
+
+    first = await web_search.search_web("ADK  agents", num_results=5)
+    again = await web_search.search_web("adk agents", num_results=5)
+    assert provider.calls == 1
+    assert again["results"] == first["results"] and again["cached"] is True
+
+    await web_search.search_web("adk agents", num_results=3)
+    assert provider.calls == 2
+    assert web_search.web_search_stats()["cache_hits"] == 1
+
+
+async def test_stale_entry_served_while_refreshed(monkeypatch, tmp_path, provider):
+    """Test stale-while-revalidate: the stale result returns at once, the refresh lands later."""
+    cache = WebResultCache(tmp_path / "web.sqlite", ttl=0.05, stale_ttl=60)
+    monkeypatch.setattr(web_search, "_web_cache", cache)
+
+    await web_search.search_web("query")
+    await asyncio.sleep(0.1)
+
+    stale = await web_search.search_web("query")
+    assert stale["results"] == [{"title": "v1"}]
+    await asyncio.gather(*web_search._revalidating.values())
+    assert provider.calls == 2
+    assert cache.get("query", 5)[0]["results"] == [{"title": "v2"}]
+    assert web_search.web_search_stats()["revalidations"] == 1
+
+
+async def test_failures_are_not_cached(monkeypatch, tmp_path, provider):
+    """Test that an all-providers-failed result is retried next time."""
+    monkeypatch.setattr(web_search, "_web_cache", WebResultCache(tmp_path / "web.sqlite"))
+    provider.ok = False
+
+    assert (await web_search.search_web("query"))["status"] == "error"
+    provider.ok = True
+    assert (await web_search.search_web("query"))["status"] == "success"
+    assert provider.calls == 2
+
+
+def test_entries_expire_after_the_stale_window(tmp_path):
+    """Test freshness flags and hard expiry."""
+    cache = WebResultCache(tmp_path / "web.sqlite", ttl=0.05, stale_ttl=0.05)
+    cache.set("q", 5, {"status": "success", "results": []})
+    assert cache.get("q", 5)[1] is True
+    time.sleep(0.07)
+    assert cache.get("q", 5)[1] is False
+    time.sleep(0.05)
+    assert cache.get("q", 5) is None
@@ -0,0 +1,134 @@
+import ipaddress
+import time
+from pathlib import Path
+
+from advence_rag.domain.entities import SearchResult
+from advence_rag.infrastructure.ai.web_search_service import SerperWebSearchService
+from advence_rag.infrastructure.ai import web_search_service
+from advence_rag.tools import web_fetch
+from advence_rag.tools.web_fetch import chunk_text, extract_main_text, fetch_pages
+from advence_rag.utils import http
+from advence_rag.utils.http import HTTPClientPool
+from tests.utils.local_server import LocalServer
+
+ARTICLE = (Path(__file__).parent.parent / "fixtures" / "web" / "article.html").read_text(encoding="utf-8")
+
+
+def allow_local_server(monkeypatch):
+    """Let the fetcher reach the 127.0.0.1 test server; every other address is still checked."""
+    is_public = web_fetch._is_public_address
+    monkeypatch.setattr(web_fetch, "_is_public_address", lambda address: address.is_loopback or is_public(address))
+
+
+def html_routes(method: str, path: str, body: bytes):
+    if path == "/article":
+        return 200, ARTICLE
+    if path == "/slow":
+        time.sleep(1.0)
+        return 200, ARTICLE
+    if path.startswith("/redirect?to="):
+        return 302, "", {"Location": path.split("=", 1)[1]}
+    return 404, "<html><body>missing</body></html>"
+
+
+def test_extract_main_text_drops_boilerplate():
+    """Test that scripts, navigation and footers are removed and the article is kept."""
+    title, text = extract_main_text(ARTICLE)
+    assert title == "Hybrid Search Explained | Example Docs"
+    assert text.startswith("Hybrid Search Explained")
+    assert "Reciprocal Rank Fusion" in text and "corrective retrieval" in text
+    for boilerplate in ("analytics", "Getting started", "Privacy", "Vector databases"):
+        assert boilerplate not in text
+
+
+def test_chunk_text_respects_size_and_overlap():
+    """Test chunk bounds, sentence splitting and overlap between chunks."""
+    text = "\n\n".join(f"Sentence number {i} talks about retrieval." for i in range(40))
+    chunks = chunk_text(text, chunk_size=200, overlap=30)
+    assert len(chunks) > 1
+    assert all(len(c) <= 200 for c in chunks)
+    assert chunks[0][-30:] in chunks[1]
+    assert chunk_text("x" * 450, chunk_size=200, overlap=0) == ["x" * 200, "x" * 200, "x" * 50]
+
+
+async def test_fetch_pages_honours_the_time_budget(monkeypatch):
+    """Test that slow pages are dropped once the budget runs out while fast ones are kept."""
+    monkeypatch.setattr(http, "_pool", HTTPClientPool(http2=False))
+    allow_local_server(monkeypatch)
+    with LocalServer(html_routes, content_type="text/html; charset=utf-8") as server:
+        start = time.perf_counter()
+        pages = await fetch_pages(
+            [f"{server.url}/article", f"{server.url}/slow", f"{server.url}/missing"],
+            timeout=2.0,
+            budget=0.3,
+        )
+        assert time.perf_counter() - start < 0.8
+        assert list(pages) == [f"{server.url}/article"]
+    await http.close_http_clients()
+
+
+async def test_web_search_service_returns_page_passages(monkeypatch):
+    """Test that fetched pages replace snippets and failed pages keep theirs."""
+    monkeypatch.setattr(http, "_pool", HTTPClientPool(http2=False))
+    allow_local_server(monkeypatch)
+    with LocalServer(html_routes, content_type="text/html; charset=utf-8") as server:
+        async def fake_search_web(query, num_results=5):
+            return {"status": "success", "results": [
+                {"title": "Article", "url": f"{server.url}/article", "snippet": "short"},
+                {"title": "Missing", "url": f"{server.url}/missing", "snippet": "kept snippet"},
+            ]}
+
+        monkeypatch.setattr(web_search_service, "search_web", fake_search_web)
+        monkeypatch.setattr(web_search_service.settings, "web_chunk_size", 300)
+        service = SerperWebSearchService(fetch_pages=True)
+        results = await service.search("hybrid search", num_results=10)
+
+    await http.close_http_clients()
+    fetched = [r for r in results if r.metadata.get("fetched")]
+    assert len(fetched) >= 2
+    assert all(r.id.startswith(f"{server.url}/article#chunk-") for r in fetched)
+    assert results[-1] == SearchResult(
+        content="kept snippet",
+        metadata={"title": "Missing", "url": f"{server.url}/missing", "source": "web_search"},
+        id=f"{server.url}/missing",
+        score=0.0,
+    )
+
+
+async def test_fetch_pages_blocks_private_hosts_and_redirects(monkeypatch):
+    """Test that non-http schemes, private hosts and redirects into them are not fetched."""
+    monkeypatch.setattr(http, "_pool", HTTPClientPool(http2=False))
+    with LocalServer(html_routes, content_type="text/html; charset=utf-8") as server:
+        blocked = await fetch_pages([f"{server.url}/article", "file:///etc/passwd"])
+        assert blocked == {} and server.requests == []
+
+        allow_local_server(monkeypatch)
+        pages = await fetch_pages([
+            f"{server.url}/redirect?to=/article",
+            f"{server.url}/redirect?to=http://169.254.169.254/latest/meta-data/",
+            f"{server.url}/redirect?to=http://10.0.0.1/admin",
+        ])
+        assert list(pages) == [f"{server.url}/redirect?to=/article"]
+        assert ("GET", "/article") in server.requests
+    await http.close_http_clients()
+
+
+async def test_fetch_connects_to_the_checked_address(monkeypatch):
+    """Test that the page is fetched from the address that passed the check, not a second DNS answer."""
+    monkeypatch.setattr(http, "_pool", HTTPClientPool(http2=False))
+    allow_local_server(monkeypatch)
+    resolved = []
+
+    async def resolve(host, port):
+        # "pages.test" is unknown to the system resolver: only a pinned connection can reach it
+        resolved.append(host)
+        return [ipaddress.ip_address("127.0.0.1")]
+
+    monkeypatch.setattr(web_fetch, "_resolve", resolve)
+    with LocalServer(html_routes, content_type="text/html; charset=utf-8") as server:
+        url = server.url.replace("127.0.0.1", "pages.test")
+        pages = await fetch_pages([f"{url}/redirect?to=/article"])
+    await http.close_http_clients()
+
+    assert list(pages) == [f"{url}/redirect?to=/article"]
+    assert resolved == ["pages.test", "pages.test"]  # Once per hop
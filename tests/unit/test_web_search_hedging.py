@@ -0,0 +1,133 @@
+import asyncio
+import time
+
+import pytest
+
+from advence_rag.config import get_settings
+from advence_rag.tools import web_search
+from advence_rag.utils import http
+from advence_rag.utils.http import HTTPClientPool
+from tests.utils.local_server import LocalServer
+
+
+def provider(name: str, delay: float = 0.0, ok: bool = True, calls: list | None = None):
+    async def search(query: str, num_results: int = 5):
+        if calls is not None:
+            calls.append(name)
+        await asyncio.sleep(delay)
+        if not ok:
+            return {"status": "error", "error": f"{name} down", "results": []}
+        return {"status": "success", "query": query, "count": 1, "results": [{"source": name}]}
+    return search
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(web_search, "_latency", {})
+    monkeypatch.setattr(web_search, "_wins", {})
+    monkeypatch.setattr(web_search, "_errors", {})
+    monkeypatch.setattr(web_search, "_counters", dict.fromkeys(web_search._counters, 0))
+    monkeypatch.setattr(web_search, "_web_cache", None)
+    settings = get_settings()
+    monkeypatch.setattr(settings, "web_cache_enabled", False)
+    monkeypatch.setattr(settings, "search_provider", "serper")
+    monkeypatch.setattr(settings, "search_adaptive_primary", True)
+    return settings
+
+
+async def test_hedged_search_takes_fast_secondary_and_cancels_primary(monkeypatch, fresh_state):
+    """Test that a slow (not failing) primary is hedged after the delay."""
+    monkeypatch.setattr(fresh_state, "search_mode", "hedged")
+    monkeypatch.setattr(fresh_state, "search_hedge_delay_ms", 50)
+    monkeypatch.setattr(web_search, "search_serper", provider("serper", delay=2.0))
+    monkeypatch.setattr(web_search, "search_google", provider("google", delay=0.01))
+
+    start = time.perf_counter()
+    result = await web_search.search_web("query")
+    assert time.perf_counter() - start < 0.5
+    assert result["results"][0]["source"] == "google"
+
+    stats = web_search.web_search_stats()
+    assert stats["hedges"] == 1 and stats["cancelled"] == 1
+    assert stats["providers"]["google"]["wins"] == 1
+
+
+async def test_hedged_search_does_not_hedge_a_fast_primary(monkeypatch, fresh_state):
+    """Test that the secondary is never called when the primary answers in time."""
+    calls = []
+    monkeypatch.setattr(fresh_state, "search_mode", "hedged")
+    monkeypatch.setattr(fresh_state, "search_hedge_delay_ms", 500)
+    monkeypatch.setattr(web_search, "search_serper", provider("serper", calls=calls))
+    monkeypatch.setattr(web_search, "search_google", provider("google", calls=calls))
+
+    assert (await web_search.search_web("query"))["results"][0]["source"] == "serper"
+    assert calls == ["serper"]
+
+
+async def test_failed_primary_falls_back_immediately(monkeypatch, fresh_state):
+    """Test that a failing primary starts the secondary without waiting for the hedge delay."""
+    monkeypatch.setattr(fresh_state, "search_mode", "hedged")
+    monkeypatch.setattr(fresh_state, "search_hedge_delay_ms", 5000)
+    monkeypatch.setattr(web_search, "search_serper", provider("serper", ok=False))
+    monkeypatch.setattr(web_search, "search_google", provider("google"))
+
+    start = time.perf_counter()
+    assert (await web_search.search_web("query"))["results"][0]["source"] == "google"
+    assert time.perf_counter() - start < 1.0
+
+    monkeypatch.setattr(web_search, "search_google", provider("google", ok=False))
+    result = await web_search.search_web("query")
+    assert result["status"] == "error" and "google down" in result["error"]
+
+
+async def test_parallel_mode_queries_both_providers(monkeypatch, fresh_state):
+    """Test that parallel mode starts both providers at once."""
+    calls = []
+    monkeypatch.setattr(fresh_state, "search_mode", "parallel")
+    monkeypatch.setattr(web_search, "search_serper", provider("serper", delay=0.2, calls=calls))
+    monkeypatch.setattr(web_search, "search_google", provider("google", delay=0.01, calls=calls))
+
+    assert (await web_search.search_web("query"))["results"][0]["source"] == "google"
+    assert sorted(calls) == ["google", "serper"]
+
+
+def test_adaptive_primary_prefers_the_faster_provider(fresh_state):
+    """Test that the primary switches only once both providers have enough samples."""
+    for _ in range(web_search.ADAPTIVE_MIN_SAMPLES):
+        web_search._window("serper").record(1.0)
+    assert web_search._provider_order("serper", adaptive=True) == ["serper", "google"]
+
+    for _ in range(web_search.ADAPTIVE_MIN_SAMPLES):
+        web_search._window("google").record(0.2)
+    assert web_search._provider_order("serper", adaptive=True) == ["google", "serper"]
+    assert web_search._provider_order("serper", adaptive=False) == ["serper", "google"]
+
+
+async def test_failed_and_cancelled_calls_do_not_pick_the_primary(monkeypatch, fresh_state):
+    """Test that a provider failing fast (429) never becomes the adaptive primary."""
+    monkeypatch.setattr(fresh_state, "search_mode", "hedged")
+    monkeypatch.setattr(fresh_state, "search_hedge_delay_ms", 10)
+    monkeypatch.setattr(fresh_state, "serper_api_key", "test-key")
+    monkeypatch.setattr(fresh_state, "google_search_api_key", "test-key")
+    monkeypatch.setattr(fresh_state, "google_search_cse_id", "cse")
+    monkeypatch.setattr(web_search, "ADAPTIVE_MIN_SAMPLES", 3)
+    monkeypatch.setattr(http, "_pool", HTTPClientPool(http2=False))
+
+    def routes(method, path, body):
+        if path.startswith("/search"):
+            time.sleep(0.1)
+            return 200, {"organic": [{"title": "slow", "link": "https://example.com", "snippet": ""}]}
+        return 429, {"error": "rate limited"}
+
+    with LocalServer(routes) as server:
+        monkeypatch.setattr(web_search, "SERPER_URL", f"{server.url}/search")
+        monkeypatch.setattr(web_search, "GOOGLE_SEARCH_URL", f"{server.url}/customsearch")
+        for _ in range(5):
+            result = await web_search.search_web("query")
+            assert result["results"][0]["title"] == "slow"
+    await http.close_http_clients()
+
+    stats = web_search.web_search_stats()["providers"]
+    assert stats["google"]["errors"] == 5 and stats["google"]["successes"] == 0
+    assert stats["serper"]["successes"] == 5
+    assert web_search._provider_order("serper", adaptive=True) == ["serper", "google"]
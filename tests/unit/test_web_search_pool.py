@@ -0,0 +1,74 @@
+import time
+
+from advence_rag.config import get_settings
+from advence_rag.tools import web_search
+from advence_rag.utils import http
+from advence_rag.utils.http import HTTPClientPool
+from tests.utils.local_server import LocalServer, json_handler
+
+SERPER_RESPONSE = {"organic": [{"title": "ADK", "link": "https://example.com/adk", "snippet": "Agent Development Kit"}]}
+GOOGLE_RESPONSE = {"items": [{"title": "BM25", "link": "https://example.com/bm25", "snippet": "Ranking"}]}
+
+
+async def test_web_searches_reuse_pooled_connections(monkeypatch):
+    """Test that repeated searches go over one keep-alive connection per provider."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "serper_api_key", "test-key")
+    monkeypatch.setattr(settings, "google_search_api_key", "test-key")
+    monkeypatch.setattr(settings, "google_search_cse_id", "cse")
+    pool = HTTPClientPool(http2=False)
+    monkeypatch.setattr(http, "_pool", pool)
+
+    with LocalServer(json_handler({"/search": SERPER_RESPONSE, "/customsearch": GOOGLE_RESPONSE})) as server:
+        monkeypatch.setattr(web_search, "SERPER_URL", f"{server.url}/search")
+        monkeypatch.setattr(web_search, "GOOGLE_SEARCH_URL", f"{server.url}/customsearch")
+
+        for _ in range(3):
+            result = await web_search.search_serper("adk")
+            assert result["status"] == "success"
+            assert result["results"][0]["url"] == "https://example.com/adk"
+        assert server.connections == 1
+
+        result = await web_search.search_google("bm25")
+        assert result["results"][0]["source"] == "google_search"
+        assert server.connections == 2  # Providers have separate pools
+        assert len(server.requests) == 4
+
+        await http.close_http_clients()
+        assert pool.get("serper") is not None
+        await web_search.search_serper("adk")
+        assert server.connections == 3  # A closed pool reconnects
+        await pool.aclose()
+
+
+async def test_pool_keeps_one_client_per_provider():
+    """Test that clients are shared per provider and reopened after close."""
+    pool = HTTPClientPool(max_connections=2)
+    client = pool.get("serper")
+    assert pool.get("serper") is client
+    assert pool.get("google") is not client
+
+    await pool.aclose()
+    assert client.is_closed
+    assert pool.get("serper") is not client
+    await pool.aclose()
+
+
+async def test_search_requests_use_the_pool_timeout(monkeypatch):
+    """Test that search calls honour the pooled client's timeout (HTTP_TIMEOUT)."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "serper_api_key", "test-key")
+    pool = HTTPClientPool(http2=False, timeout=0.2)
+    monkeypatch.setattr(http, "_pool", pool)
+
+    def slow(method, path, body):
+        time.sleep(1.0)
+        return 200, SERPER_RESPONSE
+
+    with LocalServer(slow) as server:
+        monkeypatch.setattr(web_search, "SERPER_URL", f"{server.url}/search")
+        start = time.perf_counter()
+        result = await web_search.search_serper("adk")
+        assert result["status"] == "error"
+        assert time.perf_counter() - start < 0.8
+        await pool.aclose()
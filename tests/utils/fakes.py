@@ -0,0 +1,101 @@
+"""In-memory fakes of the domain interfaces (and the LLM) for use case and agent tests."""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from advence_rag.domain.entities import Document, SearchResult
+from advence_rag.domain.interfaces import KnowledgeBaseRepository, RerankerService, WebSearchService
+
+
+def make_results(*ids: str, source: Optional[str] = None) -> List[SearchResult]:
+    """Ranked results with descending scores."""
+    return [
+        SearchResult(content=f"content of {doc_id}", metadata={}, id=doc_id, score=1.0 / rank, source=source)
+        for rank, doc_id in enumerate(ids, 1)
+    ]
+
+
+class FakeRepository(KnowledgeBaseRepository):
+    """Repository returning canned results, with optional per-leg delays or errors."""
+
+    def __init__(
+        self,
+        vector: List[SearchResult],
+        keyword: List[SearchResult],
+        delays: Optional[Dict[str, float]] = None,
+        errors: Optional[Dict[str, Exception]] = None,
+    ):
+        self.results = {"vector": vector, "keyword": keyword}
+        self.delays = delays or {}
+        self.errors = errors or {}
+        self.calls: List[tuple] = []
+
+    async def _leg(self, name: str, query: str, top_k: int) -> List[SearchResult]:
+        self.calls.append((name, query, top_k))
+        await asyncio.sleep(self.delays.get(name, 0))
+        if name in self.errors:
+            raise self.errors[name]
+        return [
+            SearchResult(r.content, dict(r.metadata), r.id, r.score, r.source, r.page_number)
+            for r in self.results[name][:top_k]
+        ]
+
+    async def add_documents(
+        self,
+        documents: List[Document],
+        ids: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        return {"status": "success", "added_count": len(documents)}
+
+    async def search_similar(self, query: str, top_k: int = 5) -> List[SearchResult]:
+        return await self._leg("vector", query, top_k)
+
+    async def search_keyword(self, query: str, top_k: int = 5) -> List[SearchResult]:
+        return await self._leg("keyword", query, top_k)
+
+    async def delete_documents(self, ids: List[str]) -> Dict[str, Any]:
+        return {"status": "success", "deleted_count": len(ids)}
+
+
+class PassthroughReranker(RerankerService):
+    """Keeps the fused order and assigns a fixed score."""
+
+    def __init__(self, score: float = 1.0):
+        self.score = score
+        self.calls = 0
+        self.pool_sizes: List[int] = []
+
+    async def rerank(self, query: str, documents: List[SearchResult], top_k: int = 5) -> List[SearchResult]:
+        self.calls += 1
+        self.pool_sizes.append(len(documents))
+        for doc in documents:
+            doc.score = self.score
+        return documents[:top_k]
+
+
+class FakeWebSearch(WebSearchService):
+    def __init__(self, results: List[SearchResult]):
+        self.results = results
+        self.calls = 0
+
+    async def search(self, query: str, num_results: int = 5) -> List[SearchResult]:
+        self.calls += 1
+        return self.results[:num_results]
+
+
+class FakeLlm(BaseLlm):
+    """ADK model answering every request with a fixed text; keeps the requests."""
+
+    model: str = "fake-llm"
+    reply: str = "fake answer"
+    requests: List[LlmRequest] = []
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False):
+        self.requests.append(llm_request)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=self.reply)]))
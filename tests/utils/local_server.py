@@ -0,0 +1,82 @@
+"""Local HTTP/1.1 stand-in server for tests that exercise real sockets."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# (method, path, body) -> (status, JSON payload or text[, extra headers])
+Handler = Callable[[str, str, bytes], Tuple[Any, ...]]
+
+
+class LocalServer:
+    """Keep-alive HTTP server on 127.0.0.1 that counts TCP connections.
+
+    Use as a context manager; ``url`` is the base URL and ``requests``
+    records (method, path) per request.
+    """
+
+    def __init__(self, handler: Handler, content_type: str = "application/json"):
+        self.handler = handler
+        self.content_type = content_type
+        self.connections = 0
+        self.requests: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def _request_handler(self):
+        server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep connections open between requests
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                with server._lock:
+                    server.requests.append((self.command, self.path))
+                status, payload, *headers = server.handler(self.command, self.path, body)
+                data = payload.encode("utf-8") if isinstance(payload, str) else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", server.content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers[0] if headers else {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return RequestHandler
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "LocalServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._request_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def json_handler(routes: Dict[str, Any]) -> Handler:
+    """Handler answering 200 with ``routes[path]`` (query string ignored), 404 otherwise."""
+    def handle(method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        payload = routes.get(path.split("?", 1)[0])
+        return (200, payload) if payload is not None else (404, {"error": "not found"})
+    return handle